@@ -5,13 +5,14 @@ import core.signal_processing.incremental_pca as csprinpc
 """
 
 import logging
-from typing import Dict, List, Tuple
+from typing import List, Tuple
 
 import numpy as np
 import pandas as pd
 
 import core.signal_processing.special_functions as csprspfu
 import helpers.hdbg as hdbg
+import helpers.hnumba as hnumba
 
 _LOG = logging.getLogger(__name__)
 
@@ -59,42 +60,80 @@ def compute_ipca(
     # TODO(Paul): Consider requiring that the caller do this instead.
     # Fill NaNs with zero.
     df.fillna(0, inplace=True)
-    lambdas: Dict[int, list] = {k: [] for k in range(num_pc)}
+    data = np.ascontiguousarray(df.to_numpy(dtype=np.float64))
+    lambdas, unit_eigenvecs, start_idxs = _compute_ipca_kernel(
+        data, num_pc, alpha
+    )
+    _LOG.debug("Completed %s steps of incremental PCA.", len(df))
+    # Convert the arrays into a df of eigenvalues and a list of dfs of unit
+    # eigenvectors, starting from the step in which each component is
+    # initialized.
+    lambdas_srs = []
+    unit_eigenvec_dfs = []
+    for i in range(num_pc):
+        start_idx = start_idxs[i]
+        index = df.index[start_idx:]
+        lambdas_srs.append(pd.Series(index=index, data=lambdas[start_idx:, i]))
+        unit_eigenvec_dfs.append(
+            pd.DataFrame(
+                unit_eigenvecs[i, start_idx:], index=index, columns=df.columns
+            )
+        )
+    lambda_df = pd.concat(lambdas_srs, axis=1)
+    return lambda_df, unit_eigenvec_dfs
+
+
+@hnumba.jit
+def _compute_ipca_kernel(
+    data: np.ndarray, num_pc: int, alpha: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Run incremental PCA on the rows of `data`.
+
+    This is the array version of the loop over `_compute_ipca_step()`.
+
+    :param data: 2D array of observations without NaNs (one per row)
+    :return:
+      - 2D array of eigenvalues (one column per component)
+      - 3D array of unit eigenvectors indexed by component, step, dimension
+      - index of the step in which each component is initialized
+    """
+    num_steps, dim = data.shape
+    lambdas = np.full((num_steps, num_pc), np.nan)
+    unit_eigenvecs = np.full((num_pc, num_steps, dim), np.nan)
     # V's are eigenvectors with norm equal to corresponding eigenvalue.
-    vs: Dict[int, list] = {k: [] for k in range(num_pc)}
-    unit_eigenvecs: Dict[int, list] = {k: [] for k in range(num_pc)}
+    vs = np.zeros((num_pc, dim))
+    start_idxs = np.full(num_pc, num_steps, dtype=np.int64)
     step = 0
-    for n in df.index:
+    for n in range(num_steps):
         # Initialize u(n).
-        u = df.loc[n].copy()
+        u = data[n].copy()
         for i in range(min(num_pc, step + 1)):
             # Initialize ith eigenvector.
             if i == step:
                 v = u.copy()
-                if np.linalg.norm(v):
-                    _LOG.debug("Initializing eigenvector %s...", i)
+                norm = np.sqrt(np.dot(v, v))
+                if norm != 0:
                     step += 1
+                if start_idxs[i] == num_steps:
+                    start_idxs[i] = n
             else:
-                # Main update step for eigenvector i.
-                u, v = _compute_ipca_step(u, vs[i][-1], alpha)
+                # Main update step for eigenvector i (see `_compute_ipca_step()`).
+                v_prev = vs[i]
+                norm_prev = np.sqrt(np.dot(v_prev, v_prev))
+                if norm_prev == 0:
+                    v = v_prev * 0
+                else:
+                    dot = np.dot(u, v_prev)
+                    v = (1 - alpha) * v_prev + alpha * u * dot / norm_prev
+                    u = u - dot * v_prev / (norm_prev**2)
+                norm = np.sqrt(np.dot(v, v))
             # Bookkeeping.
-            v.name = n
-            vs[i].append(v)
-            norm = np.linalg.norm(v)
-            lambdas[i].append(norm)
-            unit_eigenvecs[i].append(v / norm)
-    _LOG.debug("Completed %s steps of incremental PCA.", len(df))
-    # Convert lambda dict of lists to list of series.
-    # Convert unit_eigenvecs dict of lists to list of dataframes.
-    lambdas_srs = []
-    unit_eigenvec_dfs = []
-    for i in range(num_pc):
-        lambdas_srs.append(
-            pd.Series(index=df.index[-len(lambdas[i]) :], data=lambdas[i])
-        )
-        unit_eigenvec_dfs.append(pd.concat(unit_eigenvecs[i], axis=1).transpose())
-    lambda_df = pd.concat(lambdas_srs, axis=1)
-    return lambda_df, unit_eigenvec_dfs
+            vs[i] = v
+            lambdas[n, i] = norm
+            if norm != 0:
+                unit_eigenvecs[i, n] = v / norm
+    return lambdas, unit_eigenvecs, start_idxs
 
 
 def _compute_ipca_step(
@@ -123,6 +123,23 @@ class Test_compute_ipca(hunitest.TestCase):
         )
         self.check_string(txt)
 
+    def test7(self) -> None:
+        """
+        Test for an input with all zeros, where only the first component is
+        (unsuccessfully) initialized.
+        """
+        df = self._get_df(seed=1)
+        df.iloc[:, :] = 0
+        num_pc = 3
+        tau = 16
+        lambda_df, unit_eigenvec_dfs = csprinpc.compute_ipca(df, num_pc, tau)
+        self.assertEqual(list(lambda_df.columns), [0, 1, 2])
+        self.assertTrue((lambda_df[0] == 0).all())
+        self.assertTrue(lambda_df[[1, 2]].isna().all().all())
+        self.assertEqual(unit_eigenvec_dfs[0].shape, df.shape)
+        self.assertTrue(unit_eigenvec_dfs[0].isna().all().all())
+        self.assertEqual(unit_eigenvec_dfs[1].shape, (0, df.shape[1]))
+
     @staticmethod
     def _get_df(seed: int) -> pd.DataFrame:
         """
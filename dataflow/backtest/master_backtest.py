@@ -112,10 +112,15 @@ def run_tiled_rolling_backtest(
     dst_dir = os.path.join(
         system.config["backtest_config", "dst_dir"], "fit_results"
     )
+    # The retraining windows can be evaluated in parallel, each one on a copy of
+    # the DAG.
+    num_threads = system.config.get(
+        ("backtest_config", "num_threads"), default_value="serial"
+    )
     # This loop corresponds to evaluating the model on a tile, but it's done in
     # chunks to do fit / predict.
     pred_rbs = []
-    for idx, data in enumerate(dag_runner.fit_predict()):
+    for idx, data in enumerate(dag_runner.fit_predict(num_threads=num_threads)):
         training_datetime_str, fit_rb, pred_rb = data
         _LOG.debug(hprint.to_str("idx training_datetime_str"))
         _LOG.debug("fit_rb=\n%s", str(fit_rb))
@@ -11,6 +11,15 @@ Run a list of experiments consisting of multiple model runs based on the passed:
     --dst_dir experiment1 \
     --num_threads 2
 
+# Run the same pipeline in 2 long-lived worker processes, instead of starting a
+# process for each config:
+> run_config_list.py \
+    --experiment_builder "dataflow.backtest.master_backtest.run_experiment" \
+    --config_builder "dataflow_lm.RH1E.config.build_15min_model_configs()" \
+    --dst_dir experiment1 \
+    --num_threads 2 \
+    --worker_pool
+
 Import as:
 
 import dataflow.backtest.run_config_list as dtfmoruexp
@@ -18,12 +27,15 @@ import dataflow.backtest.run_config_list as dtfmoruexp
 
 
 import argparse
+import contextlib
 import logging
 import os
-from typing import cast
+from typing import Iterator, cast
 
 import core.config as cconfig
 import dataflow.backtest.dataflow_backtest_utils as dtfbdtfbaut
+import dataflow.backtest.run_config_stub as dtfmruexst
+import dataflow.system as dtfsys
 import helpers.hdatetime as hdateti
 import helpers.hdbg as hdbg
 import helpers.hgit as hgit
@@ -39,6 +51,17 @@ _LOG = logging.getLogger(__name__)
 # #############################################################################
 
 
+def _get_log_file(config: cconfig.Config) -> str:
+    """
+    Get the file storing the log of running a config.
+    """
+    idx = config[("backtest_config", "id")]
+    experiment_result_dir = config[("backtest_config", "experiment_result_dir")]
+    log_file = os.path.join(experiment_result_dir, "run_config_list.%s.log" % idx)
+    log_file = os.path.abspath(os.path.abspath(log_file))
+    return log_file
+
+
 def _run_config_stub(
     config: cconfig.Config,
     #
@@ -67,11 +90,9 @@ def _run_config_stub(
     _LOG.info("config=\n%s", config)
     #
     dst_dir = config[("backtest_config", "dst_dir")]
-    # Prepare the log file.
     # TODO(gp): -> experiment_dst_dir
     experiment_result_dir = config[("backtest_config", "experiment_result_dir")]
-    log_file = os.path.join(experiment_result_dir, "run_config_list.%s.log" % idx)
-    log_file = os.path.abspath(os.path.abspath(log_file))
+    log_file = _get_log_file(config)
     experiment_builder = config[("backtest_config", "experiment_builder")]
     config_builder = config[("backtest_config", "config_builder")]
     cmd = [
@@ -103,6 +124,83 @@ def _run_config_stub(
     return rc
 
 
+@contextlib.contextmanager
+def _log_to_file(log_file: str) -> Iterator[None]:
+    """
+    Save the log and the output printed in the scope to `log_file`.
+    """
+    root_logger = logging.getLogger()
+    level = root_logger.level
+    with open(log_file, "w") as f:
+        file_handler = logging.StreamHandler(f)
+        file_handler.setLevel(logging.INFO)
+        file_handler.setFormatter(
+            logging.Formatter(
+                "%(asctime)s %(levelname)-5s %(module)s:%(lineno)d %(message)s"
+            )
+        )
+        root_logger.addHandler(file_handler)
+        # Log at least at INFO level, like `run_config_stub.py -v INFO`.
+        root_logger.setLevel(min(level, logging.INFO))
+        try:
+            with contextlib.redirect_stdout(f), contextlib.redirect_stderr(f):
+                yield
+        finally:
+            root_logger.removeHandler(file_handler)
+            root_logger.setLevel(level)
+
+
+def _run_config_in_worker(
+    config: cconfig.Config,
+    #
+    incremental: bool,
+    num_attempts: int,
+) -> int:
+    """
+    Run a pipeline for a specific `Config` in the current process.
+
+    This is used to run configs in long-lived worker processes, which import
+    the code once and keep a cache of the data across configs (see
+    `dtfsys.enable_im_client_cache()`), instead of starting a process for each
+    config like `_run_config_stub()` does.
+
+    Params are the same as in `_run_config_stub()`.
+    """
+    hdbg.dassert_eq(1, num_attempts, "Multiple attempts not supported yet")
+    _ = incremental
+    #
+    dtfbdtfbaut.setup_experiment_dir(config)
+    idx = config[("backtest_config", "id")]
+    _LOG.info("\n%s", hprint.frame(f"Executing experiment for config {idx}"))
+    _LOG.info("config=\n%s", config)
+    #
+    dtfsys.enable_im_client_cache(True)
+    dst_dir = config[("backtest_config", "dst_dir")]
+    experiment_result_dir = config[("backtest_config", "experiment_result_dir")]
+    log_file = _get_log_file(config)
+    experiment_builder = config[("backtest_config", "experiment_builder")]
+    config_builder = config[("backtest_config", "config_builder")]
+    # Execute.
+    with _log_to_file(log_file):
+        try:
+            dtfmruexst.run_config(
+                experiment_builder, config_builder, idx, dst_dir
+            )
+            error = False
+        except Exception:  # pylint: disable=broad-except
+            # Save the stack trace in the log of the config.
+            _LOG.exception("Execution failed")
+            error = True
+    if error:
+        msg = f"Execution failed for experiment {idx}"
+        _LOG.error(msg)
+        raise RuntimeError(msg)
+    # Mark as success.
+    dtfbdtfbaut.mark_config_as_success(experiment_result_dir)
+    rc = 0
+    return rc
+
+
 def _get_joblib_workload(args: argparse.Namespace) -> hjoblib.Workload:
     """
     Prepare the joblib workload by building all the Configs using the
@@ -121,8 +219,12 @@ def _get_joblib_workload(args: argparse.Namespace) -> hjoblib.Workload:
         )
         tasks.append(task)
     #
-    func_name = "_run_config_stub"
-    workload = (_run_config_stub, func_name, tasks)
+    if args.worker_pool:
+        workload_func = _run_config_in_worker
+    else:
+        workload_func = _run_config_stub
+    func_name = workload_func.__name__
+    workload = (workload_func, func_name, tasks)
     hjoblib.validate_workload(workload)
     return workload
 
@@ -145,6 +247,12 @@ def _parse() -> argparse.ArgumentParser:
         required=True,
         help="File storing the pipeline to iterate over",
     )
+    parser.add_argument(
+        "--worker_pool",
+        action="store_true",
+        help="Run the configs in long-lived worker processes that share a data "
+        "cache, instead of starting a process for each config",
+    )
     parser.add_argument(
         "--archive_on_S3",
         action="store_true",
@@ -181,10 +289,13 @@ def _main(parser: argparse.ArgumentParser) -> None:
     log_file = os.path.join(dst_dir, f"log.{timestamp}.txt")
     _LOG.info("log_file='%s'", log_file)
     # Execute.
-    # backend = "loky"
-    # TODO(gp): Is this the correct backend? It might not matter since we spawn
-    # a process with system.
-    backend = "asyncio_threading"
+    if args.worker_pool:
+        # The `loky` workers are reused across the tasks.
+        backend = "loky"
+    else:
+        # TODO(gp): Is this the correct backend? It might not matter since we
+        #  spawn a process with system.
+        backend = "asyncio_threading"
     hjoblib.parallel_execute(
         workload,
         dry_run,
@@ -83,19 +83,26 @@ def _parse() -> argparse.ArgumentParser:
 # ```
 
 
-def _main(parser: argparse.ArgumentParser) -> None:
-    args = parser.parse_args()
-    report_memory_usage = True
-    # report_memory_usage = True
-    hdbg.init_logger(
-        verbosity=args.log_level, report_memory_usage=report_memory_usage
-    )
+def run_config(
+    experiment_builder: str, config_builder: str, config_idx: int, dst_dir: str
+) -> None:
+    """
+    Run the `config_idx`-th config built by `config_builder`.
+
+    This is also used by `run_config_list.py` to run configs in long-lived
+    worker processes.
+
+    :param experiment_builder: e.g.,
+        `dataflow.backtest.master_backtest.run_experiment`
+    :param config_builder: e.g., `nlp.build_configs.build_PTask1088_configs()`
+    :param config_idx: index of the config to run
+    :param dst_dir: dst dir for the entire experiment list
+    """
     # 1) Get the actual config to execute using the command line parameters.
-    config_idx = int(args.config_idx)
     experiment_list_params = {
-        "experiment_builder": args.experiment_builder,
-        "config_builder": args.config_builder,
-        "dst_dir": args.dst_dir,
+        "experiment_builder": experiment_builder,
+        "config_builder": config_builder,
+        "dst_dir": dst_dir,
     }
     config_list = cconfig.get_config_from_experiment_list_params(
         config_idx, experiment_list_params
@@ -103,7 +110,6 @@ def _main(parser: argparse.ArgumentParser) -> None:
     hdbg.dassert_isinstance(config_list, cconfig.ConfigList)
     _LOG.info("config_list=\n%s", config_list)
     # 2) Execute the `experiment_builder` passing the config to execute.
-    experiment_builder = args.experiment_builder
     # E.g., `amp.dataflow.backtest.master_backtest.run_tiled_backtest`.
     _LOG.info("experiment_builder='%s'", experiment_builder)
     hdbg.dassert(
@@ -131,5 +137,20 @@ def _main(parser: argparse.ArgumentParser) -> None:
     exec(python_code)  # pylint: disable=exec-used
 
 
+def _main(parser: argparse.ArgumentParser) -> None:
+    args = parser.parse_args()
+    report_memory_usage = True
+    # report_memory_usage = True
+    hdbg.init_logger(
+        verbosity=args.log_level, report_memory_usage=report_memory_usage
+    )
+    run_config(
+        args.experiment_builder,
+        args.config_builder,
+        int(args.config_idx),
+        args.dst_dir,
+    )
+
+
 if __name__ == "__main__":
     _main(_parse())
@@ -83,6 +83,24 @@ class TestRunExperimentSuccess1(hunitest.TestCase):
         exp_pass = True
         _run_config_list_helper(self, cmd_opts, exp_pass, self.EXPECTED_OUTCOME)
 
+    @pytest.mark.slow
+    def test_worker_pool1(self) -> None:
+        """
+        Execute:
+        - two experiments (without any failure)
+        - serially
+        - in the current process
+        """
+        cmd_opts = [
+            "--config_builder 'dev_scripts.test.test_run_notebook.build_config_list1()'",
+            "--num_threads 'serial'",
+            "--worker_pool",
+            "--aws_profile 'am'",
+        ]
+        #
+        exp_pass = True
+        _run_config_list_helper(self, cmd_opts, exp_pass, self.EXPECTED_OUTCOME)
+
     @pytest.mark.skip(reason="Fix test run notebooks glitch CmTask #2792.")
     @pytest.mark.slow
     def test_parallel1(self) -> None:
@@ -165,6 +183,25 @@ class TestRunExperimentFail2(hunitest.TestCase):
         exp_pass = True
         _run_config_list_helper(self, cmd_opts, exp_pass, self.EXPECTED_OUTCOME)
 
+    @pytest.mark.slow
+    def test_worker_pool1(self) -> None:
+        """
+        Execute:
+        - 3 experiments with one failing
+        - with 2 worker processes
+        - skipping on error
+        """
+        cmd_opts = [
+            "--config_builder 'dev_scripts.test.test_run_notebook.build_config_list2()'",
+            "--skip_on_error",
+            "--num_threads 2",
+            "--worker_pool",
+            "--aws_profile 'am'",
+        ]
+        #
+        exp_pass = True
+        _run_config_list_helper(self, cmd_opts, exp_pass, self.EXPECTED_OUTCOME)
+
     @pytest.mark.skip(reason="Fix test run notebooks glitch CmTask #2792.")
     @pytest.mark.slow
     def test_parallel1(self) -> None:
@@ -9,6 +9,9 @@ from dataflow.core.dag_builder import *  # pylint: disable=unused-import # NOQA
 from dataflow.core.dag_builder_example import *  # pylint: disable=unused-import # NOQA
 from dataflow.core.dag_runner import *  # pylint: disable=unused-import # NOQA
 from dataflow.core.node import *  # pylint: disable=unused-import # NOQA
+from dataflow.core.node_io_log import *  # pylint: disable=unused-import # NOQA
+from dataflow.core.node_io_manifest import *  # pylint: disable=unused-import # NOQA
+from dataflow.core.node_output_cache import *  # pylint: disable=unused-import # NOQA
 from dataflow.core.nodes.base import *  # pylint: disable=unused-import # NOQA
 from dataflow.core.nodes.local_level_model import *  # pylint: disable=unused-import # NOQA
 from dataflow.core.nodes.regression_models import *  # pylint: disable=unused-import # NOQA
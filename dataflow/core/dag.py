@@ -4,17 +4,31 @@ Import as:
 import dataflow.core.dag as dtfcordag
 """
 
+import concurrent.futures
 import itertools
 import json
 import logging
 import os
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union, cast
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
 
 import networkx as networ
 import pandas as pd
 from tqdm.autonotebook import tqdm
 
 import dataflow.core.node as dtfcornode
+import dataflow.core.node_io_log as dtfcnoiolo
+import dataflow.core.node_io_manifest as dtfcnoioma
+import dataflow.core.node_output_cache as dtfcnoouca
 import helpers.hdatetime as hdateti
 import helpers.hdbg as hdbg
 import helpers.hio as hio
@@ -85,7 +99,19 @@ class DAG(hobject.PrintableMixin):
         self._save_node_io = ""
         self._profile_execution = False
         self._dst_dir: Optional[str] = None
+        # Deallocate the output of a node as soon as all the nodes reading it
+        # have been executed. The outputs that are not read by other nodes
+        # (e.g., the ones of the sinks) are kept.
         self.force_free_nodes = False
+        # Number of threads used to run the nodes whose predecessors have
+        # already been executed. "serial" runs one node at a time in
+        # topological order.
+        self.num_threads: Union[str, int] = "serial"
+        # Cache storing node outputs across runs, keyed by node parameters and
+        # input data.
+        self.node_output_cache: Optional[dtfcnoouca.NodeOutputCache] = None
+        # Writer of the node outputs when `save_node_io="df_as_pq_log"`.
+        self.node_io_log_writer: Optional[dtfcnoiolo.NodeIoLogWriter] = None
         self.set_debug_mode(
             self._save_node_io, self._profile_execution, self._dst_dir
         )
@@ -146,13 +172,23 @@ class DAG(hobject.PrintableMixin):
             - `df_as_csv`: save the full content of the node interface, using CSV for
               dataframes
             - `df_as_parquet`: like `df_as_csv` but using Parquet for dataframes
+            - `df_as_pq_log`: save the outputs of the nodes in a log storing
+              only the rows that change from bar to bar (see
+              `NodeIoLogWriter`), from a background thread
         :param profile_execution: if not `None`, store information about the
             execution of the nodes
         :param dst_dir: directory to save node interface and execution profiling info
         """
         hdbg.dassert_in(
             save_node_io,
-            ("", "stats", "df_as_csv", "df_as_pq", "df_as_csv_and_pq"),
+            (
+                "",
+                "stats",
+                "df_as_csv",
+                "df_as_pq",
+                "df_as_csv_and_pq",
+                "df_as_pq_log",
+            ),
         )
         _LOG.debug(hprint.to_str("save_node_io profile_execution dst_dir"))
         self._save_node_io = save_node_io
@@ -162,6 +198,11 @@ class DAG(hobject.PrintableMixin):
         # ```
         self._profile_execution = profile_execution
         self._dst_dir = dst_dir
+        # Stop writing the log of the previous settings, before its dir can be
+        # cleaned up.
+        if self.node_io_log_writer is not None:
+            self.node_io_log_writer.close()
+            self.node_io_log_writer = None
         if self._dst_dir:
             hio.create_dir(self._dst_dir, incremental=False)
         if self._save_node_io or self._profile_execution:
@@ -172,6 +213,18 @@ class DAG(hobject.PrintableMixin):
             hdbg.dassert_is_not(
                 dst_dir, None, "Need to specify a directory to save the data"
             )
+        if self._save_node_io == "df_as_pq_log":
+            log_dir = os.path.join(cast(str, dst_dir), "node_io.log")
+            self.node_io_log_writer = dtfcnoiolo.NodeIoLogWriter(log_dir)
+
+    def flush_node_io_log(self) -> None:
+        """
+        Wait until the outputs of the nodes are written in the node io log.
+
+        This is a no-op unless `save_node_io="df_as_pq_log"`.
+        """
+        if self.node_io_log_writer is not None:
+            self.node_io_log_writer.flush()
 
     @property
     def nx_dag(self) -> networ.DiGraph:
@@ -459,8 +512,8 @@ class DAG(hobject.PrintableMixin):
             `get_outputs(method)`
         """
         sinks = self.get_sinks()
-        for id_, nid in enumerate(networ.topological_sort(self._nx_dag)):
-            self._run_node(id_, nid, method)
+        nids = list(networ.topological_sort(self._nx_dag))
+        self._run_nodes(nids, method)
         return {sink: self.get_node(sink).get_outputs(method) for sink in sinks}
 
     def run_leq_node(
@@ -489,13 +542,9 @@ class DAG(hobject.PrintableMixin):
         )
         # The `ancestors` filter only returns nodes strictly less than `nid`,
         # and so we need to add `nid` back.
-        nids = itertools.chain(ancestors, [nid])
+        nids = list(itertools.chain(ancestors, [nid]))
         # Execute all the ancestors of `nid`.
-        if progress_bar:
-            nids = tqdm(list(nids), desc="run_leq_node")
-        for id_, pred_nid in enumerate(nids):
-            _LOG.debug("Executing node '%s'", pred_nid)
-            self._run_node(id_, pred_nid, method)
+        self._run_nodes(nids, method, progress_bar=progress_bar)
         # Retrieve the output the node.
         node = self.get_node(nid)
         node_output = node.get_outputs(method)
@@ -503,6 +552,165 @@ class DAG(hobject.PrintableMixin):
 
     # /////////////////////////////////////////////////////////////////////////////
 
+    def _run_nodes(
+        self,
+        nids: List[dtfcornode.NodeId],
+        method: dtfcornode.Method,
+        *,
+        progress_bar: bool = False,
+    ) -> None:
+        """
+        Run `method` on the nodes `nids`, sorted in topological order.
+
+        If `self.num_threads` is "serial" the nodes are run one at a time.
+        Otherwise a node is scheduled on a thread pool as soon as all its
+        predecessors in `nids` have been executed, so that independent
+        branches of the DAG run concurrently.
+        """
+        _LOG.debug(hprint.to_str("nids method"))
+        if self.num_threads == "serial":
+            nids_iter: Iterable[dtfcornode.NodeId] = nids
+            if progress_bar:
+                nids_iter = tqdm(nids, desc="run_leq_node")
+            num_consumers = self._get_num_consumers(nids)
+            for id_, nid in enumerate(nids_iter):
+                _LOG.debug("Executing node '%s'", nid)
+                self._run_node(id_, nid, method)
+                self._free_consumed_outputs(nid, method, num_consumers)
+        else:
+            self._run_nodes_in_parallel(nids, method, progress_bar=progress_bar)
+
+    def _get_num_consumers(
+        self, nids: List[dtfcornode.NodeId]
+    ) -> Dict[Tuple[dtfcornode.NodeId, str], int]:
+        """
+        Count how many inputs of the nodes `nids` read each node output.
+
+        :return: `(nid, output_name)` -> number of consumers among `nids`. The
+            outputs that are not read by any node in `nids` (e.g., the outputs
+            of the sinks) are not included
+        """
+        num_consumers: Dict[Tuple[dtfcornode.NodeId, str], int] = {}
+        if not self.force_free_nodes:
+            return num_consumers
+        nids_set = set(nids)
+        for nid in nids:
+            for pred_nid in self._nx_dag.predecessors(nid):
+                if pred_nid not in nids_set:
+                    continue
+                kvs = self._nx_dag.edges[[pred_nid, nid]]
+                for output_name in kvs.values():
+                    key = (pred_nid, output_name)
+                    num_consumers[key] = num_consumers.get(key, 0) + 1
+        return num_consumers
+
+    def _free_consumed_outputs(
+        self,
+        nid: dtfcornode.NodeId,
+        method: dtfcornode.Method,
+        num_consumers: Dict[Tuple[dtfcornode.NodeId, str], int],
+    ) -> None:
+        """
+        Account for node `nid` having read its inputs and deallocate the
+        outputs of its predecessors that have no consumers left.
+
+        :param num_consumers: as returned by `_get_num_consumers()`, updated
+            in place
+        """
+        if not self.force_free_nodes:
+            return
+        for pred_nid in self._nx_dag.predecessors(nid):
+            kvs = self._nx_dag.edges[[pred_nid, nid]]
+            for output_name in kvs.values():
+                key = (pred_nid, output_name)
+                if key not in num_consumers:
+                    continue
+                num_consumers[key] -= 1
+                hdbg.dassert_lte(0, num_consumers[key])
+                if num_consumers[key] == 0:
+                    _LOG.debug(
+                        "Deallocating output '%s' of nid='%s'",
+                        output_name,
+                        pred_nid,
+                    )
+                    pred_node = self.get_node(pred_nid)
+                    pred_node.free_output(method, output_name)
+
+    def _run_nodes_in_parallel(
+        self,
+        nids: List[dtfcornode.NodeId],
+        method: dtfcornode.Method,
+        *,
+        progress_bar: bool = False,
+    ) -> None:
+        """
+        Run `method` on the nodes `nids` using a thread pool.
+
+        Each node keeps the topological id it has in `nids`, so that the
+        artifacts written by `_run_node()` (e.g., node io and profiling info)
+        are the same as in serial mode.
+        """
+        num_threads = int(self.num_threads)
+        hdbg.dassert_lte(1, num_threads)
+        topological_ids = {nid: id_ for id_, nid in enumerate(nids)}
+        # Count the predecessors of each node that still need to be executed.
+        num_pending_preds = {
+            nid: sum(
+                1
+                for pred_nid in self._nx_dag.predecessors(nid)
+                if pred_nid in topological_ids
+            )
+            for nid in nids
+        }
+        num_consumers = self._get_num_consumers(nids)
+        pbar = (
+            tqdm(total=len(nids), desc="run_leq_node") if progress_bar else None
+        )
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=num_threads
+        ) as executor:
+            futures: Dict[concurrent.futures.Future, dtfcornode.NodeId] = {}
+
+            def _submit(nid: dtfcornode.NodeId) -> None:
+                _LOG.debug("Scheduling node '%s'", nid)
+                future = executor.submit(
+                    self._run_node, topological_ids[nid], nid, method
+                )
+                futures[future] = nid
+
+            # Schedule the nodes without pending predecessors (e.g., sources).
+            for nid in nids:
+                if num_pending_preds[nid] == 0:
+                    _submit(nid)
+            while futures:
+                done, _ = concurrent.futures.wait(
+                    futures, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    nid = futures.pop(future)
+                    exception = future.exception()
+                    if exception is not None:
+                        # Don't start any other node and propagate the error.
+                        for future_tmp in futures:
+                            future_tmp.cancel()
+                        raise exception
+                    if pbar is not None:
+                        pbar.update(1)
+                    # Outputs are freed by this thread only, after the node
+                    # reading them has completed.
+                    self._free_consumed_outputs(nid, method, num_consumers)
+                    # Schedule the successors that became ready.
+                    for succ_nid in self._nx_dag.successors(nid):
+                        if succ_nid not in num_pending_preds:
+                            continue
+                        num_pending_preds[succ_nid] -= 1
+                        if num_pending_preds[succ_nid] == 0:
+                            _submit(succ_nid)
+        if pbar is not None:
+            pbar.close()
+
+    # /////////////////////////////////////////////////////////////////////////////
+
     def _to_json(self) -> str:
         # Get internal networkx representation of the DAG.
         graph: networ.classes.digraph.DiGraph = self.nx_dag
@@ -609,6 +817,10 @@ class DAG(hobject.PrintableMixin):
                 node_io.data/
                     predict.0.read_data.df_out.20220808_161500.csv
         ```
+        The Parquet files are indexed in `node_io.data/manifest.csv` (see
+        `node_io_manifest.py`).
+        With `save_node_io="df_as_pq_log"` the dataframes are passed to
+        `node_io_log_writer` and saved in `{dst_dir}/node_io.log`.
 
         :param: similar to `_write_prof_stats_to_dst_dir()`
         """
@@ -616,6 +828,26 @@ class DAG(hobject.PrintableMixin):
         bar_timestamp = hwacltim.get_current_bar_timestamp(as_str=True)
         wall_clock_time = self._get_wall_clock_time()
         wall_clock_time_str = wall_clock_time.strftime("%Y%m%d_%H%M%S")
+        if self.node_io_log_writer is not None:
+            if isinstance(obj, pd.Series):
+                obj = pd.DataFrame(obj)
+            if isinstance(obj, pd.DataFrame):
+                # Skip the text summary of the df since computing it would
+                # delay the execution of the DAG.
+                self.node_io_log_writer.write(
+                    f"{method}.{topological_id}.{nid}",
+                    output_name,
+                    bar_timestamp,
+                    wall_clock_time_str,
+                    obj,
+                )
+            else:
+                _LOG.warning(
+                    "Can't save node input / output of type '%s': %s",
+                    str(type(obj)),
+                    obj,
+                )
+            return
         basename = f"{method}.{topological_id}.{nid}.{output_name}.{bar_timestamp}.{wall_clock_time_str}"
         file_name = os.path.join(dst_dir, "node_io.data", basename)
         #
@@ -646,6 +878,18 @@ class DAG(hobject.PrintableMixin):
                 hparque.to_parquet(df, parquet_file_name)
             else:
                 raise ValueError(f"Invalid save_node_io='{self._save_node_io}'")
+            if self._save_node_io in ("df_as_pq", "df_as_csv_and_pq"):
+                # Index the Parquet file so that readers don't need to list
+                # and parse the file names.
+                dtfcnoioma.append_to_manifest(
+                    os.path.dirname(file_name),
+                    f"{method}.{topological_id}.{nid}",
+                    output_name,
+                    str(bar_timestamp),
+                    wall_clock_time_str,
+                    parquet_file_name,
+                    df,
+                )
             _LOG.debug("Saved log dir in '%s'", file_name)
         else:
             _LOG.warning(
@@ -689,25 +933,27 @@ class DAG(hobject.PrintableMixin):
             for input_name, value in kvs.items():
                 # Retrieve output from store.
                 kwargs[input_name] = pred_node.get_output(method, value)
-                if self.force_free_nodes:
-                    _LOG.warning(
-                        "Forcing deallocation of pred_node=%s", pred_node
-                    )
-                    # TODO(gp): We should move this after using the data deallocating
-                    # all the nodes whose output has been used. For linear pipelines,
-                    # this check is not needed.
-                    pred_node.free()
             # TODO(gp): Save info for inputs, if needed.
         _LOG.debug("kwargs are %s", kwargs)
         # Execute `node.method()`.
         with htimer.TimedScope(logging.DEBUG, "node_execution") as ts:
             node = self.get_node(nid)
-            try:
-                output = getattr(node, method)(**kwargs)
-            except AttributeError as e:
-                raise AttributeError(
-                    f"An exception occurred in node '{nid}'\n{str(e)}"
-                ) from e
+            # Look up the output in the cache, if needed.
+            cache_key = None
+            output = None
+            if self.node_output_cache is not None:
+                cache_key = self.node_output_cache.get_key(node, method, kwargs)
+                if cache_key is not None:
+                    output = self.node_output_cache.load(cache_key, node, method)
+            if output is None:
+                try:
+                    output = getattr(node, method)(**kwargs)
+                except AttributeError as e:
+                    raise AttributeError(
+                        f"An exception occurred in node '{nid}'\n{str(e)}"
+                    ) from e
+                if cache_key is not None:
+                    self.node_output_cache.save(cache_key, node, method, output)
         # Update the node.
         for output_name in node.output_names:
             value = output[output_name]
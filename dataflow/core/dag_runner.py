@@ -5,14 +5,17 @@ import dataflow.core.dag_runner as dtfcodarun
 """
 
 import abc
+import copy
 import logging
-from typing import Generator, List, Optional, Tuple
+from typing import Any, Generator, List, Optional, Tuple, Union
 
+import joblib
 import pandas as pd
 
 import core.config as cconfig
 import dataflow.core.dag as dtfcordag
 import dataflow.core.node as dtfcornode
+import dataflow.core.nodes.base as dtfconobas
 import dataflow.core.result_bundle as dtfcorebun
 import dataflow.core.utils as dtfcorutil
 import dataflow.core.visitors as dtfcorvisi
@@ -196,6 +199,7 @@ class FitPredictDagRunner(DagRunner):
 
     def _run_dag(self, method: dtfcornode.Method) -> dtfcorebun.ResultBundle:
         df_out, info = self._run_dag_helper(method)
+        self.dag.flush_node_io_log()
         return self._to_result_bundle(method, df_out, info)
 
 
@@ -218,6 +222,7 @@ class PredictionDagRunner(FitPredictDagRunner):
         Same as super class but return a `PredictionResultBundle`.
         """
         df_out, info = self._run_dag_helper(method)
+        self.dag.flush_node_io_log()
         return dtfcorebun.PredictionResultBundle(
             config=self.config,
             result_nid=self._result_nid,
@@ -414,34 +419,85 @@ class RollingFitPredictDagRunner(DagRunner):
         _LOG.debug("df=%s", hpandas.df_to_str(df))
         return df
 
-    def fit_predict(self) -> Generator:
+    def fit_predict(
+        self,
+        *,
+        num_threads: Union[str, int] = "serial",
+        backend: str = "loky",
+    ) -> Generator:
         """
         Fit at each retraining date and predict until next retraining date.
 
+        The retraining windows don't depend on each other, so they can be
+        evaluated in parallel, each one on its own copy of the DAG. The results
+        are returned in the same order as in the serial mode and, before
+        returning the results of a window, its fit state is set on `self.dag`,
+        so that the caller can inspect the DAG as in the serial mode.
+
+        :param num_threads: number of windows to evaluate in parallel, or
+            "serial" to evaluate them one after the other on `self.dag`
+        :param backend: backend used by joblib (e.g., "loky", "threading")
         :return: the training time, fit `ResultBundle`, predict `ResultBundle`
         """
         _LOG.debug(
             "retraining_datetimes=%s",
             hpandas.df_to_str(self._retraining_datetimes),
         )
-        for row in self._retraining_datetimes.iterrows():
-            _LOG.debug("row=%s", row)
-            _LOG.debug("fit/predict cycle=%d", row[0])
-            #
-            fit_start = row[1].fit_start
-            fit_end = row[1].fit_end
-            fit_interval = (fit_start, fit_end)
-            fit_result_bundle = self._run_fit(fit_interval)
-            #
-            predict_start = row[1].predict_start
-            predict_end = row[1].predict_end
-            predict_interval = (fit_start, predict_end)
-            predict_result_bundle = self._run_predict(
-                predict_interval, predict_start
+        rows = list(self._retraining_datetimes.iterrows())
+        if num_threads == "serial":
+            for row in rows:
+                yield self._fit_predict_window(row)
+            self.dag.flush_node_io_log()
+        else:
+            num_threads = int(num_threads)
+            hdbg.dassert_lte(1, num_threads)
+            _LOG.info(
+                "Evaluating %s retraining windows with num_threads=%s backend=%s",
+                len(rows),
+                num_threads,
+                backend,
             )
-            # TODO(gp): Better to return a pd.Timestamp rather than its representation.
-            training_datetime_str = fit_start.strftime("%Y%m%d_%H%M%S")
-            yield training_datetime_str, fit_result_bundle, predict_result_bundle
+            # With a process-based backend each worker receives its own copy of
+            # the runner through pickling, while with threads the runner needs
+            # to be copied explicitly, since a window mutates the DAG.
+            copy_dag_runner = backend == "threading"
+            tasks = (
+                joblib.delayed(_fit_predict_window_in_worker)(
+                    copy.deepcopy(self) if copy_dag_runner else self, row
+                )
+                for row in rows
+            )
+            results = joblib.Parallel(n_jobs=num_threads, backend=backend)(tasks)
+            for result, fit_state in results:
+                if fit_state is not None:
+                    dtfcorvisi.set_fit_state(self.dag, fit_state)
+                yield result
+
+    def _fit_predict_window(
+        self, row: Tuple[Any, pd.Series]
+    ) -> Tuple[str, dtfcorebun.ResultBundle, dtfcorebun.ResultBundle]:
+        """
+        Fit and predict on one retraining window.
+
+        :param row: row of `self._retraining_datetimes` as returned by
+            `iterrows()`
+        :return: the training time, fit `ResultBundle`, predict `ResultBundle`
+        """
+        _LOG.debug("row=%s", row)
+        _LOG.debug("fit/predict cycle=%d", row[0])
+        #
+        fit_start = row[1].fit_start
+        fit_end = row[1].fit_end
+        fit_interval = (fit_start, fit_end)
+        fit_result_bundle = self._run_fit(fit_interval)
+        #
+        predict_start = row[1].predict_start
+        predict_end = row[1].predict_end
+        predict_interval = (fit_start, predict_end)
+        predict_result_bundle = self._run_predict(predict_interval, predict_start)
+        # TODO(gp): Better to return a pd.Timestamp rather than its representation.
+        training_datetime_str = fit_start.strftime("%Y%m%d_%H%M%S")
+        return training_datetime_str, fit_result_bundle, predict_result_bundle
 
     @staticmethod
     def _left_align_timestamp_on_grid(
@@ -504,6 +560,29 @@ class RollingFitPredictDagRunner(DagRunner):
         return self._to_result_bundle(method, df_out, info)
 
 
+def _fit_predict_window_in_worker(
+    dag_runner: RollingFitPredictDagRunner, row: Tuple[Any, pd.Series]
+) -> Tuple[
+    Tuple[str, dtfcorebun.ResultBundle, dtfcorebun.ResultBundle], Optional[Any]
+]:
+    """
+    Fit and predict on one retraining window in a worker.
+
+    :param dag_runner: runner owned by the worker
+    :return: the result of `_fit_predict_window()` and the fit state of the
+        DAG after fitting the window, or `None` if the DAG has nodes without a
+        fit state
+    """
+    result = dag_runner._fit_predict_window(row)
+    dag = dag_runner.dag
+    has_fit_state = all(
+        isinstance(dag.get_node(nid), dtfconobas.FitPredictNode)
+        for nid in dag.nx_dag.nodes()
+    )
+    fit_state = dtfcorvisi.get_fit_state(dag) if has_fit_state else None
+    return result, fit_state
+
+
 # #############################################################################
 # IncrementalDagRunner
 # #############################################################################
@@ -524,6 +603,8 @@ class IncrementalDagRunner(DagRunner):
         end_timestamp: pd.Timestamp,
         freq: str,
         fit_state: cconfig.Config,
+        *,
+        history_lookback: Optional[pd.Timedelta] = None,
     ) -> None:
         """
         Constructor.
@@ -537,12 +618,23 @@ class IncrementalDagRunner(DagRunner):
             of the underlying DAG)
         :param fit_state: Config containing any learned state required for
             initializing the DAG
+        :param history_lookback: amount of history fed to the DAG at each
+            prediction step, i.e., data in `[dt - history_lookback, dt]`
+            - `None` means all the data up to `dt`, so that running N steps
+              costs O(N^2)
+            - a bounded lookback makes each step cost O(history_lookback), as
+              long as it covers the warm-up period of the nodes in the DAG
+              (e.g., the span of the EMAs and of the rolling windows)
         """
         super().__init__(dag)
         self._start_timestamp = start_timestamp
         self._end_timestamp = end_timestamp
         self._freq = freq
         self._fit_state = fit_state
+        if history_lookback is not None:
+            hdbg.dassert_isinstance(history_lookback, pd.Timedelta)
+            hdbg.dassert_lt(pd.Timedelta(0), history_lookback)
+        self._history_lookback = history_lookback
         dtfcorvisi.set_fit_state(self.dag, self._fit_state)
         # Create predict range.
         self._date_range = pd.date_range(
@@ -563,6 +655,7 @@ class IncrementalDagRunner(DagRunner):
         for end_dt in self._date_range:
             result_bundle = self.predict_at_datetime(end_dt)
             yield result_bundle
+        self.dag.flush_node_io_log()
 
     # TODO(gp): dt -> timestamp as used elsewhere.
     def predict_at_datetime(
@@ -574,9 +667,15 @@ class IncrementalDagRunner(DagRunner):
         :param dt: point in time at which to generate a prediction
         :return: populated `ResultBundle`
         """
-        # Cut off data at `end_dt`. Do not restrict the start datetime_ so
-        # so as not to adversely affect any required warm-up period.
-        interval = [(None, dt)]
+        # Cut off data at `end_dt`.
+        if self._history_lookback is None:
+            # Do not restrict the start datetime_ so as not to adversely affect
+            # any required warm-up period.
+            start_dt = None
+        else:
+            # Feed only the history needed to warm up the nodes.
+            start_dt = pd.Timestamp(dt) - self._history_lookback
+        interval = [(start_dt, dt)]
         # Set prediction intervals and predict.
         for input_nid in self.dag.get_sources():
             self.dag.get_node(input_nid).set_predict_intervals(interval)
@@ -137,6 +137,14 @@ class Node(_Node):
             output_name,
             self.nid,
         )
+        hdbg.dassert_in(
+            output_name,
+            self._output_vals[method],
+            "%s of node %s for %s has been deallocated!",
+            output_name,
+            self.nid,
+            method,
+        )
         return self._output_vals[method][output_name]
 
     def get_outputs(self, method: Method) -> NodeOutput:
@@ -219,6 +227,17 @@ class Node(_Node):
         #     only_warning=only_warning,
         # )
 
+    def free_output(self, method: Method, output_name: str) -> None:
+        """
+        Deallocate the value of output `output_name` for the requested `method`.
+
+        Note that this should be called only after all the consumers of the
+        output have used it.
+        """
+        hdbg.dassert_in(method, self._output_vals.keys())
+        hdbg.dassert_in(output_name, self._output_vals[method])
+        del self._output_vals[method][output_name]
+
     def _store_output(self, method: Method, output_name: str, value: Any) -> None:
         """
         Store the output for `name` and the specific `method`.
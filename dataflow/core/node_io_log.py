@@ -0,0 +1,500 @@
+"""
+Import as:
+
+import dataflow.core.node_io_log as dtfcnoiolo
+"""
+
+import atexit
+import collections
+import json
+import logging
+import os
+import queue
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import helpers.hdbg as hdbg
+import helpers.hio as hio
+import helpers.hprint as hprint
+
+_LOG = logging.getLogger(__name__)
+
+# Key of the Parquet metadata storing the information about a log entry.
+_METADATA_KEY = b"node_io_log"
+
+# Kinds of log entries.
+_SNAPSHOT = "snapshot"
+_DELTA = "delta"
+
+
+# #############################################################################
+# Log entries
+# #############################################################################
+
+
+# The log of the outputs of the nodes is stored as one Parquet file for each
+# bar, node, and output, e.g.,
+# ```
+# {log_dir}/
+#     predict.0.read_data.df_out.20221028_080000.20221028_080143.snapshot.parquet
+#     predict.0.read_data.df_out.20221028_080500.20221028_080643.delta.parquet
+#     ...
+# ```
+# where a file contains either:
+# - "snapshot": the entire output
+# - "delta": only the rows that are new or different with respect to the
+#   output of the previous bar, together with the first and the last index of
+#   the output, which allow to drop the rows that are not part of the output
+#   anymore (e.g., when the output contains a lookback window of data)
+
+
+def _get_file_name(
+    log_dir: str,
+    node_name: str,
+    output_name: str,
+    bar_timestamp: str,
+    wall_clock_timestamp: str,
+    kind: str,
+) -> str:
+    basename = ".".join(
+        [
+            node_name,
+            output_name,
+            bar_timestamp,
+            wall_clock_timestamp,
+            kind,
+            "parquet",
+        ]
+    )
+    file_name = os.path.join(log_dir, basename)
+    return file_name
+
+
+def _parse_file_name(basename: str) -> Tuple[str, str, str, str, str]:
+    """
+    Parse the name of a log entry file.
+
+    :return: node name (e.g., `predict.0.read_data`), output name (e.g.,
+        `df_out`), bar timestamp, wall clock timestamp, and kind of entry
+    """
+    prefix, bar_timestamp, wall_clock_timestamp, kind, ext = basename.rsplit(
+        ".", 4
+    )
+    hdbg.dassert_eq(ext, "parquet")
+    hdbg.dassert_in(kind, (_SNAPSHOT, _DELTA))
+    node_name, output_name = prefix.rsplit(".", 1)
+    return node_name, output_name, bar_timestamp, wall_clock_timestamp, kind
+
+
+def _label_to_json(label: Any) -> Dict[str, Any]:
+    """
+    Convert an index label into a JSON-serializable representation.
+
+    Labels that can't be restored exactly (e.g., tuples of a multi-index) are
+    stored as strings.
+    """
+    if isinstance(label, pd.Timestamp):
+        return {"timestamp": str(label)}
+    if isinstance(label, np.generic):
+        label = label.item()
+    if isinstance(label, (bool, int, float, str)):
+        return {"value": label}
+    return {"str": str(label)}
+
+
+def _label_from_json(label: Dict[str, Any]) -> Any:
+    if "timestamp" in label:
+        return pd.Timestamp(label["timestamp"])
+    if "str" in label:
+        return label["str"]
+    return label["value"]
+
+
+def _write_entry(
+    df: pd.DataFrame, file_name: str, metadata: Dict[str, Any]
+) -> None:
+    """
+    Save a log entry as Parquet, storing `metadata` in the file.
+    """
+    table = pa.Table.from_pandas(df)
+    table_metadata = dict(table.schema.metadata or {})
+    table_metadata[_METADATA_KEY] = json.dumps(metadata).encode()
+    table = table.replace_schema_metadata(table_metadata)
+    # Write to a temporary file and rename it, so that readers never see a
+    # partially written entry.
+    tmp_file_name = file_name + ".tmp"
+    # Same options as `hparquet.to_parquet()`.
+    pq.write_table(
+        table,
+        tmp_file_name,
+        coerce_timestamps="us",
+        allow_truncated_timestamps=True,
+    )
+    os.replace(tmp_file_name, file_name)
+
+
+def _read_entry(file_name: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    table = pq.read_table(file_name)
+    metadata = json.loads(table.schema.metadata[_METADATA_KEY])
+    df = table.to_pandas()
+    return df, metadata
+
+
+def _compute_delta(
+    prev_df: pd.DataFrame, df: pd.DataFrame
+) -> Optional[pd.DataFrame]:
+    """
+    Compute the rows of `df` that are new or different from `prev_df`.
+
+    :return: the rows or `None` if `df` can't be rebuilt from `prev_df` and the
+        rows
+    """
+    if df.empty or prev_df.empty:
+        return None
+    if not df.columns.equals(prev_df.columns) or not df.dtypes.equals(
+        prev_df.dtypes
+    ):
+        return None
+    # The rows are put back in place by sorting the index.
+    if not (df.index.is_unique and df.index.is_monotonic_increasing):
+        return None
+    is_new = ~df.index.isin(prev_df.index)
+    curr_common = df[~is_new]
+    prev_common = prev_df.loc[curr_common.index]
+    is_equal = curr_common.eq(prev_common) | (
+        curr_common.isna() & prev_common.isna()
+    )
+    is_changed = pd.Series(False, index=df.index)
+    is_changed[~is_new] = ~is_equal.all(axis=1).to_numpy()
+    delta = df[is_new | is_changed.to_numpy()]
+    return delta
+
+
+def _apply_delta(
+    prev_df: pd.DataFrame, delta: pd.DataFrame, first: Any, last: Any
+) -> pd.DataFrame:
+    """
+    Rebuild an output from the previous output and a delta.
+    """
+    df = pd.concat([prev_df.drop(delta.index, errors="ignore"), delta])
+    df = df.sort_index().loc[first:last]
+    return df
+
+
+# #############################################################################
+# NodeIoLogWriter
+# #############################################################################
+
+
+class NodeIoLogWriter:
+    """
+    Log the outputs of the nodes storing only what changes from bar to bar.
+
+    Saving the entire output of each node at each bar writes the same rows
+    many times, since outputs typically contain a lookback window of data.
+    This writer saves a snapshot of the output every `snapshot_period` bars and
+    only the new or changed rows (a "delta") in the other bars.
+
+    The files are written by a background thread, so that saving doesn't
+    delay the execution of the DAG. The log is complete only after calling
+    `flush()` or `close()`.
+    """
+
+    def __init__(
+        self,
+        log_dir: str,
+        *,
+        snapshot_period: int = 100,
+        max_queue_size: int = 16,
+    ) -> None:
+        """
+        Constructor.
+
+        :param log_dir: dir to store the log into
+        :param snapshot_period: number of bars between snapshots of an output
+        :param max_queue_size: number of outputs waiting to be written above
+            which `write()` blocks, bounding the memory used when the DAG
+            produces outputs faster than they can be written
+        """
+        _LOG.debug(hprint.to_str("log_dir snapshot_period max_queue_size"))
+        hdbg.dassert_lte(1, snapshot_period)
+        hdbg.dassert_lte(1, max_queue_size)
+        hio.create_dir(log_dir, incremental=True)
+        self._log_dir = log_dir
+        self._snapshot_period = snapshot_period
+        # Map (node name, output name) to the last output written and the
+        # number of deltas written after the last snapshot.
+        self._last_outputs: Dict[Tuple[str, str], Tuple[pd.DataFrame, int]] = {}
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        # Store the exception raised by the background thread, if any.
+        self._exception: Optional[BaseException] = None
+        self._thread: Optional[threading.Thread] = threading.Thread(
+            target=self._run, daemon=True
+        )
+        self._thread.start()
+        # Write the pending entries before exiting.
+        atexit.register(self.close)
+
+    def write(
+        self,
+        node_name: str,
+        output_name: str,
+        bar_timestamp: str,
+        wall_clock_timestamp: str,
+        df: pd.DataFrame,
+    ) -> None:
+        """
+        Enqueue a copy of an output of a node to be written.
+
+        Block if there are already `max_queue_size` outputs waiting to be
+        written.
+
+        :param node_name: e.g., `predict.0.read_data`
+        :param output_name: e.g., `df_out`
+        :param bar_timestamp: e.g., `20221028_080000`
+        :param wall_clock_timestamp: e.g., `20221028_080143`
+        :param df: output to log
+        """
+        self._raise_if_failed()
+        hdbg.dassert_is_not(self._thread, None, "The writer is closed")
+        hdbg.dassert_isinstance(df, pd.DataFrame)
+        # Copy the output, since the caller can modify it before it's written.
+        df = df.copy()
+        self._queue.put(
+            (node_name, output_name, bar_timestamp, wall_clock_timestamp, df)
+        )
+
+    def flush(self) -> None:
+        """
+        Wait until all the enqueued outputs are written.
+        """
+        self._queue.join()
+        self._raise_if_failed()
+
+    def close(self) -> None:
+        """
+        Write the enqueued outputs and stop the background thread.
+
+        The errors raised while writing are reported by `flush()`.
+        """
+        if self._thread is None:
+            return
+        self._queue.join()
+        # Stop the background thread.
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        atexit.unregister(self.close)
+
+    def _raise_if_failed(self) -> None:
+        if self._exception is not None:
+            raise RuntimeError(
+                "Failed to write the node io log"
+            ) from self._exception
+
+    def _run(self) -> None:
+        while True:
+            args = self._queue.get()
+            if args is None:
+                self._queue.task_done()
+                break
+            try:
+                if self._exception is None:
+                    self._write_entry(*args)
+            except Exception as e:  # pylint: disable=broad-except
+                _LOG.error("Failed to write the node io log: %s", str(e))
+                self._exception = e
+            finally:
+                self._queue.task_done()
+
+    def _write_entry(
+        self,
+        node_name: str,
+        output_name: str,
+        bar_timestamp: str,
+        wall_clock_timestamp: str,
+        df: pd.DataFrame,
+    ) -> None:
+        key = (node_name, output_name)
+        delta = None
+        num_deltas = 0
+        if key in self._last_outputs:
+            prev_df, num_deltas = self._last_outputs[key]
+            if num_deltas + 1 < self._snapshot_period:
+                delta = _compute_delta(prev_df, df)
+        if delta is not None:
+            first, last = df.index[0], df.index[-1]
+            first_json, last_json = _label_to_json(first), _label_to_json(last)
+            # Write a snapshot if the output can't be rebuilt from the delta.
+            if (
+                "str" in first_json
+                or "str" in last_json
+                or not _apply_delta(prev_df, delta, first, last).equals(df)
+            ):
+                delta = None
+        if delta is None:
+            kind = _SNAPSHOT
+            entry_df = df
+            metadata = {"kind": kind}
+            num_deltas = 0
+        else:
+            kind = _DELTA
+            entry_df = delta
+            metadata = {
+                "kind": kind,
+                "first": first_json,
+                "last": last_json,
+            }
+            num_deltas += 1
+        file_name = _get_file_name(
+            self._log_dir,
+            node_name,
+            output_name,
+            bar_timestamp,
+            wall_clock_timestamp,
+            kind,
+        )
+        _write_entry(entry_df, file_name, metadata)
+        _LOG.debug("Saved %s with %s rows", file_name, entry_df.shape[0])
+        self._last_outputs[key] = (df, num_deltas)
+
+
+# #############################################################################
+# NodeIoLogReader
+# #############################################################################
+
+
+def is_node_io_log_dir(dir_name: str) -> bool:
+    """
+    Return whether a dir contains a log written by `NodeIoLogWriter`.
+    """
+    if not os.path.isdir(dir_name):
+        return False
+    suffixes = (f".{_SNAPSHOT}.parquet", f".{_DELTA}.parquet")
+    return any(file_name.endswith(suffixes) for file_name in os.listdir(dir_name))
+
+
+class NodeIoLogReader:
+    """
+    Rebuild the outputs of the nodes from a log written by `NodeIoLogWriter`.
+    """
+
+    def __init__(self, log_dir: str) -> None:
+        hdbg.dassert_dir_exists(log_dir)
+        self._log_dir = log_dir
+        # Map (node name, output name) to the list of (bar timestamp, wall
+        # clock timestamp, kind) of the entries, sorted by bar timestamp.
+        self._entries: Dict[
+            Tuple[str, str], List[Tuple[str, str, str]]
+        ] = collections.defaultdict(list)
+        for basename in os.listdir(log_dir):
+            if not basename.endswith(".parquet"):
+                continue
+            (
+                node_name,
+                output_name,
+                bar_timestamp,
+                wall_clock_timestamp,
+                kind,
+            ) = _parse_file_name(basename)
+            self._entries[(node_name, output_name)].append(
+                (bar_timestamp, wall_clock_timestamp, kind)
+            )
+        for entries in self._entries.values():
+            entries.sort()
+
+    def get_node_names(self) -> List[str]:
+        """
+        Get the sorted names of the logged nodes, e.g., `predict.0.read_data`.
+        """
+        node_names = sorted({node_name for node_name, _ in self._entries})
+        return node_names
+
+    def get_timestamps(
+        self, node_name: str, *, output_name: str = "df_out"
+    ) -> List[Tuple[str, str]]:
+        """
+        Get the bar timestamps and the corresponding wall clock timestamps.
+
+        :return: sorted list of (bar timestamp, wall clock timestamp), e.g.,
+            `("20221028_080000", "20221028_080143")`
+        """
+        entries = self._get_entries(node_name, output_name)
+        timestamps = [(bar_ts, wall_ts) for bar_ts, wall_ts, _ in entries]
+        return timestamps
+
+    def read(
+        self,
+        node_name: str,
+        bar_timestamp: str,
+        *,
+        output_name: str = "df_out",
+    ) -> pd.DataFrame:
+        """
+        Rebuild the output of a node for a bar.
+
+        :param bar_timestamp: e.g., `20221028_080000`
+        """
+        entries = self._get_entries(node_name, output_name)
+        bar_timestamps = [bar_ts for bar_ts, _, _ in entries]
+        hdbg.dassert_in(bar_timestamp, bar_timestamps)
+        end_idx = bar_timestamps.index(bar_timestamp)
+        # Start from the last snapshot before the bar.
+        start_idx = end_idx
+        while entries[start_idx][2] != _SNAPSHOT:
+            start_idx -= 1
+        for bar_timestamp_tmp, _, df in self._iterate(
+            node_name, output_name, start_idx
+        ):
+            if bar_timestamp_tmp == bar_timestamp:
+                break
+        return df
+
+    def iterate(
+        self, node_name: str, *, output_name: str = "df_out"
+    ) -> Iterator[Tuple[str, str, pd.DataFrame]]:
+        """
+        Rebuild the outputs of a node for all the bars, in order.
+
+        This is faster than calling `read()` for each bar since each entry is
+        read only once.
+
+        :return: iterator over (bar timestamp, wall clock timestamp, output)
+        """
+        yield from self._iterate(node_name, output_name, 0)
+
+    def _get_entries(
+        self, node_name: str, output_name: str
+    ) -> List[Tuple[str, str, str]]:
+        key = (node_name, output_name)
+        hdbg.dassert_in(key, self._entries)
+        return self._entries[key]
+
+    def _iterate(
+        self, node_name: str, output_name: str, start_idx: int
+    ) -> Iterator[Tuple[str, str, pd.DataFrame]]:
+        entries = self._get_entries(node_name, output_name)
+        hdbg.dassert_eq(entries[start_idx][2], _SNAPSHOT)
+        df = None
+        for bar_timestamp, wall_clock_timestamp, kind in entries[start_idx:]:
+            file_name = _get_file_name(
+                self._log_dir,
+                node_name,
+                output_name,
+                bar_timestamp,
+                wall_clock_timestamp,
+                kind,
+            )
+            entry_df, metadata = _read_entry(file_name)
+            if kind == _SNAPSHOT:
+                df = entry_df
+            else:
+                first = _label_from_json(metadata["first"])
+                last = _label_from_json(metadata["last"])
+                df = _apply_delta(df, entry_df, first, last)
+            yield bar_timestamp, wall_clock_timestamp, df
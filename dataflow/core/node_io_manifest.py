@@ -0,0 +1,167 @@
+"""
+Import as:
+
+import dataflow.core.node_io_manifest as dtfcnoioma
+"""
+
+import csv
+import logging
+import os
+import threading
+from typing import Any, Optional
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+import helpers.hdbg as hdbg
+
+_LOG = logging.getLogger(__name__)
+
+# Name of the manifest file stored in the dir with the node outputs.
+MANIFEST_FILE_NAME = "manifest.csv"
+
+# Columns of the manifest.
+# - `node_name`: e.g., `predict.0.read_data`
+# - `output_name`: e.g., `df_out`
+# - `bar_timestamp`, `wall_clock_timestamp`: e.g., `20221028_080000`
+# - `file_name`: basename of the file with the output, e.g.,
+#   `predict.0.read_data.df_out.20221028_080000.20221028_080143.parquet`
+# - `num_rows`: number of rows of the output
+# - `first_index`, `last_index`: first and last index of the output, as strings
+MANIFEST_COLUMNS = [
+    "node_name",
+    "output_name",
+    "bar_timestamp",
+    "wall_clock_timestamp",
+    "file_name",
+    "num_rows",
+    "first_index",
+    "last_index",
+]
+
+# Serialize the appends to the manifest from different threads.
+_LOCK = threading.Lock()
+
+
+def append_to_manifest(
+    dir_name: str,
+    node_name: str,
+    output_name: str,
+    bar_timestamp: str,
+    wall_clock_timestamp: str,
+    file_name: str,
+    df: pd.DataFrame,
+) -> None:
+    """
+    Add the entry of a saved node output to the manifest of `dir_name`.
+
+    :param file_name: path of the saved output
+    :param df: saved output
+    """
+    first_index: Any = ""
+    last_index: Any = ""
+    if not df.empty:
+        first_index = df.index[0]
+        last_index = df.index[-1]
+    row = [
+        node_name,
+        output_name,
+        bar_timestamp,
+        wall_clock_timestamp,
+        os.path.basename(file_name),
+        df.shape[0],
+        first_index,
+        last_index,
+    ]
+    manifest_file_name = os.path.join(dir_name, MANIFEST_FILE_NAME)
+    with _LOCK:
+        write_header = not os.path.exists(manifest_file_name)
+        with open(manifest_file_name, "a", newline="") as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(MANIFEST_COLUMNS)
+            writer.writerow(row)
+
+
+def _build_manifest(dir_name: str) -> pd.DataFrame:
+    """
+    Build the manifest from the names of the Parquet files in `dir_name`.
+
+    This is used for the dirs saved before the manifest was introduced. The
+    number of rows is read from the Parquet metadata, while the first and the
+    last index are not available.
+    """
+    rows = []
+    for basename in sorted(os.listdir(dir_name)):
+        if not basename.endswith(".parquet"):
+            continue
+        # E.g., `predict.0.read_data.df_out.20221028_080000.20221028_080143.parquet`.
+        prefix, bar_timestamp, wall_clock_timestamp, _ = basename.rsplit(".", 3)
+        node_name, output_name = prefix.rsplit(".", 1)
+        num_rows = pq.read_metadata(os.path.join(dir_name, basename)).num_rows
+        rows.append(
+            [
+                node_name,
+                output_name,
+                bar_timestamp,
+                wall_clock_timestamp,
+                basename,
+                num_rows,
+                None,
+                None,
+            ]
+        )
+    manifest = pd.DataFrame(rows, columns=MANIFEST_COLUMNS)
+    return manifest
+
+
+def load_manifest(
+    dir_name: str, *, output_name: Optional[str] = "df_out"
+) -> pd.DataFrame:
+    """
+    Load the manifest of the node outputs saved in `dir_name`.
+
+    If the dir has no manifest, this is built from the names of the files.
+    If an output was saved multiple times for the same bar (e.g., when running
+    again into the same dir), only the latest entry by wall clock timestamp is
+    kept.
+
+    :param output_name: keep only the entries for this output, e.g.,
+        `df_out`, if not `None`
+    :return: manifest sorted by node name and bar timestamp, e.g.,
+        ```
+                   node_name  output_name    bar_timestamp  ...
+        0  predict.0.read_data       df_out  20221028_080000  ...
+        1  predict.0.read_data       df_out  20221028_080500  ...
+        ```
+    """
+    hdbg.dassert_dir_exists(dir_name)
+    manifest_file_name = os.path.join(dir_name, MANIFEST_FILE_NAME)
+    if os.path.exists(manifest_file_name):
+        manifest = pd.read_csv(
+            manifest_file_name,
+            dtype={
+                "bar_timestamp": str,
+                "wall_clock_timestamp": str,
+                "first_index": str,
+                "last_index": str,
+            },
+        )
+        hdbg.dassert_eq(list(manifest.columns), MANIFEST_COLUMNS)
+    else:
+        _LOG.debug("Building the manifest of '%s'", dir_name)
+        manifest = _build_manifest(dir_name)
+    if output_name is not None:
+        manifest = manifest[manifest["output_name"] == output_name]
+    # Keep the latest entry for each output and bar.
+    manifest = manifest.sort_values(
+        ["node_name", "output_name", "bar_timestamp", "wall_clock_timestamp"],
+        kind="stable",
+    )
+    manifest = manifest.drop_duplicates(
+        ["node_name", "output_name", "bar_timestamp"], keep="last"
+    )
+    manifest = manifest.sort_values(
+        ["node_name", "bar_timestamp"], kind="stable"
+    ).reset_index(drop=True)
+    return manifest
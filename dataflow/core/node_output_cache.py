@@ -0,0 +1,456 @@
+"""
+Import as:
+
+import dataflow.core.node_output_cache as dtfcnoouca
+"""
+
+import functools
+import hashlib
+import logging
+import os
+import shutil
+import types
+import uuid
+from typing import Any, Dict, List, Optional, Set, Union
+
+import joblib
+import joblib.func_inspect as jfunci
+import numpy as np
+import pandas as pd
+
+import dataflow.core.node as dtfcornode
+import dataflow.core.nodes.base as dtfconobas
+import helpers.hdbg as hdbg
+import helpers.hio as hio
+import helpers.hintrospection as hintros
+import helpers.hparquet as hparque
+import helpers.hpickle as hpickle
+import helpers.hprint as hprint
+
+_LOG = logging.getLogger(__name__)
+
+
+# #############################################################################
+# Fingerprinting
+# #############################################################################
+
+
+# Attributes of a node that store the results of running it, and thus are not
+# part of the node parameters.
+_NODE_ATTRS_TO_SKIP = ("_output_vals", "_info")
+
+
+class _UnhashableError(Exception):
+    """
+    Raised when an object can't be fingerprinted reliably.
+    """
+
+
+def _get_pandas_fingerprint(obj: Union[pd.DataFrame, pd.Series, pd.Index]) -> str:
+    """
+    Hash a pandas object by its values and metadata.
+
+    Pickling-based hashes (e.g., `joblib.hash()`) depend on the memory layout,
+    which changes when the same data is read back from Parquet.
+    """
+    if isinstance(obj, pd.Index):
+        metadata = [obj.name, obj.dtype, getattr(obj, "freq", None)]
+    elif isinstance(obj, pd.DataFrame):
+        metadata = [list(obj.columns), list(obj.dtypes)]
+    else:
+        metadata = [obj.name, obj.dtype]
+    if not isinstance(obj, pd.Index):
+        metadata.append(getattr(obj.index, "freq", None))
+    try:
+        values = pd.util.hash_pandas_object(obj, index=True).values
+    except TypeError:
+        # Some values (e.g., lists) are not hashable by pandas.
+        values = joblib.hash(obj)
+    return joblib.hash([repr(metadata), values])
+
+
+def _update_fingerprint(obj: Any, hasher: Any, seen: Set[int]) -> None:
+    """
+    Update `hasher` with a representation of `obj` that is stable across runs.
+
+    - Data (e.g., dataframes, arrays) is hashed by content
+    - Functions are hashed by code, default values, and closure variables so
+      that lambdas and closures built by `DagBuilder`s give the same key in
+      different runs
+    - Other objects are hashed recursively through their attributes
+    """
+
+    def _update(txt: str) -> None:
+        hasher.update(txt.encode("utf-8"))
+
+    if obj is None or isinstance(obj, (bool, int, float, str, bytes)):
+        _update(f"{type(obj).__name__}:{obj!r};")
+        return
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        _update(f"{type(obj).__name__}:{_get_pandas_fingerprint(obj)};")
+        return
+    if isinstance(obj, np.ndarray):
+        _update(f"{type(obj).__name__}:{joblib.hash(obj)};")
+        return
+    if isinstance(obj, (pd.Timestamp, pd.Timedelta, np.generic)):
+        _update(f"{type(obj).__name__}:{obj!r};")
+        return
+    # Avoid infinite recursion on objects referring to each other.
+    if id(obj) in seen:
+        _update("<seen>;")
+        return
+    seen.add(id(obj))
+    if isinstance(obj, dict):
+        _update("dict(")
+        for key in sorted(obj.keys(), key=repr):
+            _update_fingerprint(key, hasher, seen)
+            _update_fingerprint(obj[key], hasher, seen)
+        _update(");")
+    elif isinstance(obj, (list, tuple)):
+        _update(f"{type(obj).__name__}(")
+        for elem in obj:
+            _update_fingerprint(elem, hasher, seen)
+        _update(");")
+    elif isinstance(obj, (set, frozenset)):
+        _update(f"{type(obj).__name__}(")
+        for elem in sorted(obj, key=repr):
+            _update_fingerprint(elem, hasher, seen)
+        _update(");")
+    elif isinstance(obj, type):
+        _update(f"type:{obj.__module__}.{obj.__qualname__};")
+    elif isinstance(obj, types.FunctionType):
+        code, _, _ = jfunci.get_func_code(obj)
+        _update(f"function:{obj.__module__}.{obj.__qualname__}:{code}(")
+        _update_fingerprint(obj.__defaults__, hasher, seen)
+        _update_fingerprint(obj.__kwdefaults__, hasher, seen)
+        closure = [] if obj.__closure__ is None else obj.__closure__
+        _update_fingerprint(
+            [cell.cell_contents for cell in closure], hasher, seen
+        )
+        _update(");")
+    elif isinstance(obj, types.MethodType):
+        _update("method(")
+        _update_fingerprint(obj.__func__, hasher, seen)
+        _update_fingerprint(obj.__self__, hasher, seen)
+        _update(");")
+    elif isinstance(obj, functools.partial):
+        _update("partial(")
+        _update_fingerprint(obj.func, hasher, seen)
+        _update_fingerprint(obj.args, hasher, seen)
+        _update_fingerprint(obj.keywords, hasher, seen)
+        _update(");")
+    elif isinstance(obj, types.BuiltinFunctionType):
+        _update(f"builtin:{obj.__module__}.{obj.__qualname__};")
+    elif hasattr(obj, "__dict__"):
+        cls = type(obj)
+        _update(f"object:{cls.__module__}.{cls.__qualname__}(")
+        _update_fingerprint(vars(obj), hasher, seen)
+        _update(");")
+    else:
+        try:
+            _update(f"{type(obj).__name__}:{joblib.hash(obj)};")
+        except Exception as e:
+            raise _UnhashableError(
+                f"Can't fingerprint object of type '{type(obj)}'"
+            ) from e
+
+
+def _get_fingerprint(obj: Any) -> str:
+    hasher = hashlib.sha256()
+    _update_fingerprint(obj, hasher, set())
+    return hasher.hexdigest()
+
+
+def _get_node_params(node: dtfcornode.Node) -> Dict[str, Any]:
+    """
+    Return the attributes of a node, excluding the results of running it.
+    """
+    params = {
+        attr_name: attr_value
+        for attr_name, attr_value in vars(node).items()
+        if attr_name not in _NODE_ATTRS_TO_SKIP
+    }
+    return params
+
+
+def _has_fit_state(node: dtfcornode.Node) -> bool:
+    """
+    Return whether a node saves / restores the state it learns in `fit()`.
+
+    `FitPredictNode` returns an empty fit state by default, so only the nodes
+    overriding both `get_fit_state()` and `set_fit_state()` qualify.
+    """
+    cls = type(node)
+    base_cls = dtfconobas.FitPredictNode
+    has_fit_state = (
+        cls.get_fit_state is not base_cls.get_fit_state
+        and cls.set_fit_state is not base_cls.set_fit_state
+    )
+    return has_fit_state
+
+
+# #############################################################################
+# NodeOutputCache
+# #############################################################################
+
+
+class NodeOutputCache:
+    """
+    Store the outputs of `FitPredictNode`s on disk, keyed by their content.
+
+    The key of a node execution is computed from:
+    - the class of the node
+    - its parameters (i.e., the node attributes, including any learned state)
+    - a fingerprint of the input data
+    - the method executed (e.g., `fit`, `predict`)
+
+    so that the same subgraph run with the same data in different experiments
+    (e.g., in a config sweep varying only downstream parameters) is computed
+    only once.
+
+    Each entry is stored as a dir like:
+    ```
+    {cache_dir}/
+        {key}/
+            df_out.parquet
+            node_state.pkl
+    ```
+    where `node_state.pkl` contains the info and the fit state of the node
+    after the execution.
+
+    Nodes without inputs (e.g., `DataSource`s) are cached only if listed in
+    `nids`, since they can read external data (e.g., from a DB or a file)
+    changing without any change in their parameters.
+
+    The output of `fit()` of a node that doesn't override `get_fit_state()` /
+    `set_fit_state()` is cached only if `fit()` doesn't change the node
+    attributes, since otherwise the learned state couldn't be restored on a
+    cache hit.
+
+    The entries are evicted in least-recently-used order when the size of the
+    cache exceeds `max_size_in_bytes`. The cache dir can be shared by multiple
+    processes, since entries are written to a tmp dir and then renamed.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        *,
+        max_size_in_bytes: int = 10 * 1024**3,
+        nids: Optional[List[dtfcornode.NodeId]] = None,
+    ) -> None:
+        """
+        Constructor.
+
+        :param cache_dir: dir storing the cache entries
+        :param max_size_in_bytes: size of the cache above which the least
+            recently used entries are evicted
+        :param nids: ids of the nodes to cache
+            - `None` means all the nodes with inputs whose parameters can be
+              fingerprinted
+            - nodes without inputs are cached only if listed explicitly
+        """
+        _LOG.debug(hprint.to_str("cache_dir max_size_in_bytes nids"))
+        hdbg.dassert_isinstance(cache_dir, str)
+        hdbg.dassert_lt(0, max_size_in_bytes)
+        hio.create_dir(cache_dir, incremental=True)
+        self._cache_dir = cache_dir
+        self._max_size_in_bytes = max_size_in_bytes
+        if nids is not None:
+            hdbg.dassert_isinstance(nids, list)
+            hdbg.dassert_no_duplicates(nids)
+        self._nids = nids
+        # Map the key of a `fit()` of a node without fit state to the
+        # fingerprint of the node attributes before running it.
+        self._params_fingerprints: Dict[str, str] = {}
+
+    def get_key(
+        self,
+        node: dtfcornode.Node,
+        method: dtfcornode.Method,
+        kwargs: Dict[str, Any],
+    ) -> Optional[str]:
+        """
+        Compute the key of running `method` on `node` with inputs `kwargs`.
+
+        :return: the key or `None` if the node execution can't be cached
+        """
+        if self._nids is not None:
+            if node.nid not in self._nids:
+                return None
+        elif not node.input_names:
+            # The output of a source node can change even if its parameters
+            # don't, so cache it only if requested explicitly.
+            _LOG.debug("Not caching source nid='%s'", node.nid)
+            return None
+        # Only nodes that can save / restore their learned state can be cached.
+        if not (hasattr(node, "get_fit_state") and hasattr(node, "_info")):
+            return None
+        params = _get_node_params(node)
+        cls = type(node)
+        try:
+            key = _get_fingerprint(
+                [f"{cls.__module__}.{cls.__qualname__}", params, kwargs, method]
+            )
+            if method == "fit" and not _has_fit_state(node):
+                self._params_fingerprints[key] = _get_fingerprint(params)
+        except _UnhashableError as e:
+            _LOG.debug("Can't cache nid='%s': %s", node.nid, str(e))
+            return None
+        _LOG.debug("nid='%s' method='%s' -> key='%s'", node.nid, method, key)
+        return key
+
+    def load(
+        self,
+        key: str,
+        node: dtfcornode.Node,
+        method: dtfcornode.Method,
+    ) -> Optional[dtfcornode.NodeOutput]:
+        """
+        Load the output of a node execution and restore the node state.
+
+        :return: the node output or `None` if the key is not in the cache
+        """
+        entry_dir = self._get_entry_dir(key)
+        if not os.path.exists(entry_dir):
+            _LOG.debug("Cache miss for nid='%s' key='%s'", node.nid, key)
+            return None
+        _LOG.debug("Cache hit for nid='%s' key='%s'", node.nid, key)
+        self._params_fingerprints.pop(key, None)
+        node_state = hpickle.from_pickle(
+            os.path.join(entry_dir, "node_state.pkl")
+        )
+        output = {}
+        for output_name in node.output_names:
+            file_name = os.path.join(entry_dir, f"{output_name}.parquet")
+            df = hparque.from_parquet(file_name)
+            # Parquet doesn't store the frequency of the index.
+            freq = node_state["freqs"][output_name]
+            if freq is not None:
+                df.index.freq = freq
+            output[output_name] = df
+        # Restore the state of the node as if it was executed.
+        if method == "fit":
+            node.set_fit_state(node_state["fit_state"])
+        if node_state["info"] is not None:
+            node._set_info(  # pylint: disable=protected-access
+                method, node_state["info"]
+            )
+        # Mark the entry as recently used.
+        os.utime(entry_dir)
+        return output
+
+    def save(
+        self,
+        key: str,
+        node: dtfcornode.Node,
+        method: dtfcornode.Method,
+        output: dtfcornode.NodeOutput,
+    ) -> None:
+        """
+        Store the output of a node execution together with the node state.
+        """
+        entry_dir = self._get_entry_dir(key)
+        if os.path.exists(entry_dir):
+            return
+        if key in self._params_fingerprints:
+            # A node without fit state can be cached only if `fit()` didn't
+            # learn anything.
+            params_fingerprint = self._params_fingerprints.pop(key)
+            if _get_fingerprint(_get_node_params(node)) != params_fingerprint:
+                _LOG.debug(
+                    "Can't cache nid='%s' since `fit()` changed its state",
+                    node.nid,
+                )
+                return
+        # Only dataframes can be stored as Parquet.
+        for output_name in node.output_names:
+            if not isinstance(output[output_name], pd.DataFrame):
+                _LOG.debug(
+                    "Can't cache output '%s' of nid='%s' of type '%s'",
+                    output_name,
+                    node.nid,
+                    type(output[output_name]),
+                )
+                return
+        # Write the entry in a tmp dir and then move it in place, so that
+        # concurrent readers never see a partial entry.
+        tmp_dir = os.path.join(self._cache_dir, f"tmp.{key}.{uuid.uuid4().hex}")
+        hio.create_dir(tmp_dir, incremental=False)
+        freqs = {}
+        for output_name in node.output_names:
+            df = output[output_name]
+            file_name = os.path.join(tmp_dir, f"{output_name}.parquet")
+            hparque.to_parquet(df, file_name)
+            freq = getattr(df.index, "freq", None)
+            freqs[output_name] = None if freq is None else freq.freqstr
+        node_state = {
+            "fit_state": node.get_fit_state() if method == "fit" else None,
+            "info": node.get_info(method),
+            "freqs": freqs,
+        }
+        hpickle.to_pickle(node_state, os.path.join(tmp_dir, "node_state.pkl"))
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            # Another process has already stored the same entry.
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        _LOG.debug("Cached output of nid='%s' key='%s'", node.nid, key)
+        self._evict()
+
+    def get_size_in_bytes(self) -> int:
+        """
+        Return the total size of the cache entries.
+        """
+        return sum(
+            self._get_dir_size_in_bytes(entry_dir)
+            for entry_dir in self._get_entry_dirs()
+        )
+
+    def _get_entry_dir(self, key: str) -> str:
+        return os.path.join(self._cache_dir, key)
+
+    def _get_entry_dirs(self) -> List[str]:
+        entry_dirs = [
+            os.path.join(self._cache_dir, dir_name)
+            for dir_name in os.listdir(self._cache_dir)
+            if not dir_name.startswith("tmp.")
+        ]
+        return entry_dirs
+
+    @staticmethod
+    def _get_dir_size_in_bytes(dir_name: str) -> int:
+        size = 0
+        for root, _, file_names in os.walk(dir_name):
+            for file_name in file_names:
+                size += os.path.getsize(os.path.join(root, file_name))
+        return size
+
+    def _evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache fits in
+        `max_size_in_bytes`.
+        """
+        entries = []
+        for entry_dir in self._get_entry_dirs():
+            try:
+                mtime = os.path.getmtime(entry_dir)
+                size = self._get_dir_size_in_bytes(entry_dir)
+            except FileNotFoundError:
+                # The entry has been evicted by another process.
+                continue
+            entries.append((mtime, entry_dir, size))
+        total_size = sum(size for _, _, size in entries)
+        if total_size <= self._max_size_in_bytes:
+            return
+        # Evict starting from the least recently used.
+        for _, entry_dir, size in sorted(entries):
+            if total_size <= self._max_size_in_bytes:
+                break
+            _LOG.debug(
+                "Evicting '%s' (size=%s)",
+                entry_dir,
+                hintros.format_size(size),
+            )
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_size -= size
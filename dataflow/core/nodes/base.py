@@ -11,6 +11,7 @@ import functools
 import logging
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union, cast
 
+import numpy as np
 import pandas as pd
 
 import dataflow.core.node as dtfcornode
@@ -521,6 +522,21 @@ class GroupedColDfToDfColProcessor:
         out_col_names = [col_group[-1] for col_group in col_groups]
         _LOG.debug("out_col_names=%s", out_col_names)
         hdbg.dassert_no_duplicates(out_col_names)
+        if _is_block_compatible(df, col_groups):
+            # Generate one dataframe per key as a view of a single block, to
+            # avoid slicing and copying the data once per key.
+            (
+                block,
+                col_names,
+                keys,
+            ) = GroupedColDfToDfColProcessor.preprocess_to_block(df, col_groups)
+            dfs = {
+                key: pd.DataFrame(
+                    block[:, :, idx], index=df.index, columns=col_names
+                )
+                for idx, key in enumerate(keys)
+            }
+            return dfs
         # Sort before accessing leaf columns.
         df_out = df.sort_index(axis=1)
         # Determine keys (i.e., leaf column names).
@@ -565,6 +581,92 @@ class GroupedColDfToDfColProcessor:
         """
         return _postprocess_dataframe_dict(dfs, col_group)
 
+    @staticmethod
+    def preprocess_to_block(
+        df: pd.DataFrame,
+        col_groups: List[Tuple[dtfcorutil.NodeColumn]],
+    ) -> Tuple[np.ndarray, pd.Index, List[dtfcorutil.NodeColumn]]:
+        """
+        Extract the data of `col_groups` as a single 3D block.
+
+        This is the representation used by `preprocess()` when all the
+        columns have the same type. Functions that can process all the keys at
+        once (e.g., with NumPy operations along the time axis) should use it
+        directly, instead of processing one dataframe per key.
+
+        :param df: as in `preprocess()`
+        :param col_groups: as in `preprocess()`. All the tuples should have
+            the same root (i.e., differ only in the last position) and the
+            corresponding columns should have the same type
+        :return: a tuple with
+            - the block with axes (time, feature, key)
+            - the names of the features, i.e., the last positions of the
+              tuples in `col_groups`
+            - the keys, i.e., the leaf column names, sorted
+        """
+        hdbg.dassert(
+            _is_block_compatible(df, col_groups),
+            "Columns of `col_groups=%s` can't be represented as a block",
+            col_groups,
+        )
+        # Determine keys (i.e., leaf column names) sorting only the columns,
+        # like `df.sort_index(axis=1)` would do.
+        df_cols = df.iloc[:0].sort_index(axis=1)
+        keys = df_cols[col_groups[0]].columns.to_list()
+        _LOG.debug("keys=%s", keys)
+        # Ensure all groups have the same keys.
+        for col_group in col_groups:
+            col_group_keys = df_cols[col_group].columns.to_list()
+            hdbg.dassert_set_eq(keys, col_group_keys)
+        # Copy the data once, with the features as the outer position and the
+        # keys as the inner one, so that it can be reshaped without copying.
+        cols = [col_group + (key,) for col_group in col_groups for key in keys]
+        block = df[cols].to_numpy()
+        block = block.reshape(df.shape[0], len(col_groups), len(keys))
+        col_names = pd.Index(
+            [col_group[-1] for col_group in col_groups],
+            name=df.columns.names[-2],
+        )
+        return block, col_names, keys
+
+    @staticmethod
+    def postprocess_block(
+        block: np.ndarray,
+        index: pd.Index,
+        col_names: List[dtfcorutil.NodeColumn],
+        keys: List[dtfcorutil.NodeColumn],
+        col_group: Tuple[dtfcorutil.NodeColumn],
+    ) -> pd.DataFrame:
+        """
+        Create a multi-indexed column dataframe from a 3D block.
+
+        This is the inverse of `preprocess_to_block()` and gives the same
+        result as `postprocess()` on the dataframes corresponding to each key.
+
+        :param block: data with axes (time, feature, key)
+        :param index: index of the time axis
+        :param col_names: names of the features
+        :param keys: keys, i.e., leaf column names
+        :param col_group: column levels to prefix the columns with
+        :return: multi-level column dataframe as in `postprocess()`
+        """
+        hdbg.dassert_isinstance(block, np.ndarray)
+        hdbg.dassert_eq(3, block.ndim)
+        hdbg.dassert_eq(block.shape, (len(index), len(col_names), len(keys)))
+        hdbg.dassert_isinstance(col_group, tuple)
+        col_names = pd.Index(col_names)
+        columns = pd.MultiIndex.from_product(
+            [col_names, keys], names=[col_names.name, None]
+        )
+        df = pd.DataFrame(
+            block.reshape(block.shape[0], -1), index=index, columns=columns
+        )
+        if not df.columns.is_monotonic_increasing:
+            df.sort_index(axis=1, level=0, inplace=True)
+        if col_group:
+            df = pd.concat([df], axis=1, keys=[col_group])
+        return df
+
 
 class CrossSectionalDfToDfColProcessor:
     """
@@ -815,6 +917,48 @@ def preprocess_multiindex_cols(
     return df_out
 
 
+def _is_block_compatible(
+    df: pd.DataFrame,
+    col_groups: List[Tuple[dtfcorutil.NodeColumn]],
+) -> bool:
+    """
+    Return whether the columns of `col_groups` can be stored in a 3D block.
+
+    This requires that all the tuples have the same root and that the
+    corresponding columns have the same NumPy type.
+    """
+    roots = {col_group[:-1] for col_group in col_groups}
+    if len(roots) != 1 or not df.columns.is_unique:
+        return False
+    col_groups = set(col_groups)
+    mask = [col[:-1] in col_groups for col in df.columns]
+    dtypes = set(df.dtypes.values[mask])
+    if len(dtypes) != 1:
+        return False
+    return isinstance(dtypes.pop(), np.dtype)
+
+
+def _are_block_compatible(
+    dfs: Dict[dtfcorutil.NodeColumn, pd.DataFrame],
+    idx: pd.Index,
+    cols: pd.Index,
+) -> bool:
+    """
+    Return whether `dfs` can be stacked in a 3D block.
+
+    This requires that all the dataframes have index `idx`, columns `cols`,
+    and the same NumPy type in all the columns.
+    """
+    dtypes = set()
+    for df in dfs.values():
+        if not (df.columns.equals(cols) and df.index.equals(idx)):
+            return False
+        dtypes.update(df.dtypes.values)
+        if len(dtypes) > 1:
+            return False
+    return isinstance(dtypes.pop(), np.dtype)
+
+
 def _postprocess_dataframe_dict(
     dfs: Dict[dtfcorutil.NodeColumn, pd.DataFrame],
     col_group: Tuple[dtfcorutil.NodeColumn],
@@ -860,12 +1004,30 @@ def _postprocess_dataframe_dict(
             1,
             df.columns.nlevels,
         )
+    # Ensure that `col_group` is a (possibly empty) tuple.
+    hdbg.dassert_isinstance(col_group, tuple)
+    if not empty_dfs and _are_block_compatible(dfs, idx, cols):
+        # Stack the data in a single block instead of concatenating one
+        # dataframe per symbol.
+        symbols = list(dfs.keys())
+        try:
+            # Stack the symbols in sorted order so that the output doesn't
+            # need to be sorted.
+            symbols = sorted(symbols)
+        except TypeError:
+            pass
+        # Stack along the first axis, which is faster since each dataframe is
+        # copied to a contiguous chunk.
+        block = np.stack([dfs[symbol].to_numpy() for symbol in symbols])
+        block = block.transpose(1, 2, 0)
+        df = GroupedColDfToDfColProcessor.postprocess_block(
+            block, idx, cols, symbols, col_group
+        )
+        return df
     # Make empty dfs NaN dfs.
     for symbol in empty_dfs:
         _LOG.warning("Imputing NaNs for symbol=`%s`", symbol)
         dfs[symbol] = pd.DataFrame(index=idx, columns=cols)
-    # Ensure that `col_group` is a (possibly empty) tuple.
-    hdbg.dassert_isinstance(col_group, tuple)
     # Insert symbols as a column level.
     df = pd.concat(dfs.values(), axis=1, keys=dfs.keys())
     # Swap column levels so that symbols are leaves.
@@ -291,6 +291,53 @@ datetime,MN0,MN1,MN0,MN1
         return df
 
 
+class TestGroupedColDfToDfTransformer5(hunitest.TestCase):
+    def test_apply_to_block1(self) -> None:
+        """
+        Check that applying a function to the block of all the leaf cols gives
+        the same result as applying it to each leaf col.
+        """
+        data = self._get_data()
+        config = {
+            "in_col_groups": [("close",), ("mid",)],
+            "out_col_group": (),
+            "col_mapping": {
+                "close": "close_diff",
+                "mid": "mid_diff",
+            },
+            "join_output_with_input": True,
+        }
+        node = dtfconotra.GroupedColDfToDfTransformer(
+            "diff", transformer_func=lambda x: x.diff(), **config
+        )
+        expected = node.fit(data)["df_out"]
+        #
+        def _diff(block: np.ndarray) -> np.ndarray:
+            block_out = np.full_like(block, np.nan)
+            block_out[1:] = np.diff(block, axis=0)
+            return block_out
+
+        node = dtfconotra.GroupedColDfToDfTransformer(
+            "diff", transformer_func=_diff, apply_to_block=True, **config
+        )
+        actual = node.fit(data)["df_out"]
+        hunitest.compare_df(actual, expected)
+
+    def _get_data(self) -> pd.DataFrame:
+        txt = """
+,close,close,close,mid,mid,mid
+datetime,MN2,MN0,MN1,MN0,MN2,MN1
+2016-01-04 16:00:00,1.0,95.00,96.00,100,0.1,98.00
+2016-01-05 09:30:00,NaN,100.00,NaN,100,0.2,NaN
+2016-01-05 09:31:00,1.5,105.00,98.00,106.05,0.3,97.02
+2016-01-05 09:32:00,2.0,52.50,49.00,53.025,0.4,48.51
+"""
+        df = pd.read_csv(
+            io.StringIO(txt), index_col=0, parse_dates=True, header=[0, 1]
+        )
+        return df
+
+
 class TestCrossSectionalDfToDfTransformer1(hunitest.TestCase):
     def test_demean(self) -> None:
         data = self._get_data()
@@ -368,21 +415,22 @@ datetime,MN0,MN1,MN0,MN1
         return df
 
 
+def _add_lags(srs: pd.Series, num_lags: int) -> pd.DataFrame:
+    lags = []
+    for lag in range(0, num_lags):
+        lags.append(srs.shift(lag).rename("lag_" + str(lag)))
+    out_df = pd.concat(lags, axis=1)
+    return out_df
+
+
 class TestSeriesToDfTransformer1(hunitest.TestCase):
     def test1(self) -> None:
-        def add_lags(srs: pd.Series, num_lags: int) -> pd.DataFrame:
-            lags = []
-            for lag in range(0, num_lags):
-                lags.append(srs.shift(lag).rename("lag_" + str(lag)))
-            out_df = pd.concat(lags, axis=1)
-            return out_df
-
         data = self._get_data()
         config = cconfig.Config.from_dict(
             {
                 "in_col_group": ("close",),
                 "out_col_group": (),
-                "transformer_func": add_lags,
+                "transformer_func": _add_lags,
                 "transformer_kwargs": {
                     "num_lags": 3,
                 },
@@ -405,6 +453,27 @@ class TestSeriesToDfTransformer1(hunitest.TestCase):
         )
         self.assert_dfs_close(actual, expected)
 
+    def test_parallel1(self) -> None:
+        """
+        Check that applying the function in parallel gives the same result.
+        """
+        data = self._get_data()
+        config = {
+            "in_col_group": ("close",),
+            "out_col_group": (),
+            "transformer_func": _add_lags,
+            "transformer_kwargs": {
+                "num_lags": 3,
+            },
+        }
+        node = dtfconotra.SeriesToDfTransformer("add_lags", **config)
+        expected = node.fit(data)["df_out"]
+        node = dtfconotra.SeriesToDfTransformer(
+            "add_lags", num_threads=2, backend="threading", **config
+        )
+        actual = node.fit(data)["df_out"]
+        hunitest.compare_df(actual, expected)
+
     def _get_data(self) -> pd.DataFrame:
         txt = """
 ,close,close,volume,volume
@@ -643,6 +712,25 @@ class TestSeriesToSeriesTransformer2(hunitest.TestCase):
         expected, actual = cdnth.get_fit_predict_outputs(data, node)
         self.assert_equal(actual, expected)
 
+    @pytest.mark.slow("~10 seconds.")
+    def test_parallel1(self) -> None:
+        """
+        Check that applying the function in parallel gives the same result.
+        """
+        data = self._get_data()
+        config = {
+            "in_col_group": ("close",),
+            "out_col_group": ("ret_0",),
+            "transformer_func": lambda x: x.pct_change(),
+        }
+        node = dtfconotra.SeriesToSeriesTransformer("ret_0", **config)
+        expected = node.fit(data)["df_out"]
+        node = dtfconotra.SeriesToSeriesTransformer(
+            "ret_0", num_threads=2, batch_size=1, **config
+        )
+        actual = node.fit(data)["df_out"]
+        hunitest.compare_df(actual, expected)
+
     def _get_data(self) -> pd.DataFrame:
         """
         Generate multivariate normal returns.
@@ -18,6 +18,7 @@ from typing import (
     cast,
 )
 
+import joblib
 import numpy as np
 import pandas as pd
 
@@ -285,6 +286,7 @@ class GroupedColDfToDfTransformer(dtfconobas.Transformer):
         drop_nans: bool = False,
         reindex_like_input: bool = True,
         join_output_with_input: bool = True,
+        apply_to_block: bool = False,
     ) -> None:
         """
         For reference, let.
@@ -311,11 +313,22 @@ class GroupedColDfToDfTransformer(dtfconobas.Transformer):
         :param join_output_with_input: whether to join the output with the input. A
             common case where this should typically be set to `False` is in
             resampling.
+        :param apply_to_block: apply `transformer_func` once to all the leaf
+            cols, passing a 3D block with axes (time, in col group, leaf col)
+            as returned by `GroupedColDfToDfColProcessor.preprocess_to_block()`
+            - `transformer_func` should return a block with the same shape,
+              whose features are named like the input ones (after applying
+              `col_mapping`)
+            - `drop_nans` and `permitted_exceptions` are not supported and
+              `reindex_like_input` is ignored
         """
         super().__init__(nid)
         # TODO(Paul): Add more checks here.
         hdbg.dassert_isinstance(in_col_groups, list)
         hdbg.dassert_isinstance(out_col_group, tuple)
+        if apply_to_block:
+            hdbg.dassert(not drop_nans)
+            hdbg.dassert_eq(permitted_exceptions, ())
         self._in_col_groups = in_col_groups
         self._out_col_group = out_col_group
         self._transformer_func = transformer_func
@@ -325,6 +338,7 @@ class GroupedColDfToDfTransformer(dtfconobas.Transformer):
         self._reindex_like_input = reindex_like_input
         self._join_output_with_input = join_output_with_input
         self._permitted_exceptions = permitted_exceptions
+        self._apply_to_block = apply_to_block
         # The leaf col names are determined from the dataframe at runtime.
         self._leaf_cols = None
 
@@ -335,6 +349,14 @@ class GroupedColDfToDfTransformer(dtfconobas.Transformer):
         if self._join_output_with_input:
             df_in = df.copy()
         #
+        if self._apply_to_block:
+            df = self._transform_block(df)
+            if self._join_output_with_input:
+                df = dtfcorutil.merge_dataframes(df_in, df)
+            info = collections.OrderedDict()
+            info["df_transformed_info"] = dtfcorutil.get_df_info_as_string(df)
+            return df, info
+        #
         in_dfs = dtfconobas.GroupedColDfToDfColProcessor.preprocess(
             df, self._in_col_groups
         )
@@ -373,6 +395,27 @@ class GroupedColDfToDfTransformer(dtfconobas.Transformer):
         info["df_transformed_info"] = dtfcorutil.get_df_info_as_string(df)
         return df, info
 
+    def _transform_block(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Apply `transformer_func` to all the leaf cols at once.
+        """
+        (
+            block,
+            col_names,
+            self._leaf_cols,
+        ) = dtfconobas.GroupedColDfToDfColProcessor.preprocess_to_block(
+            df, self._in_col_groups
+        )
+        block_out = self._transformer_func(block, **self._transformer_kwargs)
+        hdbg.dassert_isinstance(block_out, np.ndarray)
+        hdbg.dassert_eq(block_out.shape, block.shape)
+        if self._col_mapping:
+            col_names = col_names.map(lambda x: self._col_mapping.get(x, x))
+        df = dtfconobas.GroupedColDfToDfColProcessor.postprocess_block(
+            block_out, df.index, col_names, self._leaf_cols, self._out_col_group
+        )
+        return df
+
 
 class CrossSectionalDfToDfTransformer(dtfconobas.Transformer):
     """
@@ -485,6 +528,9 @@ class SeriesToDfTransformer(dtfconobas.Transformer):
         drop_nans: bool = False,
         reindex_like_input: bool = True,
         join_output_with_input: bool = True,
+        num_threads: Union[str, int] = "serial",
+        backend: str = "loky",
+        batch_size: Union[str, int] = "auto",
     ) -> None:
         """
         For reference, let.
@@ -507,10 +553,18 @@ class SeriesToDfTransformer(dtfconobas.Transformer):
         join_output_with_input: whether to join the output with the input. A
             common case where this should typically be set to `False` is in
             resampling.
+        :param num_threads: number of workers to apply `transformer_func` to
+            the leaf cols with, as in `joblib.Parallel(n_jobs=...)`
+            - "serial" applies it in the current process one col at a time
+        :param backend: joblib backend (e.g., "loky" for processes,
+            "threading" for functions releasing the GIL)
+        :param batch_size: number of cols sent to a worker at once
+            - "auto" lets joblib group short-running cols together
         """
         super().__init__(nid)
         hdbg.dassert_isinstance(in_col_group, tuple)
         hdbg.dassert_isinstance(out_col_group, tuple)
+        hdbg.dassert_in(backend, ("loky", "threading", "multiprocessing"))
         self._in_col_group = in_col_group
         self._out_col_group = out_col_group
         self._transformer_func = transformer_func
@@ -518,6 +572,9 @@ class SeriesToDfTransformer(dtfconobas.Transformer):
         self._drop_nans = drop_nans
         self._reindex_like_input = reindex_like_input
         self._join_output_with_input = join_output_with_input
+        self._num_threads = num_threads
+        self._backend = backend
+        self._batch_size = batch_size
         # The leaf col names are determined from the dataframe at runtime.
         self._leaf_cols = None
 
@@ -537,14 +594,18 @@ class SeriesToDfTransformer(dtfconobas.Transformer):
         dfs = {}
         leaf_cols = self._leaf_cols
         leaf_cols = cast(List[str], leaf_cols)
-        for col in leaf_cols:
-            df_out, col_info = _apply_func_to_data(
-                df[col],
-                self._transformer_func,
-                self._transformer_kwargs,
-                self._drop_nans,
-                self._reindex_like_input,
-            )
+        results = _apply_func_to_cols(
+            df,
+            leaf_cols,
+            self._transformer_func,
+            self._transformer_kwargs,
+            self._drop_nans,
+            self._reindex_like_input,
+            num_threads=self._num_threads,
+            backend=self._backend,
+            batch_size=self._batch_size,
+        )
+        for col, (df_out, col_info) in zip(leaf_cols, results):
             if df_out is None:
                 _LOG.warning("No output for col=%s", col)
                 continue
@@ -611,6 +672,9 @@ class SeriesToSeriesTransformer(dtfconobas.Transformer):
         drop_nans: bool = False,
         reindex_like_input: bool = True,
         join_output_with_input: bool = True,
+        num_threads: Union[str, int] = "serial",
+        backend: str = "loky",
+        batch_size: Union[str, int] = "auto",
     ) -> None:
         """
         For reference, let.
@@ -631,6 +695,13 @@ class SeriesToSeriesTransformer(dtfconobas.Transformer):
         :param reindex_like_input: reindex result of `transformer_func` like
             the input series
         join_output_with_input: whether to join the output with the input
+        :param num_threads: number of workers to apply `transformer_func` to
+            the leaf cols with, as in `joblib.Parallel(n_jobs=...)`
+            - "serial" applies it in the current process one col at a time
+        :param backend: joblib backend (e.g., "loky" for processes,
+            "threading" for functions releasing the GIL)
+        :param batch_size: number of cols sent to a worker at once
+            - "auto" lets joblib group short-running cols together
         """
         super().__init__(nid)
         hdbg.dassert_isinstance(in_col_group, tuple)
@@ -640,6 +711,7 @@ class SeriesToSeriesTransformer(dtfconobas.Transformer):
             len(out_col_group),
             msg="Column hierarchy depth must be preserved.",
         )
+        hdbg.dassert_in(backend, ("loky", "threading", "multiprocessing"))
         self._in_col_group = in_col_group
         self._out_col_group = out_col_group
         self._transformer_func = transformer_func
@@ -648,6 +720,9 @@ class SeriesToSeriesTransformer(dtfconobas.Transformer):
         self._reindex_like_input = reindex_like_input
         self._join_output_with_input = join_output_with_input
         self._permitted_exceptions = permitted_exceptions
+        self._num_threads = num_threads
+        self._backend = backend
+        self._batch_size = batch_size
         # The leaf col names are determined from the dataframe at runtime.
         self._leaf_cols = None
 
@@ -669,15 +744,19 @@ class SeriesToSeriesTransformer(dtfconobas.Transformer):
         srs_list = []
         leaf_cols = self._leaf_cols
         leaf_cols = cast(List[str], leaf_cols)
-        for col in leaf_cols:
-            srs, col_info = _apply_func_to_data(
-                df[col],
-                self._transformer_func,
-                self._transformer_kwargs,
-                self._drop_nans,
-                self._reindex_like_input,
-                self._permitted_exceptions,
-            )
+        results = _apply_func_to_cols(
+            df,
+            leaf_cols,
+            self._transformer_func,
+            self._transformer_kwargs,
+            self._drop_nans,
+            self._reindex_like_input,
+            self._permitted_exceptions,
+            num_threads=self._num_threads,
+            backend=self._backend,
+            batch_size=self._batch_size,
+        )
+        for col, (srs, col_info) in zip(leaf_cols, results):
             if srs is None:
                 _LOG.warning("No output for key=%s, imputing NaNs", col)
                 srs = pd.Series(np.nan, index=df[col].index)
@@ -739,6 +818,42 @@ def _apply_func_to_data(
     return result, info
 
 
+def _apply_func_to_cols(
+    df: pd.DataFrame,
+    cols: List[dtfcorutil.NodeColumn],
+    func: Callable,
+    func_kwargs: Dict[str, Any],
+    drop_nans: bool = False,
+    reindex_like_input: bool = True,
+    exceptions: Tuple[Any] = (),
+    *,
+    num_threads: Union[str, int] = "serial",
+    backend: str = "loky",
+    batch_size: Union[str, int] = "auto",
+) -> List[
+    Tuple[
+        Optional[Union[pd.Series, pd.DataFrame]],
+        Optional[collections.OrderedDict],
+    ]
+]:
+    """
+    Apply `_apply_func_to_data()` to each column in `cols` of `df`.
+
+    :param num_threads, backend, batch_size: as in
+        `SeriesToSeriesTransformer.__init__()`
+    :return: the results of `_apply_func_to_data()` in the same order as `cols`
+    """
+    args = (func, func_kwargs, drop_nans, reindex_like_input, exceptions)
+    if num_threads == "serial":
+        results = [_apply_func_to_data(df[col], *args) for col in cols]
+    else:
+        # `joblib` returns the results in the order of the tasks.
+        results = joblib.Parallel(
+            n_jobs=num_threads, backend=backend, batch_size=batch_size
+        )(joblib.delayed(_apply_func_to_data)(df[col], *args) for col in cols)
+    return results
+
+
 # TODO(Paul): Consider deprecating.
 def _apply_func_to_series(
     srs: pd.Series,
@@ -1,6 +1,10 @@
 import logging
 import os
+from typing import Callable, Optional, Union
 
+import pandas as pd
+
+import dataflow.core as dtfcore
 import dataflow.core.dag as dtfcordag
 import dataflow.core.node as dtfcornode
 import dataflow.core.visualization as dtfcorvisu
@@ -527,3 +531,143 @@ class Test_dataflow_core_DAG5(_TestDataflowHelper):
         #
         dag1.compose(dag2)
         self._check(dag1)
+
+
+# #############################################################################
+
+
+def _get_diamond_dag(
+    *, plus_one_func: Optional[Callable] = None
+) -> dtfcordag.DAG:
+    """
+    Build a DAG like:
+
+    ```
+              / times_two  \
+    source --                 join
+              \ plus_one   /
+    ```
+    """
+    df = pd.DataFrame(
+        {"x": range(10)},
+        index=pd.date_range("2022-01-01 09:30", periods=10, freq="T"),
+    )
+    dag = dtfcordag.DAG()
+    dag.add_node(dtfcore.DfDataSource("source", df))
+    dag.add_node(
+        dtfcore.FunctionWrapper(
+            "times_two", func=lambda df: df.rename(columns={"x": "y"}) * 2
+        )
+    )
+    if plus_one_func is None:
+        plus_one_func = lambda df: df.rename(columns={"x": "z"}) + 1
+    dag.add_node(dtfcore.FunctionWrapper("plus_one", func=plus_one_func))
+    dag.add_node(
+        dtfcore.YConnector(
+            "join",
+            connector_func=lambda df_in1, df_in2: df_in1.join(df_in2),
+        )
+    )
+    dag.connect("source", "times_two")
+    dag.connect("source", "plus_one")
+    dag.connect("times_two", ("join", "df_in1"))
+    dag.connect("plus_one", ("join", "df_in2"))
+    return dag
+
+
+# #############################################################################
+# Test_dataflow_core_DAG6
+# #############################################################################
+
+
+class Test_dataflow_core_DAG6(hunitest.TestCase):
+    """
+    Check that running a DAG on a thread pool gives the same result as running
+    it serially.
+    """
+
+    def test_run_dag1(self) -> None:
+        """
+        Run a DAG with two independent branches joined by a `YConnector`.
+        """
+        dag = _get_diamond_dag()
+        expected = dag.run_dag("fit")["join"]["df_out"]
+        #
+        dag = _get_diamond_dag()
+        dag.num_threads = 4
+        actual = dag.run_dag("fit")["join"]["df_out"]
+        hunitest.compare_df(actual, expected)
+
+    def test_run_leq_node1(self) -> None:
+        """
+        Run only the ancestors of one branch.
+        """
+        dag = _get_diamond_dag()
+        expected = dag.run_leq_node("times_two", "fit")["df_out"]
+        #
+        dag = _get_diamond_dag()
+        dag.num_threads = 4
+        actual = dag.run_leq_node("times_two", "fit")["df_out"]
+        hunitest.compare_df(actual, expected)
+        # The other branch and the join node are not executed.
+        with self.assertRaises(AssertionError):
+            dag.get_node("join").get_outputs("fit")
+
+    def test_exception1(self) -> None:
+        """
+        Check that an exception in a node is propagated to the caller.
+        """
+
+        def _raise(df: pd.DataFrame) -> pd.DataFrame:
+            _ = df
+            raise ValueError("Invalid data")
+
+        dag = _get_diamond_dag(plus_one_func=_raise)
+        dag.num_threads = 4
+        with self.assertRaises(ValueError):
+            dag.run_dag("fit")
+
+
+# #############################################################################
+# Test_dataflow_core_DAG7
+# #############################################################################
+
+
+class Test_dataflow_core_DAG7(hunitest.TestCase):
+    """
+    Check that `force_free_nodes` deallocates the outputs that are not needed
+    anymore.
+    """
+
+    def test_serial1(self) -> None:
+        self._test_force_free_nodes("serial")
+
+    def test_parallel1(self) -> None:
+        self._test_force_free_nodes(4)
+
+    def test_run_leq_node1(self) -> None:
+        """
+        Check that the output of the requested node is kept.
+        """
+        dag = _get_diamond_dag()
+        dag.force_free_nodes = True
+        df_out = dag.run_leq_node("times_two", "fit")["df_out"]
+        self.assertEqual(df_out.columns.tolist(), ["y"])
+        # The source output is freed since `times_two` is its only consumer
+        # among the executed nodes.
+        with self.assertRaises(AssertionError):
+            dag.get_node("source").get_output("fit", "df_out")
+
+    def _test_force_free_nodes(self, num_threads: Union[str, int]) -> None:
+        dag = _get_diamond_dag()
+        expected = dag.run_dag("fit")["join"]["df_out"]
+        #
+        dag = _get_diamond_dag()
+        dag.force_free_nodes = True
+        dag.num_threads = num_threads
+        actual = dag.run_dag("fit")["join"]["df_out"]
+        hunitest.compare_df(actual, expected)
+        # The outputs of the non-sink nodes are deallocated.
+        for nid in ["source", "times_two", "plus_one"]:
+            with self.assertRaises(AssertionError):
+                dag.get_node(nid).get_output("fit", "df_out")
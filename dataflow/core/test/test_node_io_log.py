@@ -0,0 +1,218 @@
+import logging
+import os
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+import dataflow.core as dtfcore
+import dataflow.core.node_io_log as dtfcnoiolo
+import helpers.hunit_test as hunitest
+import helpers.hwall_clock_time as hwacltim
+
+_LOG = logging.getLogger(__name__)
+
+
+def _get_outputs(num_bars: int) -> List[pd.DataFrame]:
+    """
+    Build the outputs of a node with a lookback window of 5 bars, where the
+    last row is revised in the next bar.
+    """
+    index = pd.date_range(
+        "2022-01-03 09:35", periods=num_bars + 5, freq="5T", tz="America/New_York"
+    )
+    data = pd.DataFrame(
+        {
+            "price": np.arange(len(index), dtype=float),
+            "volume": np.arange(len(index)) * 10,
+        },
+        index=index,
+    )
+    data.iloc[::3, 0] = np.nan
+    # The frequency of the index is not saved in Parquet.
+    data.index.freq = None
+    outputs = []
+    for i in range(num_bars):
+        df = data.iloc[i : i + 5].copy()
+        # Store a preliminary value for the last row.
+        df.iloc[-1, 1] = -1
+        outputs.append(df)
+    return outputs
+
+
+def _get_bar_timestamp(i: int) -> str:
+    return f"20220103_{9 + i // 12:02d}{(i % 12) * 5:02d}00"
+
+
+# #############################################################################
+# TestNodeIoLog1
+# #############################################################################
+
+
+class TestNodeIoLog1(hunitest.TestCase):
+    def write_log(self, outputs: List[pd.DataFrame], **kwargs) -> str:
+        log_dir = os.path.join(self.get_scratch_space(), "node_io.log")
+        writer = dtfcnoiolo.NodeIoLogWriter(log_dir, **kwargs)
+        for i, df in enumerate(outputs):
+            bar_timestamp = _get_bar_timestamp(i)
+            writer.write(
+                "predict.0.read_data", "df_out", bar_timestamp, bar_timestamp, df
+            )
+        writer.flush()
+        return log_dir
+
+    def test_read1(self) -> None:
+        """
+        Check that the output of each bar is rebuilt from the log.
+        """
+        outputs = _get_outputs(10)
+        log_dir = self.write_log(outputs, snapshot_period=4)
+        # Check that only some entries are snapshots.
+        kinds = sorted(
+            file_name.split(".")[-2] for file_name in os.listdir(log_dir)
+        )
+        self.assertEqual(kinds, ["delta"] * 7 + ["snapshot"] * 3)
+        reader = dtfcnoiolo.NodeIoLogReader(log_dir)
+        self.assertEqual(reader.get_node_names(), ["predict.0.read_data"])
+        for i, expected in enumerate(outputs):
+            actual = reader.read("predict.0.read_data", _get_bar_timestamp(i))
+            hunitest.compare_df(actual, expected)
+
+    def test_iterate1(self) -> None:
+        """
+        Check that iterating over the log rebuilds all the outputs.
+        """
+        outputs = _get_outputs(10)
+        log_dir = self.write_log(outputs, snapshot_period=4)
+        reader = dtfcnoiolo.NodeIoLogReader(log_dir)
+        actual = list(reader.iterate("predict.0.read_data"))
+        self.assertEqual(len(actual), len(outputs))
+        for i, (bar_timestamp, _, df) in enumerate(actual):
+            self.assertEqual(bar_timestamp, _get_bar_timestamp(i))
+            hunitest.compare_df(df, outputs[i])
+
+    def test_multiindex1(self) -> None:
+        """
+        Check that outputs with a multi-index are logged as snapshots.
+        """
+        outputs = []
+        for df in _get_outputs(3):
+            df.index = pd.MultiIndex.from_arrays([df.index, range(df.shape[0])])
+            outputs.append(df)
+        log_dir = self.write_log(outputs)
+        kinds = sorted(
+            file_name.split(".")[-2] for file_name in os.listdir(log_dir)
+        )
+        self.assertEqual(kinds, ["snapshot"] * 3)
+        reader = dtfcnoiolo.NodeIoLogReader(log_dir)
+        for i, expected in enumerate(outputs):
+            actual = reader.read("predict.0.read_data", _get_bar_timestamp(i))
+            hunitest.compare_df(actual, expected)
+
+    def test_snapshot1(self) -> None:
+        """
+        Check that a snapshot is written when the output can't be rebuilt
+        from a delta.
+        """
+        outputs = _get_outputs(3)
+        # Change the columns.
+        outputs[1] = outputs[1].rename(columns={"volume": "vol"})
+        log_dir = self.write_log(outputs)
+        kinds = sorted(
+            file_name.split(".")[-2] for file_name in os.listdir(log_dir)
+        )
+        self.assertEqual(kinds, ["snapshot"] * 3)
+        reader = dtfcnoiolo.NodeIoLogReader(log_dir)
+        for i, expected in enumerate(outputs):
+            actual = reader.read("predict.0.read_data", _get_bar_timestamp(i))
+            hunitest.compare_df(actual, expected)
+
+    def test_modify1(self) -> None:
+        """
+        Check that modifying the outputs after writing them doesn't change the
+        log.
+        """
+        outputs = _get_outputs(10)
+        expected = [df.copy() for df in outputs]
+        log_dir = os.path.join(self.get_scratch_space(), "node_io.log")
+        writer = dtfcnoiolo.NodeIoLogWriter(
+            log_dir, snapshot_period=4, max_queue_size=2
+        )
+        for i, df in enumerate(outputs):
+            bar_timestamp = _get_bar_timestamp(i)
+            writer.write(
+                "predict.0.read_data", "df_out", bar_timestamp, bar_timestamp, df
+            )
+            df.iloc[:, :] = 0
+        writer.close()
+        reader = dtfcnoiolo.NodeIoLogReader(log_dir)
+        for i, df in enumerate(expected):
+            actual = reader.read("predict.0.read_data", _get_bar_timestamp(i))
+            hunitest.compare_df(actual, df)
+
+
+# #############################################################################
+# TestNodeIoLog2
+# #############################################################################
+
+
+class TestNodeIoLog2(hunitest.TestCase):
+    def test_dag1(self) -> None:
+        """
+        Check that a DAG with `save_node_io="df_as_pq_log"` logs the outputs
+        of the nodes.
+        """
+        df = _get_outputs(1)[0]
+        dag = dtfcore.DAG()
+        dag.add_node(dtfcore.DfDataSource("read_data", df))
+        dst_dir = self.get_scratch_space()
+        dag.set_debug_mode("df_as_pq_log", False, dst_dir)
+        hwacltim.reset_current_bar_timestamp()
+        hwacltim.set_current_bar_timestamp(df.index[-1])
+        try:
+            dag.run_dag("predict")
+        finally:
+            hwacltim.reset_current_bar_timestamp()
+        dag.flush_node_io_log()
+        #
+        reader = dtfcnoiolo.NodeIoLogReader(os.path.join(dst_dir, "node_io.log"))
+        node_name = "predict.0.read_data"
+        self.assertEqual(reader.get_node_names(), [node_name])
+        timestamps = reader.get_timestamps(node_name)
+        self.assertEqual(timestamps[0][0], "20220103_095500")
+        actual = reader.read(node_name, timestamps[0][0])
+        hunitest.compare_df(actual, df)
+
+    def test_dag_runner1(self) -> None:
+        """
+        Check that the log is complete when a `DagRunner` returns.
+        """
+        df = _get_outputs(1)[0]
+        dag = dtfcore.DAG()
+        dag.add_node(dtfcore.DfDataSource("read_data", df))
+        dst_dir = self.get_scratch_space()
+        dag.set_debug_mode("df_as_pq_log", False, dst_dir)
+        dag_runner = dtfcore.FitPredictDagRunner(dag)
+        hwacltim.reset_current_bar_timestamp()
+        hwacltim.set_current_bar_timestamp(df.index[-1])
+        try:
+            dag_runner.predict()
+        finally:
+            hwacltim.reset_current_bar_timestamp()
+        reader = dtfcnoiolo.NodeIoLogReader(os.path.join(dst_dir, "node_io.log"))
+        self.assertEqual(reader.get_node_names(), ["predict.0.read_data"])
+
+    def test_set_debug_mode1(self) -> None:
+        """
+        Check that changing the debug mode closes the previous writer.
+        """
+        dag = dtfcore.DAG()
+        dst_dir = self.get_scratch_space()
+        dag.set_debug_mode("df_as_pq_log", False, dst_dir)
+        writer = dag.node_io_log_writer
+        thread = writer._thread
+        dag.set_debug_mode("", False, None)
+        self.assertIsNone(dag.node_io_log_writer)
+        self.assertFalse(thread.is_alive())
+        with self.assertRaises(AssertionError):
+            writer.write("predict.0.read_data", "df_out", "", "", pd.DataFrame())
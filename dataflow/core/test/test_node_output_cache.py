@@ -0,0 +1,192 @@
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+import dataflow.core as dtfcore
+import dataflow.core.dag_builder_example as dtfcdabuex
+import dataflow.core.node_output_cache as dtfcnoouca
+import dataflow.core.nodes.local_level_model as dtfcnllemo
+import helpers.hpickle as hpickle
+import helpers.hunit_test as hunitest
+
+_LOG = logging.getLogger(__name__)
+
+# Number of times `_add_one()` is called.
+_NUM_CALLS = 0
+
+
+def _add_one(df: pd.DataFrame) -> pd.DataFrame:
+    global _NUM_CALLS
+    _NUM_CALLS += 1
+    return df + 1
+
+
+def _get_dag(cache_dir: str, **kwargs) -> dtfcore.DAG:
+    df = pd.DataFrame(
+        {"x": [float(i) for i in range(10)]},
+        index=pd.date_range("2022-01-01 09:30", periods=10, freq="T"),
+    )
+    dag = dtfcore.DAG()
+    dag.add_node(dtfcore.DfDataSource("source", df))
+    dag.add_node(dtfcore.FunctionWrapper("add_one", func=_add_one))
+    dag.connect("source", "add_one")
+    dag.node_output_cache = dtfcnoouca.NodeOutputCache(cache_dir, **kwargs)
+    return dag
+
+
+# #############################################################################
+# TestNodeOutputCache1
+# #############################################################################
+
+
+class TestNodeOutputCache1(hunitest.TestCase):
+    def test_hit1(self) -> None:
+        """
+        Check that a second run with the same data is served from the cache.
+        """
+        global _NUM_CALLS
+        cache_dir = self.get_scratch_space()
+        _NUM_CALLS = 0
+        expected = _get_dag(cache_dir).run_dag("fit")["add_one"]["df_out"]
+        self.assertEqual(_NUM_CALLS, 1)
+        # Run a new DAG with the same data.
+        actual = _get_dag(cache_dir).run_dag("fit")["add_one"]["df_out"]
+        self.assertEqual(_NUM_CALLS, 1)
+        hunitest.compare_df(actual, expected)
+        self.assertEqual(actual.index.freq, expected.index.freq)
+
+    def test_miss1(self) -> None:
+        """
+        Check that a change in the input data invalidates the cached output.
+        """
+        global _NUM_CALLS
+        cache_dir = self.get_scratch_space()
+        _NUM_CALLS = 0
+        _get_dag(cache_dir).run_dag("fit")
+        # Change the data of the source node.
+        dag = _get_dag(cache_dir)
+        dag.get_node("source").df *= 2
+        _ = dag.run_dag("fit")
+        self.assertEqual(_NUM_CALLS, 2)
+
+    def test_fit_state1(self) -> None:
+        """
+        Check that the fit state is restored when `fit()` is served from the
+        cache, so that `predict()` gives the same result.
+        """
+        cache_dir = self.get_scratch_space()
+        dag_builder = dtfcdabuex.ArmaReturnsBuilder()
+        config = dag_builder.get_config_template()
+        nid = "rets/clip"
+        #
+        dag = dag_builder.get_dag(config)
+        dag.node_output_cache = dtfcnoouca.NodeOutputCache(cache_dir)
+        dag.run_dag("fit")
+        sink = dag.get_unique_sink()
+        expected = dag.run_leq_node(sink, "predict")["df_out"]
+        # Run from the cache.
+        dag = dag_builder.get_dag(config)
+        dag.node_output_cache = dtfcnoouca.NodeOutputCache(cache_dir)
+        dag.run_dag("fit")
+        self.assertIsNotNone(dag.get_node(nid).get_info("fit"))
+        actual = dag.run_leq_node(sink, "predict")["df_out"]
+        hunitest.compare_df(actual, expected)
+
+    def test_fit_state2(self) -> None:
+        """
+        Check that `fit()` is not served from the cache for a node that learns
+        state without overriding `get_fit_state()` / `set_fit_state()`.
+        """
+        cache_dir = self.get_scratch_space()
+        # Build a random walk plus noise.
+        rng = np.random.default_rng(seed=0)
+        data = rng.normal(size=50).cumsum() + rng.normal(size=50)
+        df = pd.DataFrame(
+            {"x": data},
+            index=pd.date_range("2022-01-01 09:30", periods=50, freq="T"),
+        )
+
+        def _get_local_level_dag() -> dtfcore.DAG:
+            dag = dtfcore.DAG()
+            dag.add_node(dtfcore.DfDataSource("source", df))
+            dag.add_node(
+                dtfcnllemo.LocalLevelModel(
+                    "local_level", cols=["x"], col_mode="merge_all"
+                )
+            )
+            dag.connect("source", "local_level")
+            dag.node_output_cache = dtfcnoouca.NodeOutputCache(cache_dir)
+            return dag
+
+        dag = _get_local_level_dag()
+        dag.run_dag("fit")
+        expected = dag.run_dag("predict")["local_level"]["df_out"]
+        # Run again with the same cache.
+        dag = _get_local_level_dag()
+        dag.run_dag("fit")
+        actual = dag.run_dag("predict")["local_level"]["df_out"]
+        hunitest.compare_df(actual, expected)
+
+    def test_evict1(self) -> None:
+        """
+        Check that the least recently used entries are evicted.
+        """
+        cache_dir = self.get_scratch_space()
+        dag = _get_dag(cache_dir, max_size_in_bytes=1)
+        dag.run_dag("fit")
+        # Only the entry written last can survive, and it is also evicted since
+        # it is larger than the budget.
+        self.assertEqual(
+            [
+                name
+                for name in os.listdir(cache_dir)
+                if not name.startswith("tmp.")
+            ],
+            [],
+        )
+
+    def test_source1(self) -> None:
+        """
+        Check that a source node is not served from the cache, unless it is
+        listed explicitly.
+        """
+        cache_dir = os.path.join(self.get_scratch_space(), "cache")
+        # The data read by the source node changes between runs while the
+        # parameters of the node don't.
+        file_name = os.path.join(self.get_scratch_space(), "data.pkl")
+
+        def _write_data(scale: float) -> pd.DataFrame:
+            df = pd.DataFrame(
+                {"x": [scale * i for i in range(10)]},
+                index=pd.date_range("2022-01-01 09:30", periods=10, freq="T"),
+            )
+            hpickle.to_pickle(df, file_name)
+            return df
+
+        def _run_source(**kwargs) -> pd.DataFrame:
+            dag = dtfcore.DAG()
+            dag.add_node(
+                dtfcore.FunctionDataSource(
+                    "source",
+                    func=hpickle.from_pickle,
+                    func_kwargs={"file_name": file_name},
+                )
+            )
+            dag.node_output_cache = dtfcnoouca.NodeOutputCache(
+                cache_dir, **kwargs
+            )
+            df_out = dag.run_dag("predict")["source"]["df_out"]
+            return df_out
+
+        _write_data(1.0)
+        _run_source()
+        expected = _write_data(2.0)
+        actual = _run_source()
+        hunitest.compare_df(actual, expected)
+        # Cache the source node explicitly.
+        expected = _run_source(nids=["source"])
+        _write_data(3.0)
+        actual = _run_source(nids=["source"])
+        hunitest.compare_df(actual, expected)
@@ -1,7 +1,10 @@
 import logging
+from typing import Any, List, Optional, Tuple
 
 import pandas as pd
 
+import core.config as cconfig
+import dataflow.core as dtfcore
 import dataflow.core.dag_builder_example as dtfcdabuex
 import dataflow.core.dag_runner as dtfcodarun
 import dataflow.core.visitors as dtfcorvisi
@@ -95,6 +98,65 @@ class TestRollingFitPredictDagRunner1(hunitest.TestCase):
 # #############################################################################
 
 
+class TestRollingFitPredictDagRunner2(hunitest.TestCase):
+    @staticmethod
+    def get_dag_runner() -> dtfcodarun.RollingFitPredictDagRunner:
+        dag_builder = dtfcdabuex.ArmaReturnsBuilder()
+        config = dag_builder.get_config_template()
+        config.update(
+            cconfig.Config.from_dict(
+                {"rets/read_data": {"end_date": "2010-01-29 16:30:00"}}
+            ),
+            update_mode="overwrite",
+        )
+        dag = dag_builder.get_dag(config)
+        dag_runner = dtfcodarun.RollingFitPredictDagRunner(
+            dag=dag,
+            predict_start_timestamp=pd.Timestamp("2010-01-11"),
+            predict_end_timestamp=pd.Timestamp("2010-01-29"),
+            retraining_freq="1W",
+            retraining_lookback=1,
+        )
+        return dag_runner
+
+    def run_fit_predict(self, **kwargs) -> List[Tuple[Any, str]]:
+        """
+        Return the results of each retraining window and the fit state of the
+        DAG after the window.
+        """
+        dag_runner = self.get_dag_runner()
+        results = []
+        for data in dag_runner.fit_predict(**kwargs):
+            # The fit state is updated in place by the next windows, so we
+            # freeze it as a string.
+            fit_state = str(dtfcorvisi.get_fit_state(dag_runner.dag))
+            results.append((data, fit_state))
+        return results
+
+    def test_parallel1(self) -> None:
+        """
+        Check that evaluating the retraining windows in parallel gives the same
+        results as evaluating them serially.
+        """
+        # Run serially.
+        expected = self.run_fit_predict(num_threads="serial")
+        # Run in parallel.
+        actual = self.run_fit_predict(num_threads=2)
+        # Check.
+        self.assertEqual(len(actual), 3)
+        self.assertEqual(len(actual), len(expected))
+        for (data, fit_state), (exp_data, exp_fit_state) in zip(actual, expected):
+            training_datetime_str, fit_rb, pred_rb = data
+            exp_training_datetime_str, exp_fit_rb, exp_pred_rb = exp_data
+            self.assertEqual(training_datetime_str, exp_training_datetime_str)
+            hunitest.compare_df(fit_rb.result_df, exp_fit_rb.result_df)
+            hunitest.compare_df(pred_rb.result_df, exp_pred_rb.result_df)
+            self.assertEqual(fit_state, exp_fit_state)
+
+
+# #############################################################################
+
+
 class TestIncrementalDagRunner1(hunitest.TestCase):
     def test1(self) -> None:
         """
@@ -125,3 +187,83 @@ class TestIncrementalDagRunner1(hunitest.TestCase):
             srs_i = rb_i.result_df[col]
             srs_i_next = rb_i_next.result_df[col]
             self.assertTrue(srs_i.compare(srs_i_next[:-1]).empty)
+
+    def test2(self) -> None:
+        """
+        Test the DagRunner feeding a bounded amount of history at each step.
+        """
+        dag_builder = dtfcdabuex.ArmaReturnsBuilder()
+        config = dag_builder.get_config_template()
+        # Create DAG and generate fit state.
+        dag = dag_builder.get_dag(config)
+        nid = dag.get_unique_sink()
+        dag.run_leq_node(nid, "fit")
+        fit_state = dtfcorvisi.get_fit_state(dag)
+        #
+        history_lookback = pd.Timedelta("1H")
+        dag_runner = dtfcodarun.IncrementalDagRunner(
+            dag=dag,
+            start_timestamp="2010-01-04 15:30",
+            end_timestamp="2010-01-04 15:45",
+            freq="5T",
+            fit_state=fit_state,
+            history_lookback=history_lookback,
+        )
+        result_bundles = list(dag_runner.predict())
+        self.assertEqual(len(result_bundles), 4)
+        # Check that each step sees only the data in the lookback window.
+        end_timestamps = pd.date_range(
+            "2010-01-04 15:30", "2010-01-04 15:45", freq="5T"
+        )
+        for result_bundle, end_timestamp in zip(result_bundles, end_timestamps):
+            result_df = result_bundle.result_df
+            self.assertLessEqual(result_df.index.max(), end_timestamp)
+            self.assertGreaterEqual(
+                result_df.index.min(), end_timestamp - history_lookback
+            )
+
+    def test3(self) -> None:
+        """
+        Check that, after the warm-up period, feeding a bounded amount of
+        history gives the same outputs as feeding the entire history.
+        """
+        window = 5
+        df = pd.DataFrame(
+            {"x": [float(i % 7) for i in range(60)]},
+            index=pd.date_range("2010-01-04 09:30", periods=60, freq="T"),
+        )
+
+        def _get_result_dfs(
+            history_lookback: Optional[pd.Timedelta],
+        ) -> List[pd.DataFrame]:
+            dag = dtfcore.DAG()
+            dag.add_node(dtfcore.DfDataSource("source", df))
+            dag.add_node(
+                dtfcore.FunctionWrapper(
+                    "rolling_mean", func=lambda df: df.rolling(window).mean()
+                )
+            )
+            dag.connect("source", "rolling_mean")
+            dag_runner = dtfcodarun.IncrementalDagRunner(
+                dag=dag,
+                start_timestamp="2010-01-04 10:00",
+                end_timestamp="2010-01-04 10:20",
+                freq="T",
+                fit_state=dtfcorvisi.get_fit_state(dag),
+                history_lookback=history_lookback,
+            )
+            return [
+                result_bundle.result_df for result_bundle in dag_runner.predict()
+            ]
+
+        expected = _get_result_dfs(None)
+        history_lookback = pd.Timedelta("10T")
+        actual = _get_result_dfs(history_lookback)
+        self.assertEqual(len(actual), 21)
+        self.assertEqual(len(actual), len(expected))
+        for actual_df, expected_df in zip(actual, expected):
+            # Skip the rows of the bounded run without a full window of data.
+            actual_df = actual_df.iloc[window - 1 :]
+            self.assertEqual(actual_df.shape[0], 11 - window + 1)
+            expected_df = expected_df.loc[actual_df.index]
+            hunitest.compare_df(actual_df, expected_df)
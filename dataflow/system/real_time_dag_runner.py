@@ -149,6 +149,8 @@ class RealTimeDagRunner(dtfcore.DagRunner):
         async for result_bundle in self.predict_at_datetime():
             self._apply_current_bar_timestamp()
             result_bundles.append(result_bundle)
+        # Make sure that the outputs of the nodes are saved before returning.
+        self.dag.flush_node_io_log()
         return result_bundles
 
     async def predict_at_datetime(self) -> dtfcore.ResultBundle:
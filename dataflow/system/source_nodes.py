@@ -376,26 +376,79 @@ def _convert_to_multiindex(df: pd.DataFrame, asset_id_col: str) -> pd.DataFrame:
         "Before multiindex conversion:\n%s",
         hpandas.df_to_str(df.head()),
     )
-    # Remove duplicates if any.
-    df = hpandas.drop_duplicated(df, subset=[asset_id_col])
-    #
-    dfs = {}
     # TODO(Paul): Pass the column name through the constructor, so we can make it
     #  programmable.
     hdbg.dassert_in(asset_id_col, df.columns)
     hpandas.dassert_series_type_is(df[asset_id_col], np.int64)
-    for asset_id, df in df.groupby(asset_id_col):
-        hpandas.dassert_strictly_increasing_index(df)
-        #
-        hdbg.dassert_not_in(asset_id, dfs.keys())
-        dfs[asset_id] = df
-    # Reorganize the data into the desired format.
-    _LOG.debug("keys=%s", str(dfs.keys()))
-    df = pd.concat(dfs.values(), axis=1, keys=dfs.keys())
-    df = df.swaplevel(i=0, j=1, axis=1)
+    # The data is pivoted in a single pass, instead of splitting it by asset and
+    # concatenating the pieces: each row is placed in the position of its
+    # timestamp and asset id in the output.
+    ts_codes, timestamps = pd.factorize(df.index, sort=True)
+    asset_codes, asset_ids = pd.factorize(df[asset_id_col], sort=True)
+    hdbg.dassert(np.all(ts_codes >= 0), "The index contains NaNs")
+    num_assets = len(asset_ids)
+    # Remove duplicates if any, i.e., rows with the same timestamp and asset id.
+    keys = ts_codes.astype(np.int64) * num_assets + asset_codes
+    is_duplicated = pd.Series(keys).duplicated(keep="first").values
+    rows = np.arange(df.shape[0])
+    if is_duplicated.any():
+        _LOG.warning(
+            "Removed repeated rows num_rows=%s",
+            hprint.perc(int(is_duplicated.sum()), df.shape[0]),
+        )
+        rows = rows[~is_duplicated]
+        ts_codes = ts_codes[~is_duplicated]
+        asset_codes = asset_codes[~is_duplicated]
+    # Check that the index of the data of each asset is strictly increasing.
+    order = np.argsort(asset_codes, kind="stable")
+    sorted_ts_codes = ts_codes[order]
+    is_same_asset = asset_codes[order][1:] == asset_codes[order][:-1]
+    hdbg.dassert(
+        np.all(
+            sorted_ts_codes[1:][is_same_asset]
+            > sorted_ts_codes[:-1][is_same_asset]
+        ),
+        "The index is not strictly increasing for some assets",
+    )
+    # Compute the row of the input corresponding to each timestamp and asset
+    # id in the output, with -1 for the missing data.
+    indexer = np.full((len(timestamps), num_assets), -1, dtype=np.intp)
+    indexer[ts_codes, asset_codes] = rows
+    is_missing = indexer == -1
+    has_missing = is_missing.any()
+    is_asset_missing = is_missing.any(axis=0)
+    index = pd.Index(timestamps, name=df.index.name)
+    if isinstance(index, pd.DatetimeIndex):
+        # Like when concatenating the data of each asset, the frequency is
+        # inferred only when the timestamps of the assets are not aligned.
+        index = pd.DatetimeIndex(index, freq="infer" if has_missing else None)
+    dfs = []
+    for col in df.columns.drop(asset_id_col):
+        srs = df[col]
+        if isinstance(srs.dtype, np.dtype) and (
+            not has_missing or srs.dtype.kind in "fcOMm"
+        ):
+            # Reorganize the values of all the assets at once, since the type
+            # doesn't change filling the missing values.
+            values = pd.api.extensions.take(
+                srs.to_numpy(), indexer.ravel(), allow_fill=has_missing
+            ).reshape(indexer.shape)
+            columns = pd.MultiIndex.from_product([[col], asset_ids])
+            dfs.append(pd.DataFrame(values, index=index, columns=columns))
+        else:
+            # Filling the missing values changes the type (e.g., from int to
+            # float) only for the assets with missing data, like when
+            # concatenating the data of each asset.
+            data = {}
+            for asset_code, asset_id in enumerate(asset_ids):
+                data[(col, asset_id)] = pd.api.extensions.take(
+                    srs.array,
+                    indexer[:, asset_code],
+                    allow_fill=bool(is_asset_missing[asset_code]),
+                )
+            dfs.append(pd.DataFrame(data, index=index))
+    df = pd.concat(dfs, axis=1)
     df.sort_index(axis=1, level=0, inplace=True)
-    # Remove the asset_id column, since it's redundant.
-    del df[asset_id_col]
     _LOG.debug(
         "After multiindex conversion:\n%s",
         hpandas.df_to_str(df.head()),
@@ -560,9 +613,10 @@ class HistoricalDataSource(dtfcore.DataSource):
             _LOG.debug(
                 "Removing %s from %s", self._col_names_to_remove, df.columns
             )
-            for col_name in self._col_names_to_remove:
-                hdbg.dassert_in(col_name, df.columns)
-                del df[col_name]
+            hdbg.dassert_is_subset(self._col_names_to_remove, df.columns)
+            # Remove all the columns at once to avoid copying the data for each
+            # column.
+            df = df.drop(columns=self._col_names_to_remove)
             _LOG.debug(
                 "After column removal\n:%s",
                 hpandas.df_to_str(df.head()),
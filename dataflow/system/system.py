@@ -85,6 +85,8 @@ _LOG = logging.getLogger(__name__)
 #     - profile_execution
 #     - dst_dir
 #     - force_free_nodes
+#     - num_threads
+#     - node_output_cache_config
 #
 #   - dag_builder_object
 #   - dag_builder_config
@@ -4,10 +4,12 @@ Import as:
 import dataflow.system.system_builder_utils as dtfssybuut
 """
 
+import collections
 import datetime
+import functools
 import logging
 import os
-from typing import Any, Callable, Coroutine, Optional, Tuple, Union
+from typing import Any, Callable, Coroutine, Dict, Optional, Tuple, Union
 
 import pandas as pd
 
@@ -134,15 +136,140 @@ def apply_MarketData_config(
     return system
 
 
+# Cache of the IM clients built from the System configs, keyed by the ctor and
+# the data config, e.g., when running many configs in the same process with
+# `run_config_list.py --worker_pool`.
+# The IM clients in the cache also cache the data they read in
+# `_READ_DATA_CACHE`, so that configs reading the same data load it only once.
+# `None` means that the cache is disabled.
+_IM_CLIENT_CACHE: Optional[Dict[Tuple[Callable, str], icdc.ImClient]] = None
+
+
+class _ReadDataCache:
+    """
+    Store dataframes in memory evicting the least recently used ones when
+    their size exceeds `max_size_in_bytes`.
+    """
+
+    def __init__(self, max_size_in_bytes: int) -> None:
+        hdbg.dassert_lt(0, max_size_in_bytes)
+        self.max_size_in_bytes = max_size_in_bytes
+        self._size_in_bytes = 0
+        self._cache: collections.OrderedDict = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get_size_in_bytes(self) -> int:
+        return self._size_in_bytes
+
+    def get(self, key: Any) -> Optional[pd.DataFrame]:
+        """
+        Return a copy of the dataframe stored for `key` or `None`.
+        """
+        if key not in self._cache:
+            return None
+        self._cache.move_to_end(key)
+        df, _ = self._cache[key]
+        # Return a copy so that callers can't modify the cached data.
+        return df.copy()
+
+    def put(self, key: Any, df: pd.DataFrame) -> None:
+        size_in_bytes = int(df.memory_usage(deep=True).sum())
+        if size_in_bytes > self.max_size_in_bytes:
+            _LOG.debug(
+                "Not caching data of size=%s larger than the cache",
+                size_in_bytes,
+            )
+            return
+        if key in self._cache:
+            _, old_size_in_bytes = self._cache.pop(key)
+            self._size_in_bytes -= old_size_in_bytes
+        self._cache[key] = (df.copy(), size_in_bytes)
+        self._size_in_bytes += size_in_bytes
+        # Evict starting from the least recently used.
+        while self._size_in_bytes > self.max_size_in_bytes:
+            _, (_, evicted_size_in_bytes) = self._cache.popitem(last=False)
+            self._size_in_bytes -= evicted_size_in_bytes
+
+
+# Data read by the cached IM clients, shared by all of them so that the memory
+# used by a process is bounded.
+_READ_DATA_CACHE: Optional[_ReadDataCache] = None
+
+
+def enable_im_client_cache(
+    val: bool, *, max_size_in_bytes: int = 2 * 1024**3
+) -> None:
+    """
+    Enable or disable the cache of the IM clients in this process.
+
+    :param max_size_in_bytes: memory used to cache the data read by the IM
+        clients, above which the least recently used data is evicted
+    """
+    global _IM_CLIENT_CACHE
+    global _READ_DATA_CACHE
+    if not val:
+        _IM_CLIENT_CACHE = None
+        _READ_DATA_CACHE = None
+        return
+    if _IM_CLIENT_CACHE is None:
+        _IM_CLIENT_CACHE = {}
+    if _READ_DATA_CACHE is None:
+        _READ_DATA_CACHE = _ReadDataCache(max_size_in_bytes)
+    else:
+        _READ_DATA_CACHE.max_size_in_bytes = max_size_in_bytes
+
+
+def is_im_client_cache_enabled() -> bool:
+    return _IM_CLIENT_CACHE is not None
+
+
+def _cache_read_data(im_client: icdc.ImClient) -> None:
+    """
+    Make `im_client.read_data()` cache its results in `_READ_DATA_CACHE`.
+    """
+    read_data = im_client.read_data
+
+    @functools.wraps(read_data)
+    def _read_data(*args: Any, **kwargs: Any) -> pd.DataFrame:
+        cache = _READ_DATA_CACHE
+        if cache is None:
+            return read_data(*args, **kwargs)
+        key = (id(im_client), repr((args, sorted(kwargs.items()))))
+        df = cache.get(key)
+        if df is None:
+            df = read_data(*args, **kwargs)
+            cache.put(key, df)
+        else:
+            _LOG.debug("Reading data from the cache")
+        return df
+
+    im_client.read_data = _read_data  # type: ignore[assignment]
+
+
 def build_ImClient_from_System(system: dtfsyssyst.System) -> icdc.ImClient:
     """
     Build an IM client from params in the system Config.
+
+    If the cache of the IM clients is enabled, the same IM client is returned
+    for the same ctor and params.
     """
     ctor = system.config["market_data_config", "im_client_ctor"]
     hdbg.dassert_isinstance(ctor, Callable)
     params = system.config["market_data_config", "im_client_config"]
+    if _IM_CLIENT_CACHE is not None:
+        # Key on the ctor object, since the repr of lambdas and partials
+        # depends on their address.
+        key = (ctor, str(params))
+        if key in _IM_CLIENT_CACHE:
+            _LOG.debug("Using the cached IM client for %s", key)
+            return _IM_CLIENT_CACHE[key]
     im_client = ctor(**params)
     hdbg.dassert_isinstance(im_client, icdc.ImClient)
+    if _IM_CLIENT_CACHE is not None:
+        _cache_read_data(im_client)
+        _IM_CLIENT_CACHE[key] = im_client
     return im_client
 
 
@@ -154,6 +281,22 @@ def apply_history_lookback(
     """
     Set the `history_looback` value in the system config.
     """
+    market_data_history_lookback = _get_history_lookback(system, days)
+    system.config[
+        "market_data_config", "history_lookback"
+    ] = market_data_history_lookback
+    return system
+
+
+def _get_history_lookback(
+    system: dtfsyssyst.System, days: Optional[int]
+) -> pd.Timedelta:
+    """
+    Get the amount of history needed to warm up the DAG of a System.
+
+    :param days: number of days of history; `None` to use twice the lookback
+        required by the DAG builder
+    """
     if days is None:
         dag_builder = system.config.get_and_mark_as_used("dag_builder_object")
         dag_config = system.config.get_and_mark_as_used("dag_config")
@@ -164,11 +307,8 @@ def apply_history_lookback(
             )
             * 2
         )
-    market_data_history_lookback = pd.Timedelta(days=days)
-    system.config[
-        "market_data_config", "history_lookback"
-    ] = market_data_history_lookback
-    return system
+    history_lookback = pd.Timedelta(days=days)
+    return history_lookback
 
 
 def get_ReplayedMarketData_from_df(
@@ -306,6 +446,24 @@ def apply_dag_property(
     if force_free_nodes:
         _LOG.warning("Setting force free nodes")
         dag.force_free_nodes = force_free_nodes
+    # 3) num_threads
+    num_threads = system.config.get_and_mark_as_used(
+        ("dag_property_config", "num_threads"), default_value="serial"
+    )
+    _LOG.debug(hprint.to_str("num_threads"))
+    if num_threads != "serial":
+        _LOG.warning("Setting num_threads=%s", num_threads)
+        dag.num_threads = num_threads
+    # 4) node_output_cache_config
+    node_output_cache_config = system.config.get_and_mark_as_used(
+        ("dag_property_config", "node_output_cache_config"), default_value=None
+    )
+    _LOG.debug(hprint.to_str("node_output_cache_config"))
+    if node_output_cache_config:
+        _LOG.warning("Setting node output cache")
+        dag.node_output_cache = dtfcore.NodeOutputCache(
+            **node_output_cache_config
+        )
     return system
 
 
@@ -852,3 +1010,58 @@ def get_RealTimeDagRunner_from_System(
     # _LOG.debug("system=\n%s", str(system.config))
     dag_runner = dtfsrtdaru.RealTimeDagRunner(**dag_runner_kwargs)
     return dag_runner
+
+
+def apply_IncrementalDagRunner_config(
+    system: dtfsyssyst.System,
+    *,
+    days: Optional[int] = None,
+) -> dtfsyssyst.System:
+    """
+    Set the `history_lookback` of an `IncrementalDagRunner` in the system
+    config.
+
+    The lookback bounds the data fed to the DAG at each bar, so that a run
+    costs O(number of bars) instead of O(number of bars^2).
+
+    :param days: number of days of history; `None` to use twice the lookback
+        required by the DAG builder
+    """
+    history_lookback = _get_history_lookback(system, days)
+    system.config["dag_runner_config", "history_lookback"] = history_lookback
+    return system
+
+
+def get_IncrementalDagRunner_from_System(
+    system: dtfsyssyst.System,
+) -> dtfcore.IncrementalDagRunner:
+    """
+    Build an incremental DAG runner from a system config.
+
+    The DAG predicts one bar at a time in `[start_timestamp, end_timestamp]`
+    of `backtest_config`, starting from the fit state in `dag_runner_config`
+    or, if missing, from the current fit state of the DAG.
+    """
+    hdbg.dassert_isinstance(system, dtfsyssyst.System)
+    dag = system.dag
+    start_timestamp = system.config["backtest_config", "start_timestamp"]
+    end_timestamp = system.config["backtest_config", "end_timestamp"]
+    freq = system.config["backtest_config", "trading_period_str"]
+    fit_state = system.config.get_and_mark_as_used(
+        ("dag_runner_config", "fit_state"), default_value=None
+    )
+    if fit_state is None:
+        fit_state = dtfcore.get_fit_state(dag)
+    # `None` feeds the DAG all the history up to each bar.
+    history_lookback = system.config.get_and_mark_as_used(
+        ("dag_runner_config", "history_lookback"), default_value=None
+    )
+    dag_runner = dtfcore.IncrementalDagRunner(
+        dag,
+        start_timestamp,
+        end_timestamp,
+        freq,
+        fit_state,
+        history_lookback=history_lookback,
+    )
+    return dag_runner
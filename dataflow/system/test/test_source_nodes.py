@@ -1,6 +1,8 @@
+import pandas as pd
 import pytest
 
 import dataflow.system.source_nodes as dtfsysonod
+import helpers.hpandas as hpandas
 import helpers.hunit_test as hunitest
 
 
@@ -17,3 +19,55 @@ class TestKibotEquityReader(hunitest.TestCase):
         df = node.fit()["df_out"]
         df_str = hunitest.convert_df_to_string(df, index=True)
         self.check_string(df_str)
+
+
+# #############################################################################
+# Test_convert_to_multiindex1
+# #############################################################################
+
+
+class Test_convert_to_multiindex1(hunitest.TestCase):
+    def test1(self) -> None:
+        """
+        Check converting data with missing and duplicated rows.
+        """
+        timestamps = [
+            "2022-01-04 09:01",
+            "2022-01-04 09:01",
+            "2022-01-04 09:01",
+            "2022-01-04 09:02",
+            "2022-01-04 09:02",
+            "2022-01-04 09:02",
+            "2022-01-04 09:03",
+            "2022-01-04 09:03",
+        ]
+        index = pd.DatetimeIndex(timestamps, tz="America/New_York")
+        index.name = "end_time"
+        df = pd.DataFrame(
+            {
+                "asset_id": [101, 202, 303, 101, 101, 303, 202, 303],
+                "close": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0],
+                "volume": [10, 20, 30, 40, 50, 60, 70, 80],
+            },
+            index=index,
+        )
+        actual = dtfsysonod._convert_to_multiindex(df, "asset_id")
+        actual = hpandas.df_to_str(actual) + "\n" + str(actual.dtypes)
+        # The duplicated row for asset 101 at 09:02 is removed and the volume
+        # of the asset without missing data is still an int.
+        expected = r"""
+                          close           volume
+                            101  202  303    101   202 303
+end_time
+2022-01-04 09:01:00-05:00   1.0  2.0  3.0   10.0  20.0  30
+2022-01-04 09:02:00-05:00   4.0  NaN  6.0   40.0   NaN  60
+2022-01-04 09:03:00-05:00   NaN  7.0  8.0    NaN  70.0  80
+close   101    float64
+        202    float64
+        303    float64
+volume  101    float64
+        202    float64
+        303      int64
+dtype: object
+        """
+        self.assert_equal(actual, expected, fuzzy_match=True)
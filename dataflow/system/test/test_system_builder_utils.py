@@ -0,0 +1,193 @@
+import functools
+import logging
+import types
+from typing import Any, List
+
+import pandas as pd
+
+import core.config as cconfig
+import core.finance as cofinanc
+import dataflow.core as dtfcore
+import dataflow.system.system as dtfsyssyst
+import dataflow.system.system_builder_utils as dtfssybuut
+import helpers.hunit_test as hunitest
+import im_v2.common.data.client as icdc
+
+_LOG = logging.getLogger(__name__)
+
+
+def _get_im_client(num_calls: List[int]) -> icdc.ImClient:
+    """
+    Build an IM client counting the calls to `read_data()`.
+    """
+    universe = ["binance::ADA_USDT", "binance::BTC_USDT"]
+    df = cofinanc.get_MarketData_df6(universe)
+    im_client = icdc.DataFrameImClient(df, universe)
+    read_data = im_client.read_data
+
+    def _read_data(*args: Any, **kwargs: Any) -> pd.DataFrame:
+        num_calls.append(1)
+        return read_data(*args, **kwargs)
+
+    im_client.read_data = _read_data
+    return im_client
+
+
+def _get_system(ctor: Any) -> Any:
+    config = cconfig.Config.from_dict(
+        {
+            "market_data_config": {
+                "im_client_ctor": ctor,
+                "im_client_config": cconfig.Config(),
+            }
+        }
+    )
+    return types.SimpleNamespace(config=config)
+
+
+def _read_data(im_client: icdc.ImClient, end_minute: int) -> pd.DataFrame:
+    df = im_client.read_data(
+        ["binance::ADA_USDT", "binance::BTC_USDT"],
+        pd.Timestamp("2000-01-01 14:31:00+00:00"),
+        pd.Timestamp(f"2000-01-01 14:{end_minute}:00+00:00"),
+        None,
+        "assert",
+    )
+    return df
+
+
+# #############################################################################
+# Test_build_ImClient_from_System1
+# #############################################################################
+
+
+class Test_build_ImClient_from_System1(hunitest.TestCase):
+    def tearDown(self) -> None:
+        dtfssybuut.enable_im_client_cache(False)
+        super().tearDown()
+
+    def test_cache1(self) -> None:
+        """
+        Check that the cached IM client returns copies of the cached data.
+        """
+        dtfssybuut.enable_im_client_cache(True)
+        num_calls: List[int] = []
+        ctor = functools.partial(_get_im_client, num_calls)
+        im_client = dtfssybuut.build_ImClient_from_System(_get_system(ctor))
+        self.assertIs(
+            dtfssybuut.build_ImClient_from_System(_get_system(ctor)), im_client
+        )
+        expected = _read_data(im_client, 40)
+        # Modify the returned data.
+        expected_copy = expected.copy()
+        expected["close"] = 0.0
+        actual = _read_data(im_client, 40)
+        self.assertEqual(len(num_calls), 1)
+        hunitest.compare_df(actual, expected_copy)
+
+    def test_cache2(self) -> None:
+        """
+        Check that different ctors are not served the same IM client.
+        """
+        dtfssybuut.enable_im_client_cache(True)
+        num_calls: List[int] = []
+        ctor1 = functools.partial(_get_im_client, num_calls)
+        ctor2 = functools.partial(_get_im_client, num_calls)
+        im_client1 = dtfssybuut.build_ImClient_from_System(_get_system(ctor1))
+        im_client2 = dtfssybuut.build_ImClient_from_System(_get_system(ctor2))
+        self.assertIsNot(im_client1, im_client2)
+
+    def test_bounded1(self) -> None:
+        """
+        Check that the least recently used data is evicted when the cache is
+        full.
+        """
+        num_calls: List[int] = []
+        im_client = _get_im_client(num_calls)
+        size_in_bytes = int(
+            _read_data(im_client, 40).memory_usage(deep=True).sum()
+        )
+        # Only 2 results fit in the cache.
+        dtfssybuut.enable_im_client_cache(
+            True, max_size_in_bytes=int(2.5 * size_in_bytes)
+        )
+        ctor = functools.partial(_get_im_client, num_calls)
+        im_client = dtfssybuut.build_ImClient_from_System(_get_system(ctor))
+        num_calls.clear()
+        for end_minute in [40, 39, 38]:
+            _read_data(im_client, end_minute)
+        cache = dtfssybuut._READ_DATA_CACHE
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.get_size_in_bytes(), cache.max_size_in_bytes)
+        # The most recent data is still cached, while the oldest is not.
+        _read_data(im_client, 38)
+        self.assertEqual(len(num_calls), 3)
+        _read_data(im_client, 40)
+        self.assertEqual(len(num_calls), 4)
+
+
+# #############################################################################
+# Test_get_IncrementalDagRunner_from_System1
+# #############################################################################
+
+
+class _Rolling_ForecastSystem(dtfsyssyst.NonTime_ForecastSystem):
+    """
+    Create a System computing a rolling mean of a synthetic series.
+    """
+
+    def _get_system_config_template(self) -> cconfig.Config:
+        _ = self
+        system_config = cconfig.Config(update_mode="overwrite")
+        system_config["dag_config"] = cconfig.Config()
+        return system_config
+
+    def _get_market_data(self) -> None:
+        _ = self
+
+    def _get_dag(self) -> dtfcore.DAG:
+        _ = self
+        df = pd.DataFrame(
+            {"x": [float(i % 7) for i in range(60)]},
+            index=pd.date_range("2010-01-04 09:30", periods=60, freq="T"),
+        )
+        dag = dtfcore.DAG()
+        dag.add_node(dtfcore.DfDataSource("source", df))
+        dag.add_node(
+            dtfcore.FunctionWrapper(
+                "rolling_mean", func=lambda df: df.rolling(5).mean()
+            )
+        )
+        dag.connect("source", "rolling_mean")
+        return dag
+
+    def _get_dag_runner(self) -> dtfcore.DagRunner:
+        dag_runner = dtfssybuut.get_IncrementalDagRunner_from_System(self)
+        return dag_runner
+
+
+class Test_get_IncrementalDagRunner_from_System1(hunitest.TestCase):
+    def test1(self) -> None:
+        """
+        Check that the history lookback in the config is used by the runner.
+        """
+        system = _Rolling_ForecastSystem()
+        dtfssybuut.apply_unit_test_log_dir(self, system)
+        system.config["backtest_config", "start_timestamp"] = pd.Timestamp(
+            "2010-01-04 10:00"
+        )
+        system.config["backtest_config", "end_timestamp"] = pd.Timestamp(
+            "2010-01-04 10:10"
+        )
+        system.config["backtest_config", "trading_period_str"] = "T"
+        system.config["dag_runner_config", "history_lookback"] = pd.Timedelta(
+            "10T"
+        )
+        result_bundles = list(system.dag_runner.predict())
+        self.assertEqual(len(result_bundles), 11)
+        for result_bundle in result_bundles:
+            result_df = result_bundle.result_df
+            self.assertEqual(
+                result_df.index.max() - result_df.index.min(),
+                pd.Timedelta("10T"),
+            )
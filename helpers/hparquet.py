@@ -5,10 +5,24 @@ import helpers.hparquet as hparque
 """
 
 import collections
+import concurrent.futures
 import datetime
+import functools
 import logging
+import operator
 import os
-from typing import Any, Callable, Iterator, List, Optional, Tuple, Union
+import uuid
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 import pandas as pd
@@ -76,11 +90,418 @@ def _get_parquet_tiles_from_file_path(file_path: str) -> List[Tuple[str, Any]]:
     return tiles
 
 
+# #############################################################################
+# ParquetTileCache
+# #############################################################################
+
+
+# Operators that can be used in Parquet filters.
+_FILTER_OPS: Dict[str, Callable[[Any, Any], bool]] = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda x, y: x in y,
+    "not in": lambda x, y: x not in y,
+}
+
+
+def _partition_matches_filters(
+    partition: Dict[str, Any], filters: Optional[List[Any]]
+) -> bool:
+    """
+    Check whether a partition can contain rows satisfying the filters.
+
+    Predicates that can't be evaluated on the partition values (e.g., on
+    non-partition columns) are considered satisfied, so that a partition is
+    discarded only when it certainly doesn't match.
+
+    :param partition: partition values, e.g.,
+        `{"currency_pair": "BTC_USDT", "year": 2022, "month": 1}`
+    :param filters: see `from_parquet()`
+    """
+    if not filters or not isinstance(filters, list):
+        return True
+    # Convert an AND filter into an OR-AND filter.
+    or_and_filter = filters if isinstance(filters[0], list) else [filters]
+    for and_filter in or_and_filter:
+        is_match = True
+        for col, op, value in and_filter:
+            if col not in partition or op not in _FILTER_OPS:
+                continue
+            partition_value = partition[col]
+            values = value if op in ("in", "not in") else [value]
+            if any(
+                isinstance(val, str) != isinstance(partition_value, str)
+                for val in values
+            ):
+                # Partition values are inferred from the paths, so a string
+                # can't be compared with a number.
+                continue
+            if not _FILTER_OPS[op](partition_value, value):
+                is_match = False
+                break
+        if is_match:
+            return True
+    return False
+
+
+class ParquetTileCache:
+    """
+    Store local copies of the files of S3 Parquet datasets.
+
+    The files are keyed by their S3 path, ETag, and size, so that a file
+    updated on S3 is downloaded again. E.g., the layout is like:
+    ```
+    {cache_dir}/
+        {bucket}/.../currency_pair=BTC_USDT/year=2022/month=1/
+            {etag}_{size}/
+                data.parquet
+    ```
+    The hive partition dirs are kept so that the local copies can be read as
+    a partitioned Parquet dataset.
+
+    The files are evicted in least-recently-used order when the size of the
+    cache exceeds `max_size_in_bytes`. The size of the cache is tracked as the
+    files are downloaded, and the cache dir is scanned only when evicting.
+
+    The cache dir can be shared by multiple processes, since files are
+    downloaded to a tmp file and then renamed. A process can evict a file
+    that another process is about to read, so the readers can download again
+    the missing files with `restore_files()`.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        *,
+        max_size_in_bytes: int = 50 * 1024**3,
+        num_threads: int = 8,
+    ) -> None:
+        """
+        Constructor.
+
+        :param cache_dir: dir storing the local copies of the files
+        :param max_size_in_bytes: size of the cache above which the least
+            recently used files are evicted
+        :param num_threads: number of files to download concurrently
+        """
+        _LOG.debug(hprint.to_str("cache_dir max_size_in_bytes num_threads"))
+        hdbg.dassert_isinstance(cache_dir, str)
+        hdbg.dassert_lt(0, max_size_in_bytes)
+        hdbg.dassert_lte(1, num_threads)
+        os.makedirs(cache_dir, exist_ok=True)
+        self._cache_dir = cache_dir
+        self._max_size_in_bytes = max_size_in_bytes
+        self._num_threads = num_threads
+        # The size of the files in the cache dir, computed by scanning the dir
+        # the first time that it's needed and then updated as files are
+        # downloaded and evicted. It doesn't account for the files downloaded
+        # or evicted by other processes until the dir is scanned again.
+        self._size_in_bytes: Optional[int] = None
+
+    def get_local_file_names(
+        self,
+        s3_path: str,
+        s3fs_: Any,
+        *,
+        filters: Optional[List[Any]] = None,
+    ) -> List[str]:
+        """
+        Return the local copies of the files of an S3 Parquet dataset.
+
+        Only the files in the partitions that can match `filters` are
+        downloaded, if they are not already in the cache.
+
+        :param s3_path: S3 path to a Parquet dataset or file
+        :param s3fs_: `s3fs` filesystem
+        :param filters: see `from_parquet()`
+        :return: local file names, or an empty list if no file matches
+        """
+        hs3.dassert_is_s3_path(s3_path)
+        # List the files with a single request.
+        root = s3_path[len("s3://") :].rstrip("/")
+        file_infos = s3fs_.find(root, detail=True)
+        hdbg.dassert_lte(
+            1, len(file_infos), "S3 path '%s' doesn't exist!", s3_path
+        )
+        local_file_names = []
+        to_download = []
+        for s3_file_name, info in sorted(file_infos.items()):
+            rel_path = s3_file_name[len(root) :].lstrip("/")
+            # Skip the files that are not part of a dataset (e.g., `_SUCCESS`),
+            # consistently with `pyarrow`.
+            if any(part.startswith((".", "_")) for part in rel_path.split("/")):
+                continue
+            partition = dict(_get_parquet_tiles_from_file_path(rel_path))
+            if not _partition_matches_filters(partition, filters):
+                continue
+            local_file_name = self._get_local_file_name(s3_file_name, info)
+            try:
+                # Mark the file as recently used.
+                os.utime(local_file_name)
+            except FileNotFoundError:
+                to_download.append((s3_file_name, local_file_name))
+            local_file_names.append(local_file_name)
+        _LOG.debug(
+            "Found %s files for '%s': %s to download",
+            len(local_file_names),
+            s3_path,
+            len(to_download),
+        )
+        self._download_files(s3fs_, to_download, set(local_file_names))
+        return local_file_names
+
+    def restore_files(self, local_file_names: List[str], s3fs_: Any) -> None:
+        """
+        Download again the files that have been evicted from the cache.
+
+        A process sharing the cache dir can evict the files returned by
+        `get_local_file_names()` before they are read.
+
+        :param local_file_names: local file names returned by
+            `get_local_file_names()`
+        :param s3fs_: `s3fs` filesystem
+        """
+        to_download = [
+            (self._get_s3_file_name(local_file_name), local_file_name)
+            for local_file_name in local_file_names
+            if not os.path.exists(local_file_name)
+        ]
+        if not to_download:
+            return
+        _LOG.warning(
+            "Downloading again %s files evicted from '%s'",
+            len(to_download),
+            self._cache_dir,
+        )
+        self._download_files(s3fs_, to_download, set(local_file_names))
+
+    def get_size_in_bytes(self) -> int:
+        """
+        Return the total size of the files in the cache.
+        """
+        self._size_in_bytes = sum(size for _, _, size in self._get_files())
+        return self._size_in_bytes
+
+    def _get_local_file_name(
+        self, s3_file_name: str, info: Dict[str, Any]
+    ) -> str:
+        etag = info.get("ETag", "").strip('"')
+        dir_name, base_name = os.path.split(s3_file_name)
+        return os.path.join(
+            self._cache_dir, dir_name, f"{etag}_{info['size']}", base_name
+        )
+
+    def _get_s3_file_name(self, local_file_name: str) -> str:
+        """
+        Invert `_get_local_file_name()`.
+        """
+        rel_path = os.path.relpath(local_file_name, self._cache_dir)
+        # Remove the `{etag}_{size}` dir.
+        dir_name, base_name = os.path.split(rel_path)
+        return os.path.join(os.path.dirname(dir_name), base_name)
+
+    def _download_files(
+        self,
+        s3fs_: Any,
+        to_download: List[Tuple[str, str]],
+        file_names_to_keep: Set[str],
+    ) -> None:
+        """
+        Download files concurrently and evict files if the cache is full.
+
+        :param to_download: `(s3_file_name, local_file_name)` pairs
+        :param file_names_to_keep: see `_evict()`
+        """
+        if not to_download:
+            return
+        func = lambda args: self._download(s3fs_, *args)
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(len(to_download), self._num_threads)
+        ) as executor:
+            sizes = list(executor.map(func, to_download))
+        if self._size_in_bytes is None:
+            # Scan the cache dir once, including the downloaded files.
+            self.get_size_in_bytes()
+        else:
+            self._size_in_bytes += sum(sizes)
+        if self._size_in_bytes > self._max_size_in_bytes:
+            self._evict(file_names_to_keep)
+
+    @staticmethod
+    def _download(s3fs_: Any, s3_file_name: str, local_file_name: str) -> int:
+        """
+        Download a file.
+
+        :return: size of the downloaded file
+        """
+        dir_name, base_name = os.path.split(local_file_name)
+        os.makedirs(dir_name, exist_ok=True)
+        # Download to a tmp file and then move it in place, so that concurrent
+        # readers never see a partial file.
+        tmp_file_name = os.path.join(
+            dir_name, f"tmp.{base_name}.{uuid.uuid4().hex}"
+        )
+        _LOG.debug("Downloading '%s' to '%s'", s3_file_name, local_file_name)
+        s3fs_.get_file(s3_file_name, tmp_file_name)
+        size = os.path.getsize(tmp_file_name)
+        os.replace(tmp_file_name, local_file_name)
+        return size
+
+    def _get_files(self) -> List[Tuple[float, str, int]]:
+        """
+        Return the files in the cache as `(mtime, file_name, size)`.
+        """
+        files = []
+        for root, _, file_names in os.walk(self._cache_dir):
+            for file_name in file_names:
+                if file_name.startswith("tmp."):
+                    continue
+                file_name = os.path.join(root, file_name)
+                try:
+                    stat = os.stat(file_name)
+                except FileNotFoundError:
+                    # The file has been evicted by another process.
+                    continue
+                files.append((stat.st_mtime, file_name, stat.st_size))
+        return files
+
+    def _evict(self, file_names_to_keep: Set[str]) -> None:
+        """
+        Remove the least recently used files until the cache fits in
+        `max_size_in_bytes`.
+
+        :param file_names_to_keep: files that are about to be read
+        """
+        # Scan the cache dir to account for the files downloaded or evicted by
+        # other processes.
+        files = self._get_files()
+        total_size = sum(size for _, _, size in files)
+        # Evict starting from the least recently used.
+        for _, file_name, size in sorted(files):
+            if total_size <= self._max_size_in_bytes:
+                break
+            if file_name in file_names_to_keep:
+                continue
+            _LOG.debug(
+                "Evicting '%s' (size=%s)", file_name, hintros.format_size(size)
+            )
+            try:
+                os.remove(file_name)
+                # Remove the `{etag}_{size}` dir.
+                os.rmdir(os.path.dirname(file_name))
+            except OSError:
+                pass
+            total_size -= size
+        self._size_in_bytes = total_size
+
+
+# The cache used by `from_parquet()` to read S3 datasets.
+_PARQUET_TILE_CACHE: Optional[ParquetTileCache] = None
+
+
+def set_parquet_tile_cache(cache: Optional[ParquetTileCache]) -> None:
+    """
+    Set the cache used to read S3 Parquet datasets.
+
+    :param cache: cache to use or `None` to always read from S3
+    """
+    global _PARQUET_TILE_CACHE
+    if cache is not None:
+        hdbg.dassert_isinstance(cache, ParquetTileCache)
+    _PARQUET_TILE_CACHE = cache
+
+
+def get_parquet_tile_cache() -> Optional[ParquetTileCache]:
+    """
+    Get the cache used to read S3 Parquet datasets, if any.
+    """
+    return _PARQUET_TILE_CACHE
+
+
+def _get_parquet_dataset_source(
+    file_name: str,
+    filters: Optional[List[Any]],
+    aws_profile: hs3.AwsProfile,
+    *,
+    use_tile_cache: bool = True,
+) -> Tuple[Union[str, List[str]], Any]:
+    """
+    Return the path(s) and the filesystem to read a Parquet dataset with
+    `pyarrow`.
+
+    S3 datasets are read through the local copies in the tile cache, if any.
+
+    :param file_name: see `from_parquet()`
+    :param filters: see `from_parquet()`
+    :param aws_profile: see `from_parquet()`
+    :param use_tile_cache: whether to use the tile cache or not
+    :return: path or local file names, `pyarrow` filesystem (`None` for the
+        local filesystem)
+    """
+    if not hs3.is_s3_path(file_name):
+        hdbg.dassert_path_exists(file_name)
+        return file_name, None
+    s3_filesystem = hs3.get_s3fs(aws_profile)
+    tile_cache = get_parquet_tile_cache()
+    if tile_cache is not None and use_tile_cache:
+        # Listing the files also checks that the path exists.
+        local_file_names = tile_cache.get_local_file_names(
+            file_name, s3_filesystem, filters=filters
+        )
+        if local_file_names:
+            return local_file_names, None
+    if isinstance(aws_profile, str):
+        filesystem = get_pyarrow_s3fs(aws_profile)
+    else:
+        # Note: `s3fs` filesystem is only to be used on exact file path
+        # as `pq.ParquetDataset` is not properly handling directory path.
+        filesystem = aws_profile
+    # Pyarrow S3FileSystem does not have `exists` method.
+    hs3.dassert_path_exists(file_name, s3_filesystem)
+    # Replace URI with path.
+    return file_name.lstrip("s3://"), filesystem
+
+
+def _call_restoring_evicted_files(
+    func: Callable[[], Any],
+    source: Union[str, List[str]],
+    aws_profile: hs3.AwsProfile,
+) -> Any:
+    """
+    Call a function reading the files of a Parquet dataset.
+
+    If the function can't find a local copy of a file in the tile cache (e.g.,
+    because it has been evicted by another process), the missing files are
+    downloaded again and the function is called one more time.
+
+    :param func: function reading the files
+    :param source: path or local file names returned by
+        `_get_parquet_dataset_source()`
+    :param aws_profile: see `from_parquet()`
+    :return: the output of `func`
+    """
+    try:
+        return func()
+    except FileNotFoundError:
+        tile_cache = get_parquet_tile_cache()
+        if tile_cache is None or not isinstance(source, list):
+            raise
+        s3_filesystem = hs3.get_s3fs(aws_profile)
+        tile_cache.restore_files(source, s3_filesystem)
+        return func()
+
+
 # TODO(Dan): Add mode to allow querying even when some non-existing columns are passed.
 def from_parquet(
     file_name: str,
     *,
     columns: Optional[List[str]] = None,
+    skip_columns: Optional[List[str]] = None,
     filters: Optional[List[Any]] = None,
     n_rows: Optional[int] = None,
     schema: Optional[List[Tuple[str, pa.DataType]]] = None,
@@ -94,9 +515,15 @@ def from_parquet(
     The difference with `pd.read_pq` is that here we use Parquet
     Dataset.
 
+    S3 datasets are read through the local copies stored in the cache set with
+    `set_parquet_tile_cache()`, if any.
+
     :param file_name: path to a Parquet dataset
     :param columns: columns to return, skipping reading columns that are not requested
        - `None` means return all available columns
+    :param skip_columns: columns not to read when `columns` is `None` (e.g.,
+        partition columns that are not needed), if they are present in the
+        dataset. The index is always read
     :param filters: Parquet query
     :param n_rows: the number of rows to load, load all data if `None`
     :param schema: see `pyarrow.Schema`, e.g., `schema =
@@ -107,23 +534,15 @@ def from_parquet(
         otherwise `None` for local path
     :return: data from Parquet dataset
     """
-    _LOG.debug(hprint.to_str("file_name columns filters schema"))
+    _LOG.debug(hprint.to_str("file_name columns skip_columns filters schema"))
     hdbg.dassert_isinstance(file_name, str)
     hs3.dassert_is_valid_aws_profile(file_name, aws_profile)
+    # The head of the data is read from a single S3 file, bypassing the cache.
+    source, filesystem = _get_parquet_dataset_source(
+        file_name, filters, aws_profile, use_tile_cache=not n_rows
+    )
     if hs3.is_s3_path(file_name):
-        if isinstance(aws_profile, str):
-            filesystem = get_pyarrow_s3fs(aws_profile)
-        else:
-            # Note: `s3fs` filesystem is only to be used on exact file path
-            # as `pq.ParquetDataset` is not properly handling directory path.
-            filesystem = aws_profile
-        # Pyarrow S3FileSystem does not have `exists` method.
-        s3_filesystem = hs3.get_s3fs(aws_profile)
-        hs3.dassert_path_exists(file_name, s3_filesystem)
         file_name = file_name.lstrip("s3://")
-    else:
-        filesystem = None
-        hdbg.dassert_path_exists(file_name)
     # Load data.
     with htimer.TimedScope(
         logging.DEBUG, f"# Reading Parquet file '{file_name}'"
@@ -131,6 +550,7 @@ def from_parquet(
         if n_rows:
             # Get the latest parquet file in the directory.
             last_pq_file = hs3.get_latest_pq_in_s3_dir(file_name, aws_profile)
+            s3_filesystem = hs3.get_s3fs(aws_profile)
             file = s3_filesystem.open(last_pq_file, "rb")
             # Load the data.
             parquet_file = pq.ParquetFile(file)
@@ -148,27 +568,44 @@ def from_parquet(
             tiles = _get_parquet_tiles_from_file_path(last_pq_file)
             for col, value in tiles:
                 df[col] = value
+            if not columns and skip_columns:
+                df = df.drop(
+                    [col for col in skip_columns if col in df.columns], axis=1
+                )
         else:
             if schema is not None:
                 # Pass partition columns types explicitly.
                 schema = pa.schema(schema)
             partitioning = ds.partitioning(schema, flavor="hive")
-            dataset = pq.ParquetDataset(
-                # Replace URI with path.
-                file_name,
-                filesystem=filesystem,
-                filters=filters,
-                partitioning=partitioning,
-                use_legacy_dataset=False,
-            )
-            if columns:
-                # Note: `schema.names` also includes and index.
-                hdbg.dassert_is_subset(columns, dataset.schema.names)
-            # To read also the index we need to use `read_pandas()`, instead of
-            # `read_table()`.
-            # See https://arrow.apache.org/docs/python/parquet.html#reading-and-writing-single-files.
-            table = dataset.read_pandas(columns=columns)
-            df = table.to_pandas()
+
+            def _read_dataset() -> pd.DataFrame:
+                dataset = pq.ParquetDataset(
+                    source,
+                    filesystem=filesystem,
+                    filters=filters,
+                    partitioning=partitioning,
+                    use_legacy_dataset=False,
+                )
+                columns_to_read = columns
+                if columns:
+                    # Note: `schema.names` also includes and index.
+                    hdbg.dassert_is_subset(columns, dataset.schema.names)
+                elif skip_columns:
+                    # Select the columns to read so that the skipped columns
+                    # are never decoded. The index columns are added back by
+                    # `read_pandas()`.
+                    columns_to_read = [
+                        col
+                        for col in dataset.schema.names
+                        if col not in skip_columns
+                    ]
+                # To read also the index we need to use `read_pandas()`,
+                # instead of `read_table()`.
+                # See https://arrow.apache.org/docs/python/parquet.html#reading-and-writing-single-files.
+                table = dataset.read_pandas(columns=columns_to_read)
+                return table.to_pandas()
+
+            df = _call_restoring_evicted_files(_read_dataset, source, aws_profile)
     # Report stats about the df.
     _LOG.debug("df.shape=%s", str(df.shape))
     mem = df.memory_usage().sum()
@@ -186,6 +623,132 @@ def from_parquet(
     return df
 
 
+def _tables_to_pandas(
+    tables: List[pa.Table], metadata: Optional[Dict[bytes, bytes]]
+) -> pd.DataFrame:
+    """
+    Concatenate Arrow tables into a dataframe.
+
+    :param metadata: metadata of the dataset schema, used to restore the
+        pandas metadata (e.g., the index) that is lost when selecting columns
+    """
+    table = pa.concat_tables(tables)
+    if metadata and b"pandas" in metadata:
+        new_metadata = table.schema.metadata or {}
+        new_metadata.update({b"pandas": metadata[b"pandas"]})
+        table = table.replace_schema_metadata(new_metadata)
+    return table.to_pandas()
+
+
+def yield_parquet_chunks(
+    file_name: str,
+    *,
+    columns: Optional[List[str]] = None,
+    filters: Optional[List[Any]] = None,
+    schema: Optional[List[Tuple[str, pa.DataType]]] = None,
+    max_chunk_size_in_bytes: int = 256 * 1024**2,
+    aws_profile: hs3.AwsProfile = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield the data of a Parquet dataset in chunks of bounded size.
+
+    Same as `from_parquet()` but, instead of materializing the entire dataset,
+    the data is read one row group at a time, so that datasets larger than the
+    memory can be processed. The row groups are accumulated until their size
+    in memory reaches `max_chunk_size_in_bytes` and then yielded as a single
+    dataframe.
+
+    The partitions and the row groups that can't match `filters` (based on the
+    partition values and the row group statistics) are not read.
+
+    :param file_name: see `from_parquet()`
+    :param columns: see `from_parquet()`
+    :param filters: see `from_parquet()`
+    :param schema: see `from_parquet()`
+    :param max_chunk_size_in_bytes: size in memory of the Arrow data after
+        which a chunk is yielded. A chunk can exceed it by at most one row group
+    :param aws_profile: see `from_parquet()`
+    :return: a generator of dataframes in the order of the files and of the
+        row groups in each file. No dataframe is yielded if there is no data
+    """
+    _LOG.debug(
+        hprint.to_str("file_name columns filters schema max_chunk_size_in_bytes")
+    )
+    hdbg.dassert_isinstance(file_name, str)
+    hdbg.dassert_lt(0, max_chunk_size_in_bytes)
+    hs3.dassert_is_valid_aws_profile(file_name, aws_profile)
+    source, filesystem = _get_parquet_dataset_source(
+        file_name, filters, aws_profile
+    )
+    if schema is not None:
+        # Pass partition columns types explicitly.
+        schema = pa.schema(schema)
+    partitioning = ds.partitioning(schema, flavor="hive")
+    dataset = _call_restoring_evicted_files(
+        lambda: ds.dataset(
+            source,
+            filesystem=filesystem,
+            format="parquet",
+            partitioning=partitioning,
+        ),
+        source,
+        aws_profile,
+    )
+    metadata = dataset.schema.metadata
+    if columns:
+        # Note: `schema.names` also includes and index.
+        hdbg.dassert_is_subset(columns, dataset.schema.names)
+        # Read also the index columns, like `read_pandas()` does.
+        if metadata and b"pandas" in metadata:
+            pandas_metadata = dataset.schema.pandas_metadata
+            index_columns = [
+                col
+                for col in pandas_metadata["index_columns"]
+                # A `RangeIndex` is stored as a dict instead of a column.
+                if isinstance(col, str) and col not in columns
+            ]
+            columns = list(columns) + index_columns
+    filter_expression = pq.filters_to_expression(filters) if filters else None
+    tables: List[pa.Table] = []
+    chunk_size_in_bytes = 0
+    for fragment in dataset.get_fragments(filter=filter_expression):
+        row_group_fragments = _call_restoring_evicted_files(
+            functools.partial(
+                fragment.split_by_row_group,
+                filter_expression,
+                schema=dataset.schema,
+            ),
+            source,
+            aws_profile,
+        )
+        for row_group_fragment in row_group_fragments:
+            table = _call_restoring_evicted_files(
+                functools.partial(
+                    row_group_fragment.to_table,
+                    schema=dataset.schema,
+                    columns=columns,
+                    filter=filter_expression,
+                ),
+                source,
+                aws_profile,
+            )
+            if table.num_rows == 0:
+                continue
+            tables.append(table)
+            chunk_size_in_bytes += table.nbytes
+            if chunk_size_in_bytes >= max_chunk_size_in_bytes:
+                _LOG.debug(
+                    "Yielding chunk with %s row groups (size=%s)",
+                    len(tables),
+                    hintros.format_size(chunk_size_in_bytes),
+                )
+                yield _tables_to_pandas(tables, metadata)
+                tables = []
+                chunk_size_in_bytes = 0
+    if tables:
+        yield _tables_to_pandas(tables, metadata)
+
+
 # Copied from `hio.create_enclosing_dir()` to avoid circular dependencies.
 def _create_enclosing_dir(file_name: str) -> Optional[str]:
     dir_name = os.path.dirname(file_name)
@@ -282,6 +845,8 @@ def _yield_parquet_tile(
     columns: List[str],
     filters: List[Any],
     asset_id_col: str,
+    *,
+    aws_profile: hs3.AwsProfile = None,
 ) -> Iterator[pd.DataFrame]:
     """
     Yield Parquet data in a single tile given the filters.
@@ -312,6 +877,7 @@ def _yield_parquet_tile(
     :param columns: see `from_parquet()`
     :param filters: see `from_parquet()`
     :param asset_id_col: name of the column with asset ids
+    :param aws_profile: see `from_parquet()`
     :return: a generator of `from_parquet()` dataframe
     """
     # Without the schema being provided `pyarrow` incorrectly infers
@@ -331,6 +897,7 @@ def _yield_parquet_tile(
         columns=columns,
         filters=filters,
         schema=schema,
+        aws_profile=aws_profile,
     )
     hpandas.dassert_series_type_is(tile[asset_id_col], int_type)
     yield tile
@@ -344,6 +911,7 @@ def yield_parquet_tiles_by_year(
     *,
     asset_ids: Optional[List[int]] = None,
     asset_id_col: str = "asset_id",
+    aws_profile: hs3.AwsProfile = None,
 ) -> Iterator[pd.DataFrame]:
     """
     Yield Parquet data in tiles up to one year in length.
@@ -354,6 +922,7 @@ def yield_parquet_tiles_by_year(
     :param cols: if an `int` is supplied, it is cast to a string before reading
     :param asset_ids: asset ids to load
     :param asset_id_col: see `_yield_parquet_tile()`
+    :param aws_profile: see `from_parquet()`
     :return: a generator of `from_parquet()` dataframes
     """
     time_filters = build_year_month_filter(start_date, end_date)
@@ -374,7 +943,11 @@ def yield_parquet_tiles_by_year(
         else:
             combined_filter = time_filter
         yield from _yield_parquet_tile(
-            file_name, columns, combined_filter, asset_id_col
+            file_name,
+            columns,
+            combined_filter,
+            asset_id_col,
+            aws_profile=aws_profile,
         )
 
 
@@ -395,6 +968,8 @@ def yield_parquet_tiles_by_assets(
     asset_id_col: str,
     asset_batch_size: int,
     cols: Optional[List[Union[int, str]]],
+    *,
+    aws_profile: hs3.AwsProfile = None,
 ) -> Iterator[pd.DataFrame]:
     """
     Yield Parquet data in tiles batched by asset ids.
@@ -404,6 +979,7 @@ def yield_parquet_tiles_by_assets(
     :param asset_id_col: see `_yield_parquet_tile()`
     :param asset_batch_size: the number of asset to load in a single batch
     :param cols: if an `int` is supplied, it is cast to a string before reading
+    :param aws_profile: see `from_parquet()`
     :return: a generator of `from_parquet()` dataframes
     """
     hdbg.dassert_isinstance(asset_id_col, str)
@@ -418,7 +994,9 @@ def yield_parquet_tiles_by_assets(
     for batch in tqdm(batches):
         _LOG.debug("assets=%s", batch)
         filter_ = build_asset_id_filter(batch, asset_id_col)
-        yield from _yield_parquet_tile(file_name, columns, filter_, asset_id_col)
+        yield from _yield_parquet_tile(
+            file_name, columns, filter_, asset_id_col, aws_profile=aws_profile
+        )
 
 
 def build_year_month_filter(
@@ -5,12 +5,26 @@ import helpers.hsql_implementation as hsqlimpl
 """
 
 import collections
+import contextlib
+import functools
 import io
 import logging
 import os
 import re
+import threading
 import time
-from typing import Any, Dict, List, Optional, Tuple, Union, cast
+import uuid
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
 
 import pandas as pd
 import psycopg2 as psycop
@@ -240,6 +254,222 @@ def db_connection_to_tuple(connection: DbConnection) -> DbConnectionInfo:
     return ret
 
 
+# #############################################################################
+# DbConnectionPool
+# #############################################################################
+
+
+class DbConnectionPool:
+    """
+    Thread-safe pool of connections to a DB.
+
+    - Between `min_size` and `max_size` connections are kept open. When all
+      the connections are in use, the callers wait until one is released
+    - The connections are checked before being handed out and the ones that
+      are not alive (e.g., closed by the server) are replaced transparently
+    - The connections that fail with a connection error while in use are
+      discarded when released
+
+    A pool can be passed instead of a connection to the functions executing
+    queries (e.g., `execute_query_to_df()`), which acquire a connection for the
+    duration of the call. Since connections are not held across `await`s, the
+    pool can also be used from coroutines.
+    """
+
+    def __init__(
+        self,
+        connect_func: Callable[[], DbConnection],
+        *,
+        min_size: int = 1,
+        max_size: int = 10,
+        health_check_interval_in_secs: float = 60.0,
+        timeout_in_secs: Optional[float] = None,
+    ) -> None:
+        """
+        Constructor.
+
+        :param connect_func: function returning a new connection, e.g.,
+            `lambda: get_connection(*connection_info)`
+        :param min_size: number of connections to open when creating the pool
+        :param max_size: max number of connections open at the same time
+        :param health_check_interval_in_secs: connections idle for longer than
+            this are checked with a query before being handed out, while the
+            other ones are only checked for being open
+        :param timeout_in_secs: max time to wait for a connection before
+            raising `TimeoutError`
+            - `None` means waiting indefinitely
+        """
+        _LOG.debug(
+            hprint.to_str(
+                "min_size max_size health_check_interval_in_secs timeout_in_secs"
+            )
+        )
+        hdbg.dassert_lte(0, min_size)
+        hdbg.dassert_lte(1, max_size)
+        hdbg.dassert_lte(min_size, max_size)
+        hdbg.dassert_lte(0, health_check_interval_in_secs)
+        self._connect_func = connect_func
+        self._max_size = max_size
+        self._health_check_interval_in_secs = health_check_interval_in_secs
+        self._timeout_in_secs = timeout_in_secs
+        self._condition = threading.Condition()
+        # Idle connections with the time when they were released, with the
+        # most recently used at the end.
+        self._idle_connections: List[Tuple[DbConnection, float]] = []
+        # Number of open connections, both idle and in use.
+        self._num_connections = 0
+        self._is_closed = False
+        for _ in range(min_size):
+            connection = self._connect_func()
+            self._idle_connections.append((connection, time.monotonic()))
+            self._num_connections += 1
+
+    def __str__(self) -> str:
+        with self._condition:
+            num_idle_connections = len(self._idle_connections)
+            num_connections = self._num_connections
+        txt = (
+            f"{self.__class__.__name__}: num_connections={num_connections} "
+            f"num_idle_connections={num_idle_connections} "
+            f"max_size={self._max_size}"
+        )
+        return txt
+
+    @contextlib.contextmanager
+    def get_connection(self) -> Iterator[DbConnection]:
+        """
+        Acquire a connection for the duration of a `with` block.
+        """
+        connection = self._acquire()
+        is_broken = False
+        try:
+            yield connection
+        except (psycop.OperationalError, psycop.InterfaceError):
+            # The connection might be unusable.
+            is_broken = True
+            raise
+        finally:
+            self._release(connection, is_broken)
+
+    def close(self) -> None:
+        """
+        Close the idle connections and the ones in use when they are released.
+        """
+        with self._condition:
+            self._is_closed = True
+            for connection, _ in self._idle_connections:
+                self._close_connection(connection)
+            self._num_connections -= len(self._idle_connections)
+            self._idle_connections = []
+            self._condition.notify_all()
+
+    @staticmethod
+    def _close_connection(connection: DbConnection) -> None:
+        try:
+            connection.close()
+        except psycop.Error as e:
+            _LOG.debug("Error closing connection: %s", str(e))
+
+    def _is_alive(self, connection: DbConnection, idle_time: float) -> bool:
+        if connection.closed:
+            return False
+        if idle_time < self._health_check_interval_in_secs:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            if not connection.autocommit:
+                connection.rollback()
+        except psycop.Error as e:
+            _LOG.warning("Discarding a connection that is not alive: %s", str(e))
+            return False
+        return True
+
+    def _acquire(self) -> DbConnection:
+        """
+        Get an idle connection or open a new one, if possible.
+        """
+        deadline = (
+            None
+            if self._timeout_in_secs is None
+            else time.monotonic() + self._timeout_in_secs
+        )
+        while True:
+            with self._condition:
+                while True:
+                    hdbg.dassert(not self._is_closed, "The pool is closed")
+                    if self._idle_connections:
+                        connection, release_time = self._idle_connections.pop()
+                        break
+                    if self._num_connections < self._max_size:
+                        # Reserve a slot for a new connection.
+                        connection = None
+                        self._num_connections += 1
+                        break
+                    timeout = None
+                    if deadline is not None:
+                        timeout = deadline - time.monotonic()
+                        if timeout <= 0:
+                            raise TimeoutError(
+                                f"No DB connection available after "
+                                f"{self._timeout_in_secs} seconds"
+                            )
+                    self._condition.wait(timeout)
+            # Check the connection or connect outside the lock, since it
+            # requires talking to the DB.
+            if connection is not None:
+                idle_time = time.monotonic() - release_time
+                if self._is_alive(connection, idle_time):
+                    return connection
+                self._close_connection(connection)
+            try:
+                return self._connect_func()
+            except Exception:
+                # Free the slot reserved for the connection.
+                with self._condition:
+                    self._num_connections -= 1
+                    self._condition.notify()
+                raise
+
+    def _release(self, connection: DbConnection, is_broken: bool) -> None:
+        """
+        Return a connection to the pool or close it, if it's not usable.
+        """
+        if not is_broken and not connection.closed and not connection.autocommit:
+            # Don't leave a transaction open, e.g., after an error.
+            try:
+                connection.rollback()
+            except psycop.Error:
+                is_broken = True
+        with self._condition:
+            if is_broken or connection.closed or self._is_closed:
+                self._close_connection(connection)
+                self._num_connections -= 1
+            else:
+                self._idle_connections.append((connection, time.monotonic()))
+            self._condition.notify()
+
+
+# A connection or a pool to get the connection from.
+DbConnectionOrPool = Union[DbConnection, DbConnectionPool]
+
+
+def _use_pooled_connection(func: Callable) -> Callable:
+    """
+    Run a function taking a connection as first argument with a connection
+    acquired from a pool, if a pool is passed instead of a connection.
+    """
+
+    @functools.wraps(func)
+    def wrapper(connection: DbConnectionOrPool, *args: Any, **kwargs: Any) -> Any:
+        if isinstance(connection, DbConnectionPool):
+            with connection.get_connection() as pooled_connection:
+                return func(pooled_connection, *args, **kwargs)
+        return func(connection, *args, **kwargs)
+
+    return wrapper
+
+
 # #############################################################################
 # State of the whole DB
 # #############################################################################
@@ -364,7 +594,8 @@ def remove_database(connection: DbConnection, dbname: str) -> None:
 # #############################################################################
 
 
-def get_table_names(connection: DbConnection) -> List[str]:
+@_use_pooled_connection
+def get_table_names(connection: DbConnectionOrPool) -> List[str]:
     """
     Report the name of the tables.
 
@@ -458,7 +689,10 @@ def head_tables(
     return txt
 
 
-def get_table_columns(connection: DbConnection, table_name: str) -> List[str]:
+@_use_pooled_connection
+def get_table_columns(
+    connection: DbConnectionOrPool, table_name: str
+) -> List[str]:
     """
     Get column names for given table.
     """
@@ -512,8 +746,9 @@ def find_tables_common_columns(
     return obj
 
 
+@_use_pooled_connection
 def remove_table(
-    connection: DbConnection, table_name: str, cascade: bool = False
+    connection: DbConnectionOrPool, table_name: str, cascade: bool = False
 ) -> None:
     """
     Remove a table from a database.
@@ -548,8 +783,9 @@ def remove_all_tables(connection: DbConnection, cascade: bool = False) -> None:
 
 
 # TODO(gp): -> as_df
+@_use_pooled_connection
 def execute_query_to_df(
-    connection: DbConnection,
+    connection: DbConnectionOrPool,
     query: str,
     limit: Optional[int] = None,
     offset: Optional[int] = None,
@@ -559,6 +795,8 @@ def execute_query_to_df(
 ) -> pd.DataFrame:
     """
     Execute a query.
+
+    See `execute_query_to_df_chunks()` to read large results in chunks.
     """
     if False:
         # Ask the user before executing a query.
@@ -594,6 +832,72 @@ def execute_query_to_df(
     return df
 
 
+def execute_query_to_df_chunks(
+    connection: DbConnectionOrPool,
+    query: str,
+    *,
+    chunk_size: int = 100000,
+) -> Iterator[pd.DataFrame]:
+    """
+    Execute a query and yield the results in chunks of at most `chunk_size`
+    rows.
+
+    Same as `execute_query_to_df()`, but the rows are fetched from a
+    server-side cursor, so that the memory used is bounded by the size of a
+    chunk instead of the size of the entire result set.
+
+    The cursor lives in a transaction that is committed when all the chunks
+    have been consumed (or rolled back if the iteration is interrupted), so
+    the connection should not be used for other queries while iterating.
+
+    :param connection: connection to the DB or a pool to get it from
+    :param query: query to execute
+    :param chunk_size: max number of rows in each chunk
+    :return: iterator over the results, with no chunk if there are no results
+    """
+    hdbg.dassert_lte(1, chunk_size)
+    if isinstance(connection, DbConnectionPool):
+        # Hold the connection until the iteration is over.
+        with connection.get_connection() as pooled_connection:
+            yield from execute_query_to_df_chunks(
+                pooled_connection, query, chunk_size=chunk_size
+            )
+        return
+    _LOG.debug(hprint.to_str("query chunk_size"))
+    if not connection.autocommit:
+        # Use the transaction in progress.
+        yield from _fetch_df_chunks(connection, query, chunk_size)
+        return
+    # A server-side cursor can only be used inside a transaction.
+    connection.autocommit = False
+    try:
+        with connection:
+            yield from _fetch_df_chunks(connection, query, chunk_size)
+    finally:
+        connection.autocommit = True
+
+
+def _fetch_df_chunks(
+    connection: DbConnection, query: str, chunk_size: int
+) -> Iterator[pd.DataFrame]:
+    # Passing a name creates a server-side cursor.
+    cursor_name = f"cursor_{uuid.uuid4().hex}"
+    with connection.cursor(name=cursor_name) as cursor:
+        # Number of rows transferred in each round-trip to the DB.
+        cursor.itersize = chunk_size
+        cursor.execute(query)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            columns = [column.name for column in cursor.description]
+            # Convert the rows in the same way as `pd.read_sql_query()`.
+            df = pd.DataFrame.from_records(
+                rows, columns=columns, coerce_float=True
+            )
+            yield df
+
+
 # #############################################################################
 # Insert
 # #############################################################################
@@ -624,8 +928,9 @@ def csv_to_series(csv_as_txt: str, sep: str = ",") -> pd.Series:
     return srs
 
 
+@_use_pooled_connection
 def copy_rows_with_copy_from(
-    connection: DbConnection, df: pd.DataFrame, table_name: str
+    connection: DbConnectionOrPool, df: pd.DataFrame, table_name: str
 ) -> None:
     """
     Copy dataframe contents into DB directly from buffer.
@@ -699,8 +1004,11 @@ def create_insert_on_conflict_do_nothing_query(
 
 
 # TODO(gp): -> connection, table_name, obj
+@_use_pooled_connection
 def execute_insert_query(
-    connection: DbConnection, obj: Union[pd.DataFrame, pd.Series], table_name: str
+    connection: DbConnectionOrPool,
+    obj: Union[pd.DataFrame, pd.Series],
+    table_name: str,
 ) -> None:
     """
     Insert a DB as multiple rows into the database.
@@ -727,8 +1035,9 @@ def execute_insert_query(
 
 
 # TODO(gp): -> connection, table_name, obj
+@_use_pooled_connection
 def execute_insert_on_conflict_do_nothing_query(
-    connection: DbConnection,
+    connection: DbConnectionOrPool,
     obj: Union[pd.DataFrame, pd.Series],
     table_name: str,
     unique_columns: List[str],
@@ -769,15 +1078,129 @@ def execute_insert_on_conflict_do_nothing_query(
         connection.commit()
     except Exception as e:
         _LOG.error(
-            "Failed to insert data with the '%s'. Query %s. Values: %s",
+            "Failed to insert %s rows with the '%s'. Query %s",
+            len(values),
             str(e),
             query,
-            values,
         )
         raise e
 
 
-def execute_query(connection: DbConnection, query: str) -> List[tuple]:
+# String representing NULL values in the data sent with `COPY`.
+_COPY_NULL = "\\N"
+
+
+def _to_copy_buffer(df: pd.DataFrame) -> io.StringIO:
+    """
+    Serialize a dataframe as CSV to send it to the DB with `COPY`.
+
+    NaNs in the float columns are sent as `NaN` values, like an `INSERT`
+    query does, while missing values in the other columns are sent as NULL.
+    """
+    float_cols = [
+        col
+        for col in df.columns
+        if df[col].dtype.kind == "f" and df[col].isna().any()
+    ]
+    if float_cols:
+        df = df.copy()
+        for col in float_cols:
+            df[col] = df[col].astype(object).where(df[col].notna(), "NaN")
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False, na_rep=_COPY_NULL)
+    buffer.seek(0)
+    return buffer
+
+
+@_use_pooled_connection
+def copy_rows_on_conflict_do_nothing(
+    connection: DbConnectionOrPool,
+    obj: Union[pd.DataFrame, pd.Series],
+    table_name: str,
+    unique_columns: List[str],
+) -> None:
+    """
+    Insert data into a table with `COPY`. If a UNIQUE constraint is violated
+    for a provided set of columns, duplicates are not inserted.
+
+    Same as `execute_insert_on_conflict_do_nothing_query()`, but much faster
+    for large dataframes since the data is streamed to the DB with `COPY` into
+    a temporary staging table, which is then inserted into the table with
+    `INSERT ... SELECT ... ON CONFLICT DO NOTHING`. All the operations are
+    executed in a single transaction.
+
+    :param connection: connection to the DB
+    :param obj: data to insert
+    :param table_name: name of the table for insertion
+    :param unique_columns: set of columns which should be unique record-wise.
+       If unique_columns is an empty list, the data is copied directly into
+       the table
+    """
+    if isinstance(obj, pd.Series):
+        df = obj.to_frame().T
+    else:
+        df = obj
+    hdbg.dassert_isinstance(df, pd.DataFrame)
+    hdbg.dassert_in(table_name, get_table_names(connection))
+    hdbg.dassert_is_subset(unique_columns, list(df.columns))
+    _LOG.debug("df=\n%s", hpandas.df_to_str(df, use_tabulate=False))
+    columns = ",".join(list(df.columns))
+    if unique_columns:
+        # Copy the data into a staging table that has the same column types as
+        # the table, but no constraints and defaults.
+        copy_table_name = f"{table_name}_staging"
+        unique_columns_str = ",".join(unique_columns)
+        queries_before_copy = [
+            f"CREATE TEMP TABLE {copy_table_name} ON COMMIT DROP AS "
+            f"SELECT {columns} FROM {table_name} WITH NO DATA"
+        ]
+        queries_after_copy = [
+            f"INSERT INTO {table_name}({columns}) "
+            f"SELECT {columns} FROM {copy_table_name} "
+            f"ON CONFLICT ({unique_columns_str}) DO NOTHING"
+        ]
+    else:
+        copy_table_name = table_name
+        queries_before_copy = []
+        queries_after_copy = []
+    copy_query = (
+        f"COPY {copy_table_name}({columns}) FROM STDIN "
+        f"WITH (FORMAT csv, NULL '{_COPY_NULL}')"
+    )
+    _LOG.debug(
+        "queries=%s",
+        queries_before_copy + [copy_query] + queries_after_copy,
+    )
+    buffer = _to_copy_buffer(df)
+    # Execute all the queries in a transaction, so that the staging table is
+    # dropped when the transaction is over.
+    autocommit = connection.autocommit
+    if autocommit:
+        connection.autocommit = False
+    try:
+        with connection:
+            with connection.cursor() as cur:
+                for query in queries_before_copy:
+                    cur.execute(query)
+                cur.copy_expert(copy_query, buffer)
+                for query in queries_after_copy:
+                    cur.execute(query)
+    except Exception as e:
+        _LOG.error(
+            "Failed to copy %s rows into '%s' with the '%s'",
+            df.shape[0],
+            table_name,
+            str(e),
+        )
+        raise e
+    finally:
+        connection.autocommit = autocommit
+
+
+@_use_pooled_connection
+def execute_query(
+    connection: DbConnectionOrPool, query: Union[str, psql.Composable]
+) -> List[tuple]:
     """
     Use for generic simple operations.
 
@@ -797,6 +1220,40 @@ def execute_query(connection: DbConnection, query: str) -> List[tuple]:
         return result
 
 
+def listen(connection: DbConnection, channel: str) -> None:
+    """
+    Subscribe the connection to the notifications sent on a channel.
+
+    The notifications are stored in `connection.notifies` after calling
+    `connection.poll()`.
+
+    :param connection: connection to the DB, which should not be used for other
+        queries, since they consume the notifications
+    :param channel: name of the channel, e.g., `new_bars`. The name is
+        quoted, so it is case-sensitive
+    """
+    _LOG.debug(hprint.to_str("channel"))
+    # Quote the channel name, since it can't be passed as a query parameter.
+    query = psql.SQL("LISTEN {};").format(psql.Identifier(channel))
+    execute_query(connection, query)
+
+
+def notify(connection: DbConnection, channel: str) -> None:
+    """
+    Send a notification on a channel to the connections listening to it.
+
+    The notification is delivered when the transaction is committed.
+
+    :param connection: connection to the DB
+    :param channel: name of the channel, e.g., `new_bars`. The name is
+        quoted, so it is case-sensitive
+    """
+    _LOG.debug(hprint.to_str("channel"))
+    # Quote the channel name, since it can't be passed as a query parameter.
+    query = psql.SQL("NOTIFY {};").format(psql.Identifier(channel))
+    execute_query(connection, query)
+
+
 # #############################################################################
 # Build more complex SQL queries.
 # #############################################################################
@@ -839,7 +1296,8 @@ def get_remove_duplicates_query(
     return remove_statement
 
 
-def get_num_rows(connection: DbConnection, table_name: str) -> int:
+@_use_pooled_connection
+def get_num_rows(connection: DbConnectionOrPool, table_name: str) -> int:
     """
     Return the number of rows in a DB table.
     """
@@ -2,6 +2,7 @@ import datetime
 import logging
 import os
 import random
+import unittest.mock as umock
 from typing import Any, List, Optional, Tuple
 
 import pandas as pd
@@ -12,6 +13,7 @@ import pytest
 import helpers.hdbg as hdbg
 import helpers.henv as henv
 import helpers.hgit as hgit
+import helpers.hio as hio
 import helpers.hmoto as hmoto
 import helpers.hpandas as hpandas
 import helpers.hparquet as hparque
@@ -418,6 +420,27 @@ class TestPartitionedParquet1(hunitest.TestCase):
         78   0     A"""
         self.assert_equal(df_as_str, exp, fuzzy_match=True)
 
+    def test_write_and_read5(self) -> None:
+        """
+        - Write a partitioned dataset with one partitioning column
+        - Read everything back skipping the partitioning column
+        """
+        df = _get_df_example1()
+        partition_cols = ["idx"]
+        exp_dir_signature = None
+        # Write and check.
+        dir_name = self.write_partitioned_dataset_and_check(
+            df, partition_cols, exp_dir_signature
+        )
+        # Read back everything but the partitioning column.
+        df2 = hparque.from_parquet(
+            dir_name, skip_columns=["idx"], log_level=logging.INFO
+        )
+        # Compare.
+        df = df.drop(["idx"], axis=1)
+        self.assertEqual(df.columns.tolist(), df2.columns.tolist())
+        _compare_dfs(self, df, df2)
+
     # //////////////////////////////////////////////////////////////////////////////
 
     def test_merge1(self) -> None:
@@ -949,6 +972,200 @@ class TestListAndMergePqFiles(hmoto.S3Mock_TestCase):
         self.assertEqual(len(df), 1)
 
 
+class TestYieldParquetChunks1(hunitest.TestCase):
+    def write_data(self) -> str:
+        """
+        Write a Parquet dataset partitioned by instrument with multiple row
+        groups per file.
+        """
+        df = _get_df_example1()
+        dst_dir = os.path.join(self.get_scratch_space(), "data")
+        for instr, df_instr in df.groupby("instr"):
+            dir_name = os.path.join(dst_dir, f"instr={instr}")
+            hio.create_dir(dir_name, incremental=False)
+            table = pyarrow.Table.from_pandas(df_instr.drop(["instr"], axis=1))
+            file_name = os.path.join(dir_name, "data.parquet")
+            parquet.write_table(table, file_name, row_group_size=20)
+        return dst_dir
+
+    def test_read1(self) -> None:
+        """
+        Check that the chunks add up to the data read by `from_parquet()`.
+        """
+        dst_dir = self.write_data()
+        chunks = list(
+            hparque.yield_parquet_chunks(dst_dir, max_chunk_size_in_bytes=1)
+        )
+        # Each of the 5 files has 4 row groups, yielded as separate chunks.
+        self.assertEqual(len(chunks), 20)
+        actual = pd.concat(chunks)
+        expected = hparque.from_parquet(dst_dir)
+        _compare_dfs(self, actual, expected)
+
+    def test_read2(self) -> None:
+        """
+        Check reading chunks with columns and filters.
+        """
+        dst_dir = self.write_data()
+        columns = ["val1"]
+        filters = [("instr", "in", ["A", "C"]), ("idx", "==", 2)]
+        chunks = list(
+            hparque.yield_parquet_chunks(
+                dst_dir,
+                columns=columns,
+                filters=filters,
+                max_chunk_size_in_bytes=1,
+            )
+        )
+        # Only the row groups of instrument "C" are read.
+        self.assertEqual(len(chunks), 4)
+        actual = pd.concat(chunks)
+        expected = hparque.from_parquet(dst_dir, columns=columns, filters=filters)
+        _compare_dfs(self, actual, expected)
+
+
+# #############################################################################
+
+
+@pytest.mark.skipif(
+    not henv.execute_repo_config_code("is_CK_S3_available()"),
+    reason="Run only if CK S3 is available",
+)
+class TestParquetTileCache1(hmoto.S3Mock_TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.s3fs_ = hs3.get_s3fs(self.mock_aws_profile)
+        self.s3_dir = f"s3://{self.bucket_name}/data"
+        self.df = _get_df_example1()
+        hparque.to_partitioned_parquet(
+            self.df, ["instr"], self.s3_dir, aws_profile=self.s3fs_
+        )
+        self.cache_dir = self.get_scratch_space()
+
+    def tearDown(self) -> None:
+        hparque.set_parquet_tile_cache(None)
+        super().tearDown()
+
+    def read_data(self, instrs: List[str]) -> pd.DataFrame:
+        df = hparque.from_parquet(
+            self.s3_dir,
+            filters=[("instr", "in", instrs)],
+            aws_profile=self.s3fs_,
+        )
+        return df
+
+    def get_cached_file_names(self) -> List[str]:
+        file_names = []
+        for root, _, files in os.walk(self.cache_dir):
+            for file_name in files:
+                file_name = os.path.join(root, file_name)
+                file_names.append(os.path.relpath(file_name, self.cache_dir))
+        return sorted(file_names)
+
+    def test_read1(self) -> None:
+        """
+        Check that the data read through the cache is the same as the data read
+        from S3 and that only the requested tiles are cached.
+        """
+        expected = self.read_data(["A", "C"])
+        cache = hparque.ParquetTileCache(self.cache_dir)
+        hparque.set_parquet_tile_cache(cache)
+        actual = self.read_data(["A", "C"])
+        _compare_dfs(self, actual, expected)
+        # Check the cached tiles.
+        file_names = self.get_cached_file_names()
+        self.assertEqual(len(file_names), 2)
+        self.assertIn("/instr=A/", file_names[0])
+        self.assertIn("/instr=C/", file_names[1])
+
+    def test_hit1(self) -> None:
+        """
+        Check that the cached tiles are not downloaded again.
+        """
+        cache = hparque.ParquetTileCache(self.cache_dir)
+        hparque.set_parquet_tile_cache(cache)
+        expected = self.read_data(["A", "C"])
+        with umock.patch.object(
+            cache, "_download", wraps=cache._download
+        ) as download_mock:
+            actual = self.read_data(["A", "C"])
+        self.assertEqual(download_mock.call_count, 0)
+        _compare_dfs(self, actual, expected)
+
+    def test_update1(self) -> None:
+        """
+        Check that a tile updated on S3 is downloaded again.
+        """
+        cache = hparque.ParquetTileCache(self.cache_dir)
+        hparque.set_parquet_tile_cache(cache)
+        _ = self.read_data(["A"])
+        # Update the data on S3.
+        df = self.df.copy()
+        df["val1"] += 1
+        hparque.to_partitioned_parquet(
+            df, ["instr"], self.s3_dir, aws_profile=self.s3fs_
+        )
+        actual = self.read_data(["A"])
+        expected = df[df["instr"] == "A"].drop(["instr"], axis=1)
+        _compare_dfs(self, actual.drop(["instr"], axis=1), expected)
+
+    def test_evict1(self) -> None:
+        """
+        Check that the least recently used tiles are evicted.
+        """
+        cache = hparque.ParquetTileCache(self.cache_dir, max_size_in_bytes=1)
+        hparque.set_parquet_tile_cache(cache)
+        _ = self.read_data(["A"])
+        _ = self.read_data(["B"])
+        # The tiles being read are never evicted.
+        file_names = self.get_cached_file_names()
+        self.assertEqual(len(file_names), 1)
+        self.assertIn("/instr=B/", file_names[0])
+
+    def test_size1(self) -> None:
+        """
+        Check that the size of the cache is tracked without scanning the cache
+        dir after each download.
+        """
+        cache = hparque.ParquetTileCache(self.cache_dir)
+        hparque.set_parquet_tile_cache(cache)
+        _ = self.read_data(["A"])
+        with umock.patch.object(
+            cache, "_get_files", wraps=cache._get_files
+        ) as get_files_mock:
+            _ = self.read_data(["B", "C"])
+        self.assertEqual(get_files_mock.call_count, 0)
+        expected = cache._size_in_bytes
+        self.assertEqual(cache.get_size_in_bytes(), expected)
+
+    def test_restore1(self) -> None:
+        """
+        Check that the tiles evicted by another process before being read are
+        downloaded again.
+        """
+        expected = self.read_data(["A", "C"])
+        cache = hparque.ParquetTileCache(self.cache_dir)
+        hparque.set_parquet_tile_cache(cache)
+        get_local_file_names = cache.get_local_file_names
+
+        def _get_local_file_names(*args: Any, **kwargs: Any) -> List[str]:
+            local_file_names = get_local_file_names(*args, **kwargs)
+            # Evict the files, like another process sharing the cache dir
+            # would do.
+            for local_file_name in local_file_names:
+                os.remove(local_file_name)
+            return local_file_names
+
+        with umock.patch.object(
+            cache, "get_local_file_names", side_effect=_get_local_file_names
+        ):
+            actual = self.read_data(["A", "C"])
+        _compare_dfs(self, actual, expected)
+        # The tiles are in the cache again.
+        file_names = self.get_cached_file_names()
+        self.assertEqual(len(file_names), 2)
+
+
 # #############################################################################
 
 
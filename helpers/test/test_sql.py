@@ -1,5 +1,6 @@
 import logging
 import pprint
+from typing import List
 
 import pandas as pd
 import psycopg2.errors as perrors
@@ -7,6 +8,7 @@ import pytest
 
 import helpers.hpandas as hpandas
 import helpers.hsql as hsql
+import helpers.hunit_test as hunitest
 
 # TODO(gp): This is a problematic dependency, since helpers should not depende
 #  from im_v2. For tests we could be more forgiving, but it would be better to
@@ -119,6 +121,51 @@ class TestSql1(imvcddbut.TestImDbHelper):
         # Delete the table.
         hsql.remove_table(self.connection, "test_table")
 
+    @pytest.mark.slow("16 seconds.")
+    def test_copy_rows_on_conflict_do_nothing1(self) -> None:
+        """
+        Verify that the rows violating the UNIQUE constraint are not copied.
+        """
+        self._create_test_table()
+        test_data = self._get_test_data()
+        hsql.execute_insert_query(
+            self.connection, test_data.iloc[:3], "test_table"
+        )
+        # Copy all the data, including the rows that are already present.
+        hsql.copy_rows_on_conflict_do_nothing(
+            self.connection, test_data, "test_table", ["id"]
+        )
+        # Load data.
+        df = hsql.execute_query_to_df(self.connection, "SELECT * FROM test_table")
+        actual = hpandas.convert_df_to_json_string(df, n_tail=None)
+        self.check_string(actual)
+        # Delete the table.
+        hsql.remove_table(self.connection, "test_table")
+
+    @pytest.mark.slow("10 seconds.")
+    def test_execute_query_to_df_chunks1(self) -> None:
+        """
+        Verify that reading in chunks returns the same data as reading at
+        once.
+        """
+        self._create_test_table()
+        test_data = self._get_test_data()
+        hsql.execute_insert_query(self.connection, test_data, "test_table")
+        query = "SELECT * FROM test_table ORDER BY id"
+        # Read the data in chunks.
+        chunks = list(
+            hsql.execute_query_to_df_chunks(self.connection, query, chunk_size=2)
+        )
+        self.assertEqual([chunk.shape[0] for chunk in chunks], [2, 2, 1])
+        actual = pd.concat(chunks, ignore_index=True)
+        # The connection is still in autocommit mode.
+        self.assertTrue(self.connection.autocommit)
+        # Check.
+        expected = hsql.execute_query_to_df(self.connection, query)
+        hunitest.compare_df(actual, expected)
+        # Delete the table.
+        hsql.remove_table(self.connection, "test_table")
+
     @pytest.mark.slow("9 seconds.")
     def test_duplicate_removal1(self) -> None:
         """
@@ -244,3 +291,145 @@ class TestSql1(imvcddbut.TestImDbHelper):
                     )
                     """
         self.connection.cursor().execute(query)
+
+
+# #############################################################################
+# TestDbConnectionPool1
+# #############################################################################
+
+
+class _FakeCursor:
+    def __init__(self, connection: "_FakeConnection") -> None:
+        self._connection = connection
+
+    def __enter__(self) -> "_FakeCursor":
+        return self
+
+    def __exit__(self, *args) -> None:
+        pass
+
+    def execute(self, query: str) -> None:
+        if not self._connection.is_alive:
+            raise perrors.OperationalError("server closed the connection")
+        self._connection.queries.append(query)
+
+    def fetchall(self) -> List[tuple]:
+        return [(1,)]
+
+
+class _FakeConnection:
+    """
+    Stand-in for a `psycopg2` connection.
+    """
+
+    def __init__(self) -> None:
+        self.closed = 0
+        self.autocommit = True
+        # The server side of the connection can go away without the client
+        # noticing until a query is executed.
+        self.is_alive = True
+        self.queries: List[str] = []
+
+    def cursor(self) -> _FakeCursor:
+        return _FakeCursor(self)
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = 1
+
+
+class TestDbConnectionPool1(hunitest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.connections: List[_FakeConnection] = []
+
+    def connect(self) -> _FakeConnection:
+        connection = _FakeConnection()
+        self.connections.append(connection)
+        return connection
+
+    def test_reuse1(self) -> None:
+        """
+        Check that released connections are reused.
+        """
+        pool = hsql.DbConnectionPool(self.connect, min_size=1, max_size=2)
+        with pool.get_connection() as connection1:
+            pass
+        with pool.get_connection() as connection2:
+            pass
+        self.assertIs(connection1, connection2)
+        self.assertEqual(len(self.connections), 1)
+        # Connections in use at the same time are different.
+        with pool.get_connection() as connection1:
+            with pool.get_connection() as connection2:
+                self.assertIsNot(connection1, connection2)
+        self.assertEqual(len(self.connections), 2)
+        pool.close()
+        self.assertTrue(all(conn.closed for conn in self.connections))
+
+    def test_max_size1(self) -> None:
+        """
+        Check that acquiring a connection times out when all are in use.
+        """
+        pool = hsql.DbConnectionPool(
+            self.connect, min_size=0, max_size=1, timeout_in_secs=0.1
+        )
+        with pool.get_connection():
+            with self.assertRaises(TimeoutError):
+                with pool.get_connection():
+                    pass
+        # The connection is available again once released.
+        with pool.get_connection():
+            pass
+        self.assertEqual(len(self.connections), 1)
+
+    def test_reconnect1(self) -> None:
+        """
+        Check that closed connections are replaced.
+        """
+        pool = hsql.DbConnectionPool(self.connect, min_size=1, max_size=1)
+        self.connections[0].close()
+        with pool.get_connection() as connection:
+            self.assertIs(connection, self.connections[1])
+            self.assertFalse(connection.closed)
+
+    def test_reconnect2(self) -> None:
+        """
+        Check that connections idle for longer than the health check interval
+        are checked with a query and replaced if they are dead.
+        """
+        pool = hsql.DbConnectionPool(
+            self.connect,
+            min_size=1,
+            max_size=1,
+            health_check_interval_in_secs=0,
+        )
+        with pool.get_connection():
+            pass
+        self.connections[0].is_alive = False
+        with pool.get_connection() as connection:
+            self.assertIs(connection, self.connections[1])
+        self.assertTrue(self.connections[0].closed)
+        # The connection is alive, so it is reused after the check.
+        with pool.get_connection() as connection:
+            self.assertIs(connection, self.connections[1])
+        self.assertEqual(self.connections[1].queries, ["SELECT 1"])
+
+    def test_broken_connection1(self) -> None:
+        """
+        Check that a connection failing while in use is discarded.
+        """
+        pool = hsql.DbConnectionPool(self.connect, min_size=1, max_size=1)
+        self.connections[0].is_alive = False
+        with self.assertRaises(perrors.OperationalError):
+            hsql.execute_query(pool, "SELECT * FROM table")
+        self.assertTrue(self.connections[0].closed)
+        # A new connection is used for the next query.
+        actual = hsql.execute_query(pool, "SELECT * FROM table")
+        self.assertEqual(actual, [(1,)])
+        self.assertEqual(self.connections[1].queries, ["SELECT * FROM table"])
@@ -32,6 +32,8 @@ import im_v2.common.db.db_utils as imvcddbut
 _LOG = logging.getLogger(__name__)
 
 _AWS_PROFILE = "ck"
+# Max number of rows fetched from the DB and archived at once.
+_DB_CHUNK_SIZE = 1000000
 
 
 def _assert_data_continuity(
@@ -188,22 +190,6 @@ def _archive_db_data_to_s3(args: argparse.Namespace) -> None:
     # Perform argument assertions.
     _assert_db_args(db_conn, db_table, table_timestamp_column)
     _assert_archival_mode(incremental, s3_dataset_path)
-    # Fetch DB data.
-    db_data = pd.DataFrame()
-    if mode in ("archive_only", "archive_and_delete"):
-        db_data = imvcddbut.fetch_data_by_age(
-            min_age_timestamp,
-            db_conn,
-            db_table,
-            table_timestamp_column,
-            args_from_signature["exchange_id"],
-        )
-        if db_data.empty:
-            _LOG.warning(
-                f"There is no data older than '{min_age_timestamp}' in '{db_table}' table."
-            )
-        else:
-            _LOG.info(f"Fetched {db_data.shape[0]} rows from '{db_table}'.")
     # Fetch latest S3 row upon incremental archival.
     if incremental:
         # TODO(Juraj): CmTask#3087 think about a HW resource friendly solution to this.
@@ -211,12 +197,21 @@ def _archive_db_data_to_s3(args: argparse.Namespace) -> None:
         # Assert time continuity of both datasets.
         # _assert_data_continuity(latest_row, skip_time_continuity_assertion)
         pass
-    if dry_run:
-        _LOG.info("Dry run of data archival finished successfully.")
-    else:
-        if not db_data.empty:
-            # Archive the data
-            if mode in ("archive_only", "archive_and_delete"):
+    # Fetch and archive DB data one chunk at a time, so that the memory used
+    # doesn't depend on the amount of data to archive.
+    if mode in ("archive_only", "archive_and_delete"):
+        db_data_chunks = imvcddbut.fetch_data_by_age(
+            min_age_timestamp,
+            db_conn,
+            db_table,
+            table_timestamp_column,
+            args_from_signature["exchange_id"],
+            chunk_size=_DB_CHUNK_SIZE,
+        )
+        num_rows = 0
+        for db_data in db_data_chunks:
+            num_rows += db_data.shape[0]
+            if not dry_run:
                 unit = "ms"
                 data_type = args_from_signature["data_type"]
                 # Partition by year, month and day for bid_ask and trades data.
@@ -235,9 +230,18 @@ def _archive_db_data_to_s3(args: argparse.Namespace) -> None:
                     mode="append",
                     partition_mode=partition_mode,
                 )
-            # Double check archival was successful
-            # TODO(Juraj): CmTask#3087 this might a be pretty difficult problem.
-            # _assert_correct_archival(db_data, s3_path)
+        # Double check archival was successful
+        # TODO(Juraj): CmTask#3087 this might a be pretty difficult problem.
+        # _assert_correct_archival(db_data, s3_path)
+        if num_rows == 0:
+            _LOG.warning(
+                f"There is no data older than '{min_age_timestamp}' in '{db_table}' table."
+            )
+        else:
+            _LOG.info(f"Fetched {num_rows} rows from '{db_table}'.")
+    if dry_run:
+        _LOG.info("Dry run of data archival finished successfully.")
+    else:
         # Drop DB data.
         if mode in ("archive_and_delete", "delete_only"):
             _delete_data_from_db(
@@ -226,7 +226,8 @@ class TestArchiveDbDataToS3Mode(hunitest.TestCase):
             "mode": mode,
         }
         mock_fetch_data_by_age = umock.MagicMock()
-        mock_fetch_data_by_age.return_value = pd.DataFrame({"col": ["value"]})
+        # The data is fetched in chunks.
+        mock_fetch_data_by_age.return_value = [pd.DataFrame({"col": ["value"]})]
         imvcdaddts._assert_db_args = umock.MagicMock()
         imvcdaddts.imvcddbut = umock.MagicMock()
         imvcdaddts.imvcddbut.fetch_data_by_age = mock_fetch_data_by_age
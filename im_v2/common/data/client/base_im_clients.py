@@ -8,6 +8,7 @@ import abc
 import logging
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 import core.finance.bid_ask as cfibiask
@@ -146,6 +147,13 @@ class ImClient(abc.ABC):
         )
         return universe  # type: ignore[no-any-return]
 
+    def get_full_symbol_col_name(self) -> str:
+        """
+        Return the name of the column storing the full symbols in the data
+        returned by `read_data()`.
+        """
+        return self._get_full_symbol_col_name(None)
+
     def read_data(
         self,
         full_symbols: List[ivcu.FullSymbol],
@@ -229,45 +237,28 @@ class ImClient(abc.ABC):
         )
         # Rename index.
         df.index.name = self._timestamp_col_name
-        # Normalize data for each symbol.
-        _LOG.debug("full_symbols=%s", df[full_symbol_col_name].unique())
-        dfs = []
-        for full_symbol, df_tmp in df.groupby(full_symbol_col_name):
-            _LOG.debug("apply_im_normalization: full_symbol=%s", full_symbol)
-            df_tmp = self._apply_im_normalizations(
-                df_tmp,
-                full_symbol_col_name,
-                self._resample_1min,
-                start_ts,
-                end_ts,
-            )
-            if not df_tmp.empty:
-                # Validate data that remained after normalization and append it
-                # to the result.
-                # TODO(gp): Difference between amp and cmamp.
-                self._dassert_output_data_is_valid(
-                    df_tmp,
-                    full_symbol_col_name,
-                    self._resample_1min,
-                    start_ts,
-                    end_ts,
-                    self._timestamp_col_name,
-                )
-                dfs.append(df_tmp)
-            else:
-                _LOG.debug("Df for full_symbol=%s is empty", full_symbol)
         hdbg.dassert_lt(0, df.shape[0], "Empty df=\n%s", df)
-        df = pd.concat(dfs, axis=0)
+        # Normalize the data for all the symbols at once.
+        df = self._apply_im_normalizations(
+            df,
+            full_symbol_col_name,
+            self._resample_1min,
+            start_ts,
+            end_ts,
+        )
         _LOG.debug("After im_normalization: df=\n%s", hpandas.df_to_str(df))
-        # Sort by index and `full_symbol_col_name`.
-        # There is not a simple way to sort by index and columns in Pandas,
-        # so we convert the index into a column, sort, and convert back.
-        df = df.reset_index()
-        df = df.sort_values(by=[self._timestamp_col_name, full_symbol_col_name])
-        df = df.set_index(self._timestamp_col_name, drop=True)
+        # Validate the data that remained after normalization.
+        # TODO(gp): Difference between amp and cmamp.
+        self._dassert_output_data_is_valid(
+            df,
+            full_symbol_col_name,
+            self._resample_1min,
+            start_ts,
+            end_ts,
+            self._timestamp_col_name,
+        )
         # The full_symbol should be a string.
         hdbg.dassert_isinstance(df[full_symbol_col_name].values[0], str)
-        _LOG.debug("After sorting: df=\n%s", hpandas.df_to_str(df))
         # Check that columns are required ones.
         # TODO(gp): Difference between amp and cmamp.
         # TODO(gp): This makes a test in E8 fail.
@@ -329,26 +320,15 @@ class ImClient(abc.ABC):
     ) -> pd.DataFrame:
         """
         Apply normalizations to IM data.
+
+        The data for all the symbols is normalized at once, instead of
+        symbol by symbol.
+
+        :return: normalized data sorted by timestamp and full symbol
         """
         _LOG.debug(hprint.to_str("full_symbol_col_name start_ts end_ts"))
-        # 1) Drop duplicated timestamps.
-        use_index = True
-        df = hpandas.drop_duplicates(df, use_index)
-        # TODO(Grisha): Consider adding "knowledge_timestamp" to every dataset
-        # and removing the condition, otherwise some tests fail, see CmTask3630.
-        if "knowledge_timestamp" in df.columns:
-            duplicate_columns = [full_symbol_col_name]
-            # Sort values by "knowledge_timestamp" to keep the latest ones while
-            # removing duplicates.
-            df = df.sort_values("knowledge_timestamp", ascending=True)
-            use_index = True
-            df = hpandas.drop_duplicates(
-                df,
-                use_index,
-                column_subset=duplicate_columns,
-                keep="last",
-            ).sort_index()
-        # 2) Trim the data keeping only the data with index in [start_ts, end_ts].
+        hpandas.dassert_index_is_datetime(df)
+        # 1) Trim the data keeping only the data with index in [start_ts, end_ts].
         # Trimming of the data is done because:
         # - some data sources can be only queried at day resolution so we get
         #   a date range and then we trim
@@ -360,19 +340,165 @@ class ImClient(abc.ABC):
         df = hpandas.trim_df(
             df, ts_col_name, start_ts, end_ts, left_close, right_close
         )
-        # 3) Resample index to 1 min frequency if specified.
+        # 2) Sort by timestamp and full symbol.
+        (
+            df,
+            full_symbol_codes,
+            full_symbols,
+        ) = ImClient._sort_by_timestamp_and_full_symbol(df, full_symbol_col_name)
+        # 3) Drop duplicated timestamps.
+        is_duplicated = ImClient._get_duplicated_mask(
+            df.index.asi8, full_symbol_codes
+        )
+        # Copy the data only if there are duplicates, which is rare.
+        if is_duplicated.any():
+            # `hpandas.drop_duplicates()` adds a column to the passed df.
+            df = df.copy()
+            use_index = True
+            df = hpandas.drop_duplicates(df, use_index)
+            # TODO(Grisha): Consider adding "knowledge_timestamp" to every
+            # dataset and removing the condition, otherwise some tests fail,
+            # see CmTask3630.
+            if "knowledge_timestamp" in df.columns:
+                duplicate_columns = [full_symbol_col_name]
+                # Sort values by "knowledge_timestamp" to keep the latest ones
+                # while removing duplicates.
+                df = df.sort_values(
+                    "knowledge_timestamp", ascending=True, kind="stable"
+                )
+                use_index = True
+                df = hpandas.drop_duplicates(
+                    df,
+                    use_index,
+                    column_subset=duplicate_columns,
+                    keep="last",
+                )
+            (
+                df,
+                full_symbol_codes,
+                full_symbols,
+            ) = ImClient._sort_by_timestamp_and_full_symbol(
+                df, full_symbol_col_name
+            )
+            is_duplicated = ImClient._get_duplicated_mask(
+                df.index.asi8, full_symbol_codes
+            )
+        # 4) Resample index to 1 min frequency if specified.
         if resample_1min:
-            df = hpandas.resample_df(df, "T")
-            # Fill NaN values appeared after resampling in full symbol column.
-            # Combination of full symbol and timestamp is a unique identifier,
-            # so full symbol cannot be NaN.
-            df[full_symbol_col_name] = df[full_symbol_col_name].fillna(
-                method="bfill"
+            hdbg.dassert(
+                not is_duplicated.any(), msg="Index must have only unique values"
+            )
+            df = ImClient._resample_1min(
+                df, full_symbol_col_name, full_symbol_codes, full_symbols
             )
-        # 4) Convert to UTC.
+        # 5) Convert to UTC.
         df.index = df.index.tz_convert("UTC")
         return df
 
+    @staticmethod
+    def _sort_by_timestamp_and_full_symbol(
+        df: pd.DataFrame, full_symbol_col_name: str
+    ) -> Tuple[pd.DataFrame, np.ndarray, pd.Index]:
+        """
+        Sort the data by timestamp and full symbol, dropping the rows without
+        a full symbol.
+
+        :return:
+            - sorted data
+            - codes of the full symbols in the sorted full symbols for each row
+              of the sorted data
+            - sorted full symbols
+        """
+        full_symbol_codes, full_symbols = pd.factorize(
+            df[full_symbol_col_name], sort=True
+        )
+        mask = full_symbol_codes >= 0
+        if not mask.all():
+            df = df[mask]
+            full_symbol_codes = full_symbol_codes[mask]
+        idxs = np.lexsort((full_symbol_codes, df.index.asi8))
+        df = df.iloc[idxs]
+        full_symbol_codes = full_symbol_codes[idxs]
+        return df, full_symbol_codes, full_symbols
+
+    @staticmethod
+    def _get_duplicated_mask(
+        timestamps: np.ndarray, full_symbol_codes: np.ndarray
+    ) -> np.ndarray:
+        """
+        Return whether each row of data sorted by timestamp and full symbol
+        repeats the (timestamp, full symbol) pair of the previous row.
+
+        :return: boolean array with one element less than the number of rows
+        """
+        is_duplicated = (timestamps[1:] == timestamps[:-1]) & (
+            full_symbol_codes[1:] == full_symbol_codes[:-1]
+        )
+        return is_duplicated
+
+    @staticmethod
+    def _resample_1min(
+        df: pd.DataFrame,
+        full_symbol_col_name: str,
+        full_symbol_codes: np.ndarray,
+        full_symbols: pd.Index,
+    ) -> pd.DataFrame:
+        """
+        Resample the data of each symbol to 1 min frequency, placing NaNs in
+        the missing timestamps.
+
+        Like `hpandas.resample_df()`, the data of each symbol is reindexed in
+        [first timestamp, last timestamp] of the symbol.
+
+        :param df: data sorted by timestamp and full symbol, without duplicated
+            timestamps for a symbol
+        :param full_symbol_codes: codes of the full symbols in `full_symbols`
+            for each row of `df`
+        :param full_symbols: sorted full symbols
+        :return: resampled data sorted by timestamp and full symbol
+        """
+        timestamps = df.index.asi8
+        # Build the 1 min grid of each symbol.
+        freq = pd.Timedelta(minutes=1).value
+        timestamps_by_symbol = pd.Series(timestamps).groupby(full_symbol_codes)
+        min_timestamps = timestamps_by_symbol.min().to_numpy()
+        max_timestamps = timestamps_by_symbol.max().to_numpy()
+        hdbg.dassert_eq(len(min_timestamps), len(full_symbols))
+        grid_lengths = (max_timestamps - min_timestamps) // freq + 1
+        grid_starts = np.cumsum(grid_lengths) - grid_lengths
+        grid_codes = np.repeat(np.arange(len(full_symbols)), grid_lengths)
+        grid_offsets = np.arange(grid_lengths.sum()) - np.repeat(
+            grid_starts, grid_lengths
+        )
+        grid_timestamps = (
+            np.repeat(min_timestamps, grid_lengths) + grid_offsets * freq
+        )
+        # Find the position of each row in the grid, dropping the rows that
+        # are not on the grid.
+        offsets = timestamps - min_timestamps[full_symbol_codes]
+        is_on_grid = offsets % freq == 0
+        grid_idxs = grid_starts[full_symbol_codes] + offsets // freq
+        # Sort the grid by timestamp and full symbol.
+        idxs = np.lexsort((grid_codes, grid_timestamps))
+        grid_timestamps = grid_timestamps[idxs]
+        grid_codes = grid_codes[idxs]
+        sorted_grid_idxs = np.empty_like(idxs)
+        sorted_grid_idxs[idxs] = np.arange(len(idxs))
+        # Reindex the data on the grid.
+        row_idxs = np.full(len(idxs), -1)
+        row_idxs[sorted_grid_idxs[grid_idxs[is_on_grid]]] = np.flatnonzero(
+            is_on_grid
+        )
+        index = pd.to_datetime(grid_timestamps, utc=True).tz_convert(df.index.tz)
+        index.name = df.index.name
+        df = df.set_axis(pd.RangeIndex(df.shape[0]), axis=0)
+        df = df.reindex(row_idxs)
+        df.index = index
+        # Combination of full symbol and timestamp is a unique identifier, so
+        # full symbol cannot be NaN.
+        df[full_symbol_col_name] = np.asarray(full_symbols)[grid_codes]
+        return df
+
     @staticmethod
     def _dassert_output_data_is_valid(
         df: pd.DataFrame,
@@ -384,17 +510,16 @@ class ImClient(abc.ABC):
     ) -> None:
         """
         Verify that the normalized data is valid.
+
+        The checks are performed on the data for all the symbols at once.
         """
         # TODO(Grisha): consider using `hpandas.dassert_time_indexed_df()`.
         # Check that data is not empty.
         hdbg.dassert_lt(0, df.shape[0])
         # Check that index is `pd.DatetimeIndex`.
         hpandas.dassert_index_is_datetime(df)
-        if resample_1min:
-            # Check that index is monotonic increasing.
-            hpandas.dassert_strictly_increasing_index(df)
-            # Verify that index frequency is 1 minute.
-            hdbg.dassert_eq(df.index.freq, "T")
+        # Check that index is monotonic increasing.
+        hpandas.dassert_increasing_index(df)
         # Check that timezone info is correct.
         expected_tz = ["UTC"]
         # Assume that the first value of an index is representative.
@@ -403,16 +528,42 @@ class ImClient(abc.ABC):
             expected_tz,
         )
         # Check that full symbol column has no NaNs.
-        hdbg.dassert(df[full_symbol_col_name].notna().all())
-        # Check that there are no duplicates in data by index and full symbol.
-        n_duplicated_rows = (
-            df.reset_index()
-            .duplicated(subset=[timestamp_col_name, full_symbol_col_name])
-            .sum()
-        )
+        full_symbol_codes, _ = pd.factorize(df[full_symbol_col_name], sort=True)
+        hdbg.dassert((full_symbol_codes >= 0).all())
+        # Check that the data is sorted by timestamp and full symbol, which
+        # also guarantees that there are no duplicates in data by index and
+        # full symbol.
+        timestamps = df.index.asi8
+        is_same_timestamp = timestamps[1:] == timestamps[:-1]
+        is_sorted = full_symbol_codes[1:] > full_symbol_codes[:-1]
+        n_duplicated_rows = (is_same_timestamp & ~is_sorted).sum()
         hdbg.dassert_eq(
-            n_duplicated_rows, 0, msg="There are duplicated rows in the data"
+            n_duplicated_rows,
+            0,
+            msg="There are duplicated or unsorted rows in the data by "
+            f"'{timestamp_col_name}' and '{full_symbol_col_name}'",
         )
+        if resample_1min:
+            # Verify that the timestamps of each symbol have 1 minute frequency,
+            # i.e., they are all on a 1 minute grid and there are no gaps.
+            freq = pd.Timedelta(minutes=1).value
+            stats = (
+                pd.Series(timestamps)
+                .groupby(full_symbol_codes)
+                .agg(["min", "max", "count"])
+            )
+            min_timestamps = stats["min"].to_numpy()
+            hdbg.dassert(
+                (
+                    (timestamps - min_timestamps[full_symbol_codes]) % freq == 0
+                ).all(),
+                msg="The timestamps are not on a 1 minute grid",
+            )
+            expected_counts = (stats["max"] - stats["min"]) // freq + 1
+            hdbg.dassert(
+                (stats["count"] == expected_counts).all(),
+                msg="There are gaps in the 1 minute data",
+            )
         # Ensure that all the data is in [start_ts, end_ts].
         hdateti.dassert_timestamp_lte(start_ts, df.index.min())
         hdateti.dassert_timestamp_lte(df.index.max(), end_ts)
@@ -6,9 +6,10 @@ import im_v2.common.data.client.historical_pq_clients as imvcdchpcl
 
 import abc
 import collections
+import concurrent.futures
 import logging
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
 
@@ -39,6 +40,9 @@ class HistoricalPqByTileClient(
     full symbol.
     """
 
+    # Columns that are not included in the output.
+    _COLUMNS_TO_DROP = ["month", "year", "timestamp"]
+
     def __init__(
         self,
         # TODO(gp): We could use *args, **kwargs as params for ImClient,
@@ -54,6 +58,7 @@ class HistoricalPqByTileClient(
         aws_profile: Optional[str] = None,
         full_symbol_col_name: Optional[str] = None,
         resample_1min: bool = False,
+        num_concurrent_reads: Optional[int] = None,
     ):
         """
         Constructor.
@@ -68,6 +73,9 @@ class HistoricalPqByTileClient(
             originating the data. This allows to merging multiple Parquet files on
             exchange. See CmTask #1533 "Add exchange to the ParquetDataset partition".
         :param aws_profile: AWS profile, e.g., "ck"
+        :param num_concurrent_reads: max number of root dirs (e.g., exchanges)
+            to read concurrently
+            - `None` means reading all the root dirs concurrently
         """
         super().__init__(
             vendor,
@@ -80,6 +88,9 @@ class HistoricalPqByTileClient(
         self._infer_exchange_id = infer_exchange_id
         self._partition_mode = partition_mode
         self._aws_profile = aws_profile
+        if num_concurrent_reads is not None:
+            hdbg.dassert_lte(1, num_concurrent_reads)
+        self._num_concurrent_reads = num_concurrent_reads
 
     @staticmethod
     def get_metadata() -> pd.DataFrame:
@@ -152,92 +163,128 @@ class HistoricalPqByTileClient(
         kwargs["columns"] = self._get_columns_for_query(
             full_symbol_col_name, columns
         )
+        # Don't read the columns that are not included in the `ImClient` output.
+        kwargs["skip_columns"] = self._COLUMNS_TO_DROP
         # Add AWS profile to kwargs.
         kwargs["aws_profile"] = self._aws_profile
         # Build root dirs to the data and Parquet filtering condition.
         root_dir_symbol_filter_dict = self._get_root_dirs_symbol_filters(
             full_symbols, full_symbol_col_name
         )
-        #
-        res_df_list = []
-        for root_dir, symbol_filter in root_dir_symbol_filter_dict.items():
-            # Build list of filters for a query and add them to kwargs.
-            filters = hparque.get_parquet_filters_from_timestamp_interval(
-                self._partition_mode,
-                start_ts,
-                end_ts,
-                additional_filters=[symbol_filter],
-            )
-            kwargs["filters"] = filters
-            # Read Parquet data from a root dir.
-            root_dir_df = hparque.from_parquet(root_dir, **kwargs)
-            # TODO(Grisha): "Handle missing tiles" CmTask #1775.
-            # hdbg.dassert_lte(
-            #     1,
-            #     root_dir_df.shape[0],
-            #     "Can't find data for root_dir='%s' and symbol_filter='%s'",
-            #     root_dir,
-            #     symbol_filter,
-            # )
-            # Convert index to datetime.
-            root_dir_df.index = pd.to_datetime(root_dir_df.index)
-            # TODO(gp): IgHistoricalPqByTileTaqBarClient used a ctor param to rename a column.
-            #  Not sure if this is still needed.
-            #        # Rename column storing `full_symbols`, if needed.
-            #        hdbg.dassert_in(self._full_symbol_col_name, df.columns)
-            #        if full_symbol_col_name != self._full_symbol_col_name:
-            #            hdbg.dassert_not_in(full_symbol_col_name, df.columns)
-            #            df.rename(
-            #                columns={self._full_symbol_col_name: full_symbol_col_name},
-            #                inplace=True,
-            #            )
-            transformation_kwargs: Dict = {}
-            if self._infer_exchange_id:
-                # Infer `exchange_id` position in a file path.
-                s3_bucket_path = hs3.get_s3_bucket_path(self._aws_profile)
-                reorg_root_dir = os.path.join(s3_bucket_path, "reorg")
-                daily_staged_reorg_dir = os.path.join(
-                    reorg_root_dir, "daily_staged.airflow.pq"
+        # Read the data from the root dirs (e.g., one per exchange)
+        # concurrently, since the reads are dominated by I/O.
+        func = lambda root_dir_symbol_filter: self._read_data_for_root_dir(
+            root_dir_symbol_filter,
+            start_ts,
+            end_ts,
+            full_symbol_col_name,
+            **kwargs,
+        )
+        root_dir_symbol_filters = list(root_dir_symbol_filter_dict.items())
+        if len(root_dir_symbol_filters) == 1:
+            res_df_list = [func(root_dir_symbol_filters[0])]
+        else:
+            num_concurrent_reads = len(root_dir_symbol_filters)
+            if self._num_concurrent_reads is not None:
+                num_concurrent_reads = min(
+                    num_concurrent_reads, self._num_concurrent_reads
                 )
-                if root_dir == daily_staged_reorg_dir:
-                    # E.g. "binance" from
-                    # "s3://cryptokaizen-data/reorg/daily_staged.airflow.pq/bid_ask-futures/crypto_chassis.downloaded_1min/binance/".
-                    exchange_loc = -1
-                else:
-                    # E.g. "binance" from
-                    # "s3://cryptokaizen-data/v3/periodic_daily/airflow/downloaded_1min/parquet/bid_ask/futures/v3/crypto_chassis/binance/v1_0_0/".
-                    exchange_loc = -2
-                # Infer `exchange_id` from a file path if it is not present in data.
-                # E.g., `s3://.../latest/ohlcv/ccxt/binance` -> `binance`.
-                transformation_kwargs["exchange_id"] = root_dir.split("/")[
-                    exchange_loc
-                ]
-            # Transform data.
-            root_dir_df = self._apply_transformations(
-                root_dir_df, full_symbol_col_name, **transformation_kwargs
-            )
-            # The columns are used just to partition the data but these columns
-            # are not included in the `ImClient` output.
-            current_columns = root_dir_df.columns.to_list()
-            month_column = "month"
-            if month_column in current_columns:
-                root_dir_df = root_dir_df.drop(month_column, axis=1)
-            year_column = "year"
-            if year_column in current_columns:
-                root_dir_df = root_dir_df.drop(year_column, axis=1)
-            # Column with name "timestamp" that stores epochs remains in most
-            # vendors data if no column filtering was done. Drop it since it
-            # replicates data from index and has the same name as index column
-            # which causes a break when we try to reset it.
-            timestamp_column = "timestamp"
-            if timestamp_column in current_columns:
-                root_dir_df = root_dir_df.drop(timestamp_column, axis=1)
-            #
-            res_df_list.append(root_dir_df)
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=num_concurrent_reads
+            ) as executor:
+                # `map()` returns the results in the order of the root dirs.
+                res_df_list = list(executor.map(func, root_dir_symbol_filters))
         # Combine data from all root dirs into a single DataFrame.
         res_df = pd.concat(res_df_list, axis=0)
         return res_df
 
+    def _read_data_for_root_dir(
+        self,
+        root_dir_symbol_filter: Tuple[str, hparque.ParquetFilter],
+        start_ts: Optional[pd.Timestamp],
+        end_ts: Optional[pd.Timestamp],
+        full_symbol_col_name: str,
+        **kwargs: Any,
+    ) -> pd.DataFrame:
+        """
+        Read and transform the data from a root dir.
+
+        :param root_dir_symbol_filter: root dir and the corresponding symbol
+            filter, as returned by `_get_root_dirs_symbol_filters()`
+        :param kwargs: params for `hparque.from_parquet()`
+        """
+        root_dir, symbol_filter = root_dir_symbol_filter
+        # Build list of filters for a query. The filters on the partitions
+        # are pushed down to the Parquet reader, so that the partitions and
+        # the row groups that don't match are not decoded.
+        filters = hparque.get_parquet_filters_from_timestamp_interval(
+            self._partition_mode,
+            start_ts,
+            end_ts,
+            additional_filters=[symbol_filter],
+        )
+        # Read Parquet data from a root dir.
+        root_dir_df = hparque.from_parquet(root_dir, filters=filters, **kwargs)
+        # TODO(Grisha): "Handle missing tiles" CmTask #1775.
+        # hdbg.dassert_lte(
+        #     1,
+        #     root_dir_df.shape[0],
+        #     "Can't find data for root_dir='%s' and symbol_filter='%s'",
+        #     root_dir,
+        #     symbol_filter,
+        # )
+        # Convert index to datetime.
+        root_dir_df.index = pd.to_datetime(root_dir_df.index)
+        # TODO(gp): IgHistoricalPqByTileTaqBarClient used a ctor param to rename a column.
+        #  Not sure if this is still needed.
+        #        # Rename column storing `full_symbols`, if needed.
+        #        hdbg.dassert_in(self._full_symbol_col_name, df.columns)
+        #        if full_symbol_col_name != self._full_symbol_col_name:
+        #            hdbg.dassert_not_in(full_symbol_col_name, df.columns)
+        #            df.rename(
+        #                columns={self._full_symbol_col_name: full_symbol_col_name},
+        #                inplace=True,
+        #            )
+        transformation_kwargs: Dict = {}
+        if self._infer_exchange_id:
+            # Infer `exchange_id` position in a file path.
+            s3_bucket_path = hs3.get_s3_bucket_path(self._aws_profile)
+            reorg_root_dir = os.path.join(s3_bucket_path, "reorg")
+            daily_staged_reorg_dir = os.path.join(
+                reorg_root_dir, "daily_staged.airflow.pq"
+            )
+            if root_dir == daily_staged_reorg_dir:
+                # E.g. "binance" from
+                # "s3://cryptokaizen-data/reorg/daily_staged.airflow.pq/bid_ask-futures/crypto_chassis.downloaded_1min/binance/".
+                exchange_loc = -1
+            else:
+                # E.g. "binance" from
+                # "s3://cryptokaizen-data/v3/periodic_daily/airflow/downloaded_1min/parquet/bid_ask/futures/v3/crypto_chassis/binance/v1_0_0/".
+                exchange_loc = -2
+            # Infer `exchange_id` from a file path if it is not present in data.
+            # E.g., `s3://.../latest/ohlcv/ccxt/binance` -> `binance`.
+            transformation_kwargs["exchange_id"] = root_dir.split("/")[
+                exchange_loc
+            ]
+        # Transform data.
+        root_dir_df = self._apply_transformations(
+            root_dir_df, full_symbol_col_name, **transformation_kwargs
+        )
+        # The columns are not read unless they are explicitly requested, but
+        # they are not included in the `ImClient` output anyway:
+        # - "year" and "month" are used just to partition the data
+        # - "timestamp" stores epochs in most vendors data and it replicates
+        #   data from index and has the same name as index column which causes
+        #   a break when we try to reset it
+        columns_to_drop = [
+            column
+            for column in self._COLUMNS_TO_DROP
+            if column in root_dir_df.columns
+        ]
+        if columns_to_drop:
+            root_dir_df = root_dir_df.drop(columns_to_drop, axis=1)
+        return root_dir_df
+
     # TODO(Grisha): try to unify child classes with the base class, see CmTask #1696
     # "Refactor HistoricalPqByTileClient and its child classes".
     # TODO(Grisha): remove the hack that allows to read data for multiple exchanges in
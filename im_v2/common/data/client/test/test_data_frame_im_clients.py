@@ -3,6 +3,8 @@ from typing import List
 import pandas as pd
 
 import core.finance as cofinanc
+import helpers.hpandas as hpandas
+import helpers.hunit_test as hunitest
 import im_v2.common.data.client.data_frame_im_clients as imvcdcdfimc
 import im_v2.common.data.client.data_frame_im_clients_example as imvcdcdfimce
 import im_v2.common.data.client.im_client_test_case as imvcdcimctc
@@ -329,3 +331,78 @@ class TestDataFrameImClient1(imvcdcimctc.ImClientTestCase):
             expected_first_elements,
             expected_last_elements,
         )
+
+
+# #############################################################################
+# TestDataFrameImClient2
+# #############################################################################
+
+
+class TestDataFrameImClient2(hunitest.TestCase):
+    def test_read_data_resample1(self) -> None:
+        """
+        Test resampling the data of multiple symbols with gaps and duplicates.
+        """
+        universe = ["binance::ADA_USDT", "binance::BTC_USDT"]
+        timestamps = pd.to_datetime(
+            [
+                "2000-01-01 14:31:00+00:00",
+                "2000-01-01 14:34:00+00:00",
+                "2000-01-01 14:32:00+00:00",
+                "2000-01-01 14:33:00+00:00",
+                "2000-01-01 14:33:00+00:00",
+            ]
+        )
+        df = pd.DataFrame(
+            {
+                "full_symbol": [
+                    "binance::BTC_USDT",
+                    "binance::BTC_USDT",
+                    "binance::ADA_USDT",
+                    "binance::ADA_USDT",
+                    "binance::ADA_USDT",
+                ],
+                "close": [1.0, 2.0, 3.0, 4.0, 5.0],
+                "knowledge_timestamp": pd.to_datetime(
+                    [
+                        "2000-01-01 14:32:00+00:00",
+                        "2000-01-01 14:35:00+00:00",
+                        "2000-01-01 14:33:00+00:00",
+                        "2000-01-01 14:40:00+00:00",
+                        "2000-01-01 14:34:00+00:00",
+                    ]
+                ),
+            },
+            index=timestamps,
+        )
+        im_client = imvcdcdfimc.DataFrameImClient(
+            df, universe, full_symbol_col_name="full_symbol", resample_1min=True
+        )
+        actual = im_client.read_data(universe, None, None, None, "assert")
+        actual = hpandas.df_to_str(actual, num_rows=None)
+        # The duplicated timestamp of ADA_USDT is resolved using the latest
+        # knowledge timestamp.
+        expected = r"""
+                                         full_symbol  close       knowledge_timestamp
+        timestamp
+        2000-01-01 14:31:00+00:00  binance::BTC_USDT    1.0 2000-01-01 14:32:00+00:00
+        2000-01-01 14:32:00+00:00  binance::ADA_USDT    3.0 2000-01-01 14:33:00+00:00
+        2000-01-01 14:32:00+00:00  binance::BTC_USDT    NaN                       NaT
+        2000-01-01 14:33:00+00:00  binance::ADA_USDT    4.0 2000-01-01 14:40:00+00:00
+        2000-01-01 14:33:00+00:00  binance::BTC_USDT    NaN                       NaT
+        2000-01-01 14:34:00+00:00  binance::BTC_USDT    2.0 2000-01-01 14:35:00+00:00
+        """
+        self.assert_equal(actual, expected, fuzzy_match=True)
+
+    def test_get_full_symbol_col_name1(self) -> None:
+        """
+        Test that the name of the full symbol column passed to the ctor is
+        returned.
+        """
+        universe = ["binance::ADA_USDT", "binance::BTC_USDT"]
+        df = cofinanc.get_MarketData_df6(universe)
+        df = df.rename(columns={"full_symbol": "symbol"})
+        im_client = imvcdcdfimc.DataFrameImClient(
+            df, universe, full_symbol_col_name="symbol"
+        )
+        self.assertEqual(im_client.get_full_symbol_col_name(), "symbol")
@@ -72,10 +72,19 @@ def _main(parser: argparse.ArgumentParser) -> None:
     # Make a path to CSV file.
     file_name = os.path.basename(pq_file_path).split(".")[-2]
     csv_file_path = os.path.join(dst_dir, file_name + ".csv")
-    # Convert the file.
-    df = hparque.from_parquet(pq_file_path, aws_profile=aws_profile)
+    # Convert the file in chunks to bound the memory usage.
     _LOG.debug("Saving CSV file at %s", csv_file_path)
-    df.to_csv(csv_file_path)
+    if aws_profile is None:
+        csv_file = open(csv_file_path, "w", newline="")
+    else:
+        s3fs_ = hs3.get_s3fs(aws_profile)
+        csv_file = s3fs_.open(csv_file_path, "w", newline="")
+    with csv_file:
+        chunks = hparque.yield_parquet_chunks(
+            pq_file_path, aws_profile=aws_profile
+        )
+        for idx, df in enumerate(chunks):
+            df.to_csv(csv_file, header=idx == 0)
 
 
 if __name__ == "__main__":
@@ -10,7 +10,7 @@ import argparse
 import logging
 import os
 from datetime import timedelta
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Union
 
 import pandas as pd
 import psycopg2 as psycop
@@ -55,10 +55,16 @@ class DbConnectionManager:
     Provide a singleton-like functionality in order to avoid overhead of
     many shortlived DB connection. For simplicity the class only
     supports setting up a DB connection to exactly one stage.
+
+    For concurrent clients (e.g., multiple downloaders or threads), a
+    connection pool for each stage can be used instead of the shared
+    connection, see `get_connection_pool()`.
     """
 
     connection = None
     db_stage = None
+    # Map a DB stage to its connection pool.
+    connection_pools: Dict[str, hsql.DbConnectionPool] = {}
 
     @classmethod
     def get_connection(cls, db_stage: str) -> hsql.DbConnection:
@@ -66,6 +72,9 @@ class DbConnectionManager:
         Get a database connection. If the connection exists, return the object,
         otherwise create it.
 
+        A closed connection (e.g., after a DB restart) is replaced with a new
+        one.
+
         :param stage: DB stage to create connection to. The stage is only considered
          if environment variables for connection are not passed, otherwise it is only
          stored as an information.
@@ -75,38 +84,74 @@ class DbConnectionManager:
             raise ValueError(
                 "The connection has already been established to a different stage"
             )
+        if cls.connection is not None and cls.connection.closed:
+            _LOG.warning("The %s DB connection is closed: reconnecting", db_stage)
+            cls.connection = None
         if cls.connection is None:
-            try:
-                # Connect with the parameters from the env var.
-                #  Usually when credentials are injected into a container.
-                #
-                cls.connection = hsql.get_connection_from_env_vars()
-            except KeyError as e:
-                _LOG.info(
-                    f"Unable to fetch DB credentials from environment variables: \n\t{e}\n\t"
-                    + "Attempting env file method."
-                )
-                try:
-                    # If there are no OS env vars, try to fetch credentials from env file.
-                    env_file = imvimlita.get_db_env_path(db_stage)
-                    # Connect with the parameters from the env file.
-                    #  Usually for test and dev stage.
-                    connection_params = hsql.get_connection_info_from_env_file(
-                        env_file
-                    )
-                    cls.connection = hsql.get_connection(*connection_params)
-                except Exception as e:
-                    _LOG.info(
-                        f"Unable to fetch DB credentials from env file: \n\t{e}\n\t"
-                        + "Attempting AWS SecretsManager method."
-                    )
-                    cls.connection = hsql.get_connection_from_aws_secret(
-                        stage=db_stage
-                    )
+            cls.connection = cls._connect(db_stage)
             _LOG.info("Created %s DB connection: \n %s", db_stage, cls.connection)
             cls.db_stage = db_stage
         return cls.connection
 
+    @classmethod
+    def get_connection_pool(
+        cls, db_stage: str, *, min_size: int = 1, max_size: int = 10
+    ) -> hsql.DbConnectionPool:
+        """
+        Get a pool of connections to a DB stage, creating it on the first call.
+
+        The pool can be passed to the `hsql` functions instead of a connection
+        (e.g., `hsql.execute_query_to_df(pool, query)`).
+
+        :param db_stage: DB stage to create connections to, see `get_connection()`
+        :param min_size: min number of connections in the pool
+        :param max_size: max number of connections in the pool
+        :return: connection pool
+        """
+        if db_stage not in cls.connection_pools:
+            connection_pool = hsql.DbConnectionPool(
+                lambda: cls._connect(db_stage),
+                min_size=min_size,
+                max_size=max_size,
+            )
+            _LOG.info(
+                "Created %s DB connection pool: %s", db_stage, connection_pool
+            )
+            cls.connection_pools[db_stage] = connection_pool
+        return cls.connection_pools[db_stage]
+
+    @staticmethod
+    def _connect(db_stage: str) -> hsql.DbConnection:
+        """
+        Open a new connection to a DB stage.
+        """
+        try:
+            # Connect with the parameters from the env var.
+            #  Usually when credentials are injected into a container.
+            #
+            connection = hsql.get_connection_from_env_vars()
+        except KeyError as e:
+            _LOG.info(
+                f"Unable to fetch DB credentials from environment variables: \n\t{e}\n\t"
+                + "Attempting env file method."
+            )
+            try:
+                # If there are no OS env vars, try to fetch credentials from env file.
+                env_file = imvimlita.get_db_env_path(db_stage)
+                # Connect with the parameters from the env file.
+                #  Usually for test and dev stage.
+                connection_params = hsql.get_connection_info_from_env_file(
+                    env_file
+                )
+                connection = hsql.get_connection(*connection_params)
+            except Exception as e:
+                _LOG.info(
+                    f"Unable to fetch DB credentials from env file: \n\t{e}\n\t"
+                    + "Attempting AWS SecretsManager method."
+                )
+                connection = hsql.get_connection_from_aws_secret(stage=db_stage)
+        return connection
+
 
 def add_db_args(
     parser: argparse.ArgumentParser,
@@ -316,7 +361,8 @@ def load_db_data(
     currency_pairs: Optional[List[str]] = None,
     limit: Optional[int] = None,
     bid_ask_levels: Optional[List[int]] = None,
-) -> pd.DataFrame:
+    chunk_size: Optional[int] = None,
+) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
     """
     Load database data from a specified table given a opened DB connection.
 
@@ -336,6 +382,9 @@ def load_db_data(
     :param limit: return first `limit` rows, ordered by timestamp in descending order
     :param bid_ask_levels: which levels of bid_ask data to load, if None,
      all levels are loaded
+    :param chunk_size: if not None, return an iterator over chunks with at most
+     `chunk_size` rows to bound the memory used, see
+     `hsql.execute_query_to_df_chunks()`
     :return DataFrame with data loaded from `src_table`
     """
     query = f"SELECT * FROM {src_table}"
@@ -364,6 +413,10 @@ def load_db_data(
     if limit:
         query += f" ORDER BY timestamp DESC LIMIT {limit}"
     _LOG.info(f"Executing query: \n\t{query}")
+    if chunk_size is not None:
+        return hsql.execute_query_to_df_chunks(
+            db_connection, query, chunk_size=chunk_size
+        )
     return hsql.execute_query_to_df(db_connection, query)
 
 
@@ -373,7 +426,9 @@ def fetch_data_by_age(
     db_table: str,
     table_timestamp_column: str,
     exchange_id: str,
-) -> pd.DataFrame:
+    *,
+    chunk_size: Optional[int] = None,
+) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
     """
     Fetch data strictly older than a specified timestamp from a db table.
 
@@ -385,6 +440,8 @@ def fetch_data_by_age(
     :param table_timestamp_column: name of the column to apply the comparison on
     :param timestamp: timestamp to filter on
     :param exchange_id: exchange_id to filter on
+    :param chunk_size: if not None, return an iterator over chunks with at most
+     `chunk_size` rows, see `load_db_data()`
     :return DataFrame with data older than the specified `timestamp` based
      on `table_column` value.
     """
@@ -394,6 +451,10 @@ def fetch_data_by_age(
                     WHERE {table_timestamp_column} < {ts_unix}
                     AND EXCHANGE_ID = '{exchange_id}';
                     """
+    if chunk_size is not None:
+        return hsql.execute_query_to_df_chunks(
+            db_connection, select_query, chunk_size=chunk_size
+        )
     return hsql.execute_query_to_df(db_connection, select_query)
 
 
@@ -464,7 +525,9 @@ def save_data_to_db(
         unique_columns = TRADES_UNIQUE_COLUMNS
     else:
         raise ValueError(f"Invalid data_type='{data_type}'")
-    hsql.execute_insert_on_conflict_do_nothing_query(
+    # Stream the data to the DB with `COPY` since the real-time downloaders
+    # save large batches of data every few seconds.
+    hsql.copy_rows_on_conflict_do_nothing(
         connection=db_connection,
         obj=data,
         table_name=db_table,
@@ -29,6 +29,43 @@ _TRACE = False
 AssetId = int
 
 
+# Attributes storing the state of the notifications of new data.
+_NEW_DATA_ATTR_NAMES = [
+    "_wake_up_on_new_data",
+    "_new_data_event",
+    "_new_data_event_loop",
+]
+
+
+def _get_segment_sums(
+    values: np.ndarray, lefts: np.ndarray, rights: np.ndarray
+) -> np.ndarray:
+    """
+    Compute the sums of the rows of `values` in `[lefts[i], rights[i])`.
+
+    The NaNs are skipped. The sums are computed as differences of the
+    cumulative sums, which are accumulated in extended precision to avoid
+    the cancellation errors of the differences, so that the results match
+    computing each sum separately with pandas.
+
+    :param values: 2D array
+    :return: 2D array with one row for each segment
+    """
+    # Prepend a row of zeros so that the sum of `[0, right)` is
+    # `cumsums[right]`.
+    cumsums = np.zeros(
+        (values.shape[0] + 1, values.shape[1]), dtype=np.longdouble
+    )
+    np.cumsum(
+        np.nan_to_num(values, nan=0.0),
+        axis=0,
+        dtype=np.longdouble,
+        out=cumsums[1:],
+    )
+    sums = (cumsums[rights] - cumsums[lefts]).astype(np.float64)
+    return sums
+
+
 # #############################################################################
 # MarketData
 # #############################################################################
@@ -100,6 +137,7 @@ class MarketData(abc.ABC, hobject.PrintableMixin):
         time_out_in_secs: int = 60 * 2,
         column_remap: Optional[Dict[str, str]] = None,
         filter_data_mode: str = "assert",
+        wake_up_on_new_data: bool = False,
     ):
         """
         Constructor.
@@ -124,13 +162,17 @@ class MarketData(abc.ABC, hobject.PrintableMixin):
             no remapping
         :param filter_data_mode: control class behavior with respect to extra
             or missing columns, like in `hpandas.check_and_filter_matching_columns()`
+        :param wake_up_on_new_data: if True, `wait_for_latest_data()` wakes up
+            as soon as new data is signaled through `notify_new_data()` or is
+            expected to be available according to `_get_next_new_data_time()`,
+            instead of sampling only every `sleep_in_secs` seconds
         """
         _LOG.debug(
             hprint.to_str(
                 "asset_id_col asset_ids start_time_col_name "
                 "end_time_col_name columns get_wall_clock_time "
                 "timezone sleep_in_secs time_out_in_secs column_remap "
-                "filter_data_mode"
+                "filter_data_mode wake_up_on_new_data"
             )
         )
         self._asset_id_col = asset_id_col
@@ -159,6 +201,31 @@ class MarketData(abc.ABC, hobject.PrintableMixin):
         max_iterations = int(time_out_in_secs / sleep_in_secs)
         hdbg.dassert_lte(1, max_iterations)
         self._max_iterations = max_iterations
+        #
+        self._wake_up_on_new_data = wake_up_on_new_data
+        # The event is created by `wait_for_latest_data()` in the event loop that
+        # runs it.
+        self._new_data_event: Optional[asyncio.Event] = None
+        self._new_data_event_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __str__(
+        self,
+        attr_names_to_skip: Optional[List[str]] = None,
+    ) -> str:
+        if attr_names_to_skip is None:
+            attr_names_to_skip = []
+        # The state of the notifications is not part of the configuration.
+        attr_names_to_skip.extend(_NEW_DATA_ATTR_NAMES)
+        return super().__str__(attr_names_to_skip=attr_names_to_skip)
+
+    def __repr__(
+        self,
+        attr_names_to_skip: Optional[List[str]] = None,
+    ) -> str:
+        if attr_names_to_skip is None:
+            attr_names_to_skip = []
+        attr_names_to_skip.extend(_NEW_DATA_ATTR_NAMES)
+        return super().__repr__(attr_names_to_skip=attr_names_to_skip)
 
     # /////////////////////////////////////////////////////////////////////////////
 
@@ -340,6 +407,10 @@ class MarketData(abc.ABC, hobject.PrintableMixin):
     def asset_id_col(self) -> str:
         return self._asset_id_col
 
+    @property
+    def start_time_col_name(self) -> str:
+        return self._start_time_col_name
+
     # /////////////////////////////////////////////////////////////////////////////
 
     def to_price_series(
@@ -456,6 +527,54 @@ class MarketData(abc.ABC, hobject.PrintableMixin):
         # ```
         return twap_df
 
+    def get_twap_prices(
+        self,
+        intervals: List[Tuple[pd.Timestamp, pd.Timestamp]],
+        ts_col_name: str,
+        asset_ids: List[int],
+        columns: List[str],
+    ) -> pd.DataFrame:
+        """
+        Compute the TWAP of `columns` for each interval in `intervals`.
+
+        This is equivalent to calling `get_twap_price()` for each interval and
+        column, but it retrieves the data with a single query and computes all
+        the averages at once.
+
+        :param intervals: list of `(start_ts, end_ts]` intervals
+        :param ts_col_name, asset_ids: same as in `get_twap_price()`
+        :param columns: columns to compute the TWAP of (e.g., `bid`, `ask`)
+        :return: df with one row per interval and asset, like:
+            ```
+                                       asset_id            start_datetime     bid     ask
+            end_datetime
+            2000-01-01 09:35:00-05:00       101 2000-01-01 09:30:00-05:00  997.41  997.44
+            2000-01-01 09:35:00-05:00       202 2000-01-01 09:30:00-05:00  998.03  998.06
+            2000-01-01 09:40:00-05:00       101 2000-01-01 09:35:00-05:00  997.93  997.96
+            ```
+        """
+        volume_col = None
+        twap_df = self._get_weighted_prices(
+            intervals, ts_col_name, asset_ids, columns, volume_col
+        )
+        return twap_df
+
+    def get_vwap_prices(
+        self,
+        intervals: List[Tuple[pd.Timestamp, pd.Timestamp]],
+        ts_col_name: str,
+        asset_ids: List[int],
+        columns: List[str],
+        volume_col: str,
+    ) -> pd.DataFrame:
+        """
+        Same as `get_twap_prices()` but weight the prices with `volume_col`.
+        """
+        vwap_df = self._get_weighted_prices(
+            intervals, ts_col_name, asset_ids, columns, volume_col
+        )
+        return vwap_df
+
     # TODO(gp): When we want to evaluate a TWAP price in (a, b] we need to:
     #  1) wait until `MarketData` is updated
     #  2) assert that all the requested prices are actually available
@@ -608,6 +727,10 @@ class MarketData(abc.ABC, hobject.PrintableMixin):
         Wait until the bar with `end_time` == `current_bar_timestamp` is
         present in the RT DB.
 
+        If `wake_up_on_new_data` is enabled, we wait on the notifications of
+        new data, using the sampling period only as a fallback, and the
+        timeout is measured on the event loop clock.
+
         :return:
             - start_sampling_time: timestamp when the sampling started
             - end_sampling_time: timestamp when the sampling ended, since the bar
@@ -624,6 +747,11 @@ class MarketData(abc.ABC, hobject.PrintableMixin):
             _LOG.trace("DB on-line: %s", self.is_online())
         #
         hprint.log_frame(_LOG, "Waiting on last bar ...")
+        if self._wake_up_on_new_data:
+            self._init_new_data_event()
+            event_loop = asyncio.get_event_loop()
+            time_out_in_secs = self._max_iterations * self._sleep_in_secs
+            deadline = event_loop.time() + time_out_in_secs
         num_iter = 0
         while True:
             wall_clock_time = self.get_wall_clock_time()
@@ -646,12 +774,18 @@ class MarketData(abc.ABC, hobject.PrintableMixin):
                 hprint.log_frame(_LOG, "Waiting on last bar: done")
                 end_sampling_time = wall_clock_time
                 break
-            if num_iter >= self._max_iterations:
+            if self._wake_up_on_new_data:
+                if event_loop.time() >= deadline:
+                    raise TimeoutError
+            elif num_iter >= self._max_iterations:
                 raise TimeoutError
             num_iter += 1
-            if _TRACE:
-                _LOG.trace("Sleep for %s secs", self._sleep_in_secs)
-            await asyncio.sleep(self._sleep_in_secs)
+            if self._wake_up_on_new_data:
+                await self._wait_for_new_data(deadline)
+            else:
+                if _TRACE:
+                    _LOG.trace("Sleep for %s secs", self._sleep_in_secs)
+                await asyncio.sleep(self._sleep_in_secs)
         if _TRACE:
             _LOG.trace(
                 "-> %s",
@@ -659,6 +793,18 @@ class MarketData(abc.ABC, hobject.PrintableMixin):
             )
         return start_sampling_time, end_sampling_time, num_iter
 
+    def notify_new_data(self) -> None:
+        """
+        Signal that new data might be available (e.g., a new bar was written).
+
+        This wakes up `wait_for_latest_data()` immediately, if
+        `wake_up_on_new_data` is enabled. It can be called from any thread.
+        """
+        if self._new_data_event is None:
+            # Nobody has waited for data yet.
+            return
+        self._new_data_event_loop.call_soon_threadsafe(self._new_data_event.set)
+
     # /////////////////////////////////////////////////////////////////////////////
 
     @staticmethod
@@ -699,6 +845,180 @@ class MarketData(abc.ABC, hobject.PrintableMixin):
             _LOG.trace("last_start_time=%s", last_start_time)
         return last_start_time
 
+    def _get_weighted_prices(
+        self,
+        intervals: List[Tuple[pd.Timestamp, pd.Timestamp]],
+        ts_col_name: str,
+        asset_ids: List[int],
+        columns: List[str],
+        volume_col: Optional[str],
+    ) -> pd.DataFrame:
+        """
+        Compute the average of `columns` weighted by `volume_col` (or with
+        equal weights, if `None`) for each interval and asset.
+
+        The NaN values are skipped like in `pd.Series.mean()`.
+        """
+        self._dassert_valid_asset_ids(asset_ids)
+        hdbg.dassert_lte(1, len(intervals))
+        hdbg.dassert_container_type(columns, list, str)
+        left_close = False
+        right_close = True
+        for start_ts, end_ts in intervals:
+            hdateti.dassert_is_valid_interval(
+                start_ts, end_ts, left_close, right_close
+            )
+        # Get the data for all the intervals with a single query.
+        start_ts = min(start_ts for start_ts, _ in intervals)
+        end_ts = max(end_ts for _, end_ts in intervals)
+        prices = self.get_data_for_interval(
+            start_ts,
+            end_ts,
+            ts_col_name,
+            asset_ids,
+            left_close=left_close,
+            right_close=right_close,
+            limit=None,
+        )
+        hdbg.dassert_is_subset(columns, prices.columns)
+        # Get the timestamps to filter on, which are in the index for the end
+        # time.
+        if ts_col_name == self._end_time_col_name:
+            timestamps = prices.index
+        else:
+            if self._column_remap:
+                ts_col_name = self._column_remap.get(ts_col_name, ts_col_name)
+            hdbg.dassert_in(ts_col_name, prices.columns)
+            timestamps = prices[ts_col_name]
+        # Convert all the timestamps to UTC epochs in ns to compare them.
+        timestamps = pd.DatetimeIndex(timestamps).asi8
+        start_timestamps = pd.DatetimeIndex(
+            [start_ts for start_ts, _ in intervals]
+        )
+        end_timestamps = pd.DatetimeIndex([end_ts for _, end_ts in intervals])
+        # Sort by asset and timestamp.
+        asset_id_values = prices[self._asset_id_col].to_numpy()
+        idxs = np.lexsort((timestamps, asset_id_values))
+        timestamps = timestamps[idxs]
+        asset_id_values = asset_id_values[idxs]
+        values = prices[columns].to_numpy(dtype=np.float64)[idxs]
+        # Find the rows of each asset in each interval.
+        interval_idxs = []
+        out_asset_ids = []
+        lefts = []
+        rights = []
+        asset_ids_, asset_starts = np.unique(asset_id_values, return_index=True)
+        asset_ends = np.append(asset_starts[1:], len(asset_id_values))
+        for asset_id, asset_start, asset_end in zip(
+            asset_ids_, asset_starts, asset_ends
+        ):
+            asset_timestamps = timestamps[asset_start:asset_end]
+            # The rows in `(start_ts, end_ts]` are in `[left, right)`.
+            left = asset_timestamps.searchsorted(
+                start_timestamps.asi8, side="right"
+            )
+            right = asset_timestamps.searchsorted(
+                end_timestamps.asi8, side="right"
+            )
+            # Skip the intervals without data, like `groupby()` does.
+            mask = left < right
+            interval_idxs.append(np.flatnonzero(mask))
+            out_asset_ids.append(np.full(mask.sum(), asset_id))
+            lefts.append(asset_start + left[mask])
+            rights.append(asset_start + right[mask])
+        if interval_idxs:
+            interval_idxs = np.concatenate(interval_idxs)
+            out_asset_ids = np.concatenate(out_asset_ids)
+            lefts = np.concatenate(lefts)
+            rights = np.concatenate(rights)
+        else:
+            interval_idxs = np.array([], dtype=int)
+            out_asset_ids = np.array([], dtype=asset_id_values.dtype)
+            lefts = rights = np.array([], dtype=int)
+        # Compute the averages for all the assets and intervals at once.
+        if volume_col is None:
+            sums = _get_segment_sums(values, lefts, rights)
+            # Count the non-NaN values exactly with integer cumulative sums.
+            cumcounts = np.zeros(
+                (values.shape[0] + 1, values.shape[1]), dtype=np.int64
+            )
+            np.cumsum(~np.isnan(values), axis=0, out=cumcounts[1:])
+            counts = cumcounts[rights] - cumcounts[lefts]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                averages = sums / counts
+        else:
+            hdbg.dassert_in(volume_col, prices.columns)
+            volumes = prices[[volume_col]].to_numpy(dtype=np.float64)[idxs]
+            is_valid = ~np.isnan(values) & ~np.isnan(volumes)
+            weighted_values = np.where(is_valid, values * volumes, np.nan)
+            volumes = np.where(is_valid, volumes, np.nan)
+            weighted_sums = _get_segment_sums(weighted_values, lefts, rights)
+            volume_sums = _get_segment_sums(volumes, lefts, rights)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                averages = weighted_sums / volume_sums
+            averages[volume_sums == 0] = np.nan
+        # Sort by interval and asset.
+        idxs = np.lexsort((out_asset_ids, interval_idxs))
+        interval_idxs = interval_idxs[idxs]
+        df = pd.DataFrame(averages[idxs], columns=columns)
+        df.insert(0, self._start_time_col_name, start_timestamps[interval_idxs])
+        df.insert(0, self._asset_id_col, out_asset_ids[idxs])
+        df.index = end_timestamps[interval_idxs]
+        df.index.name = self._end_time_col_name
+        return df
+
+    def _init_new_data_event(self) -> None:
+        """
+        Create the event signaling new data in the running event loop.
+        """
+        event_loop = asyncio.get_event_loop()
+        if (
+            self._new_data_event is None
+            or self._new_data_event_loop is not event_loop
+        ):
+            # In Python 3.8 an `asyncio.Event` is bound to the event loop that
+            # is current when it's created.
+            self._new_data_event = asyncio.Event()
+            self._new_data_event_loop = event_loop
+
+    async def _wait_for_new_data(self, deadline: float) -> None:
+        """
+        Wait until new data is signaled, new data is expected, the sampling
+        period has elapsed, or `deadline` (on the event loop clock) is reached,
+        whatever comes first.
+        """
+        event_loop = asyncio.get_event_loop()
+        timeout_in_secs = min(self._sleep_in_secs, deadline - event_loop.time())
+        next_new_data_time = self._get_next_new_data_time()
+        if next_new_data_time is not None:
+            wall_clock_time = self.get_wall_clock_time()
+            secs_to_new_data = (
+                next_new_data_time - wall_clock_time
+            ).total_seconds()
+            timeout_in_secs = min(timeout_in_secs, secs_to_new_data)
+        timeout_in_secs = max(timeout_in_secs, 0)
+        if _TRACE:
+            _LOG.trace("Wait for new data for up to %s secs", timeout_in_secs)
+        try:
+            await asyncio.wait_for(self._new_data_event.wait(), timeout_in_secs)
+        except asyncio.TimeoutError:
+            pass
+        # Clear the event after waking up, so that a notification arriving
+        # while the caller checks the data is not lost.
+        self._new_data_event.clear()
+
+    def _get_next_new_data_time(self) -> Optional[pd.Timestamp]:
+        """
+        Return the wall clock time when new data is expected to be available.
+
+        The derived classes that know when the data becomes available (e.g.,
+        replayed data) can override this method, so that
+        `wait_for_latest_data()` wakes up exactly when the data is available.
+
+        :return: the timestamp or `None` if it's unknown
+        """
+        return None
+
     # /////////////////////////////////////////////////////////////////////////////
     # Derived class interface.
     # /////////////////////////////////////////////////////////////////////////////
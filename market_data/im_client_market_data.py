@@ -100,21 +100,12 @@ class ImClientMarketData(mdabmada.MarketData):
             if end_ts is not None:
                 # Subtract one millisecond not to include the right boundary.
                 end_ts -= pd.Timedelta(1, "ms")
-        if asset_ids is None:
-            # If asset ids are not provided, get universe as full symbols.
-            full_symbols = self._im_client.get_universe()
-        else:
-            # Convert asset ids to full symbols to read `im` data.
-            full_symbols = self._im_client.get_full_symbols_from_asset_ids(
-                asset_ids
-            )
-        # Load the data using `im_client`.
-        ivcu.dassert_valid_full_symbols(full_symbols)
+        full_symbols = self._get_full_symbols(asset_ids)
         #
         # TODO(gp): im_client should always return the name of the column storing
         #  the asset_id as "full_symbol" instead we access the class to see what
         #  is the name of that column.
-        full_symbol_col_name = self._im_client._get_full_symbol_col_name(None)
+        full_symbol_col_name = self._im_client.get_full_symbol_col_name()
         if self._columns is not None:
             # Exclude columns specific of `MarketData` when querying `ImClient`.
             columns_to_exclude_in_im = [
@@ -207,21 +198,48 @@ class ImClientMarketData(mdabmada.MarketData):
         ] - pd.Timedelta(minutes=1)
         return df
 
+    def _get_full_symbols(
+        self, asset_ids: Optional[List[int]]
+    ) -> List[ivcu.FullSymbol]:
+        """
+        Return the full symbols to read from `ImClient` for `asset_ids`.
+        """
+        if asset_ids is None:
+            # If asset ids are not provided, get universe as full symbols.
+            full_symbols = self._im_client.get_universe()
+        else:
+            # Convert asset ids to full symbols to read `im` data.
+            full_symbols = self._im_client.get_full_symbols_from_asset_ids(
+                asset_ids
+            )
+        ivcu.dassert_valid_full_symbols(full_symbols)
+        return full_symbols
+
     def _get_last_end_time(self) -> Optional[pd.Timestamp]:
         # We need to find the last timestamp before the current time. If don't have data
         # for an asset for the past hour it does not make any sense to compute further.
-        # TODO(gp): SELECT MAX(start_time) instead of getting all the data
-        #  and then find the max and use `start_time`
+        # This is equivalent to `get_data_for_last_period()` but we read only
+        # the full symbols from `ImClient`, since the end timestamps are stored
+        # in the index, and we skip the normalization of the data.
         timedelta = pd.Timedelta("1H")
-        df = self.get_data_for_last_period(timedelta)
+        wall_clock_time = self.get_wall_clock_time()
+        start_ts = self._process_period(timedelta, wall_clock_time)
+        # Subtract one millisecond not to include the right boundary.
+        end_ts = wall_clock_time - pd.Timedelta(1, "ms")
+        full_symbols = self._get_full_symbols(self._asset_ids)
+        full_symbol_col_name = self._im_client.get_full_symbol_col_name()
+        df = self._im_client.read_data(
+            full_symbols,
+            start_ts,
+            end_ts,
+            [full_symbol_col_name],
+            self._filter_data_mode,
+        )
         _LOG.debug(
-            hpandas.df_to_str(df, print_shape_info=True, tag="after get_data")
+            hpandas.df_to_str(df, print_shape_info=True, tag="after read_data")
         )
         if df.empty:
-            wall_clock_time = self.get_wall_clock_time()
-            _LOG.warning(
-                "No data found near wall_clock_time=%s", self.wall_clock_time
-            )
+            _LOG.warning("No data found near wall_clock_time=%s", wall_clock_time)
             ret = None
         else:
             # The latest timestamp is min timestamp across max timestamps
@@ -234,11 +252,8 @@ class ImClientMarketData(mdabmada.MarketData):
             # We are looking for end timestamp that is present for all the assets.
             # In this case, it is 15:59 because at 16:00 the data is available
             # only for `asset1` and `asset3`.
-            df_max_ts_per_asset = (
-                df.reset_index()
-                .groupby(by=[self._asset_id_col])
-                .max()[self._end_time_col_name]
-            )
+            end_ts_srs = df.index.to_series(index=df[full_symbol_col_name])
+            df_max_ts_per_asset = end_ts_srs.groupby(level=0).max()
             _LOG.debug(
                 hpandas.df_to_str(
                     df_max_ts_per_asset,
@@ -247,5 +262,7 @@ class ImClientMarketData(mdabmada.MarketData):
                 )
             )
             ret = df_max_ts_per_asset.min()
+            # Convert to the timezone specified in the ctor.
+            ret = ret.tz_convert(self._timezone)
         _LOG.debug("-> ret=%s", ret)
         return ret
@@ -4,6 +4,7 @@ Import as:
 import market_data.real_time_market_data as mdrtmada
 """
 
+import asyncio
 import logging
 from typing import Any, List, Optional
 
@@ -56,6 +57,49 @@ class RealTimeMarketData(mdabmada.MarketData):
     def should_be_online(self, wall_clock_time: pd.Timestamp) -> bool:
         return True
 
+    def start_listening_for_new_data(
+        self,
+        listen_db_connection: hsql.DbConnection,
+        channel: str,
+    ) -> None:
+        """
+        Call `notify_new_data()` when a notification is sent on `channel`.
+
+        The writer of the table is expected to send a notification on
+        `channel` (e.g., with `hsql.notify()` or with a trigger on the table)
+        after inserting a bar. The notifications are received in the running
+        event loop without polling.
+
+        :param listen_db_connection: a connection to the DB dedicated to
+            receiving the notifications
+        :param channel: name of the channel, e.g., `new_bars`
+        """
+        hsql.listen(listen_db_connection, channel)
+
+        def _on_notification() -> None:
+            listen_db_connection.poll()
+            if listen_db_connection.notifies:
+                _LOG.debug(
+                    "Received %s notifications",
+                    len(listen_db_connection.notifies),
+                )
+                listen_db_connection.notifies.clear()
+                self.notify_new_data()
+
+        event_loop = asyncio.get_event_loop()
+        event_loop.add_reader(listen_db_connection.fileno(), _on_notification)
+
+    @staticmethod
+    def stop_listening_for_new_data(
+        listen_db_connection: hsql.DbConnection,
+    ) -> None:
+        """
+        Stop receiving the notifications started with
+        `start_listening_for_new_data()`.
+        """
+        event_loop = asyncio.get_event_loop()
+        event_loop.remove_reader(listen_db_connection.fileno())
+
     @staticmethod
     def _to_sql_datetime_string(dt: pd.Timestamp) -> str:
         """
@@ -118,53 +162,35 @@ class RealTimeMarketData(mdabmada.MarketData):
         """
         # We assume that all the bars are inserted together in a single
         # transaction, so we can check for the max timestamp.
-        # Get the latest `start_time` (which is an index) with a query like:
+        # Get the latest `start_time` (which is an index) and the corresponding
+        # `end_time` with a single query like:
         #   ```
-        #   SELECT MAX(start_time)
+        #   SELECT start_time, end_time
         #     FROM bars_qa
         #     WHERE interval=60 AND region='AM' AND asset_id = '17085'
+        #     ORDER BY start_time DESC
+        #     LIMIT 1
         #   ```
+        # which is served by the index on `start_time` without scanning the
+        # table.
         query = []
-        query.append(f"SELECT MAX({self._start_time_col_name})")
+        query.append(
+            f"SELECT {self._start_time_col_name}, {self._end_time_col_name}"
+        )
         query.append(f"FROM {self._table_name}")
         query.append("WHERE")
         if self._where_clause:
             query.append(f"{self._where_clause} AND")
         query.append(f"{self._asset_id_col} = '{self._valid_id}'")
+        query.append(f"ORDER BY {self._start_time_col_name} DESC")
+        query.append("LIMIT 1")
         query = " ".join(query)
         # _LOG.debug("query=%s", query)
         df = hsql.execute_query_to_df(self.connection, query)
-        # Check that the `start_time` is a single value.
-        hdbg.dassert_eq(df.shape, (1, 1))
-        start_time = df.iloc[0, 0]
-        # _LOG.debug("start_time from DB=%s", start_time)
-        # Get the `end_time` that corresponds to the last `start_time` with a
-        # query like:
-        #   ```
-        #   SELECT end_time
-        #     FROM bars_qa
-        #     WHERE interval=60 AND
-        #         region='AM' AND
-        #         start_time = '2021-10-07 15:50:00' AND
-        #         asset_id = '17085'
-        #   ```
-        query = []
-        query.append(f"SELECT {self._end_time_col_name}")
-        query.append(f"FROM {self._table_name}")
-        query.append("WHERE")
-        if self._where_clause:
-            query.append(f"{self._where_clause} AND")
-        query.append(
-            f"{self._start_time_col_name} = '{start_time}' AND "
-            + f"{self._asset_id_col} = '{self._valid_id}'"
-        )
-        query = " ".join(query)
-        # _LOG.debug("query=%s", query)
-        df = hsql.execute_query_to_df(self.connection, query)
-        # Check that the `end_time` is a single value.
-        hdbg.dassert_eq(df.shape, (1, 1))
-        end_time = df.iloc[0, 0]
-        # _LOG.debug("end_time from DB=%s", end_time)
+        # Check that there is a single bar.
+        hdbg.dassert_eq(df.shape, (1, 2))
+        start_time, end_time = df.iloc[0]
+        # _LOG.debug("start_time end_time from DB=%s %s", start_time, end_time)
         # We know that it should be `end_time = start_time + 1 minute`.
         start_time = pd.Timestamp(start_time, tz="UTC")
         end_time = pd.Timestamp(end_time, tz="UTC")
@@ -5,11 +5,13 @@ import market_data.replayed_market_data as mdremada
 """
 
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Union
 
+import numpy as np
 import pandas as pd
 
 import core.real_time as creatime
+import helpers.hdatetime as hdateti
 import helpers.hdbg as hdbg
 import helpers.hpandas as hpandas
 import helpers.hprint as hprint
@@ -27,6 +29,16 @@ _TRACE = False
 # #############################################################################
 
 
+# Attributes storing the index of the data of `ReplayedMarketData`.
+_INDEX_ATTR_NAMES = [
+    "_knowledge_time_cummax",
+    "_knowledge_time_rev_cummin",
+    "_knowledge_time_sorted",
+    "_all_asset_ids",
+    "_is_ts_col_sorted",
+]
+
+
 # TODO(gp): This should have a delay and / or we should use timestamp_db.
 class ReplayedMarketData(mdabmada.MarketData):
     """
@@ -78,10 +90,66 @@ class ReplayedMarketData(mdabmada.MarketData):
             self._df.sort_values(
                 [self._end_time_col_name, self._asset_id_col], inplace=True
             )
+            self._build_index()
+        else:
+            self._knowledge_time_cummax = None
+            self._knowledge_time_rev_cummin = None
+            self._knowledge_time_sorted = None
+        self._all_asset_ids: Optional[Set[int]] = None
+        # Map a timestamp column to whether it's sorted in `self._df`.
+        self._is_ts_col_sorted: Dict[str, bool] = {}
+
+    def __str__(
+        self,
+        attr_names_to_skip: Optional[List[str]] = None,
+    ) -> str:
+        if attr_names_to_skip is None:
+            attr_names_to_skip = []
+        # The index is derived from `_df`.
+        attr_names_to_skip.extend(_INDEX_ATTR_NAMES)
+        return super().__str__(attr_names_to_skip=attr_names_to_skip)
+
+    def __repr__(
+        self,
+        attr_names_to_skip: Optional[List[str]] = None,
+    ) -> str:
+        if attr_names_to_skip is None:
+            attr_names_to_skip = []
+        attr_names_to_skip.extend(_INDEX_ATTR_NAMES)
+        return super().__repr__(attr_names_to_skip=attr_names_to_skip)
 
     def should_be_online(self, wall_clock_time: pd.Timestamp) -> bool:
         return True
 
+    def _build_index(self) -> None:
+        """
+        Precompute the data needed to filter `self._df` with binary searches.
+
+        The knowledge times are not necessarily sorted (e.g., the data for the
+        same bar can be written at different times for different assets), so
+        we store two sorted envelopes of them:
+        - the running max: the rows before `searchsorted(cummax, ts)` are all
+          known at `ts`
+        - the running min from the end: the rows after
+          `searchsorted(rev_cummin, ts)` are all unknown at `ts`
+        Only the rows in between, which are typically a few bars, need to be
+        checked one by one.
+
+        We also store the sorted knowledge times to find when the next data
+        becomes available.
+        """
+        knowledge_times = self._df[self._knowledge_datetime_col_name]
+        if self._df.empty or knowledge_times.isna().any():
+            self._knowledge_time_cummax = None
+            self._knowledge_time_rev_cummin = None
+            self._knowledge_time_sorted = None
+            return
+        self._knowledge_time_cummax = knowledge_times.cummax()
+        self._knowledge_time_rev_cummin = knowledge_times[::-1].cummin()[::-1]
+        self._knowledge_time_sorted = knowledge_times.sort_values(
+            ignore_index=True
+        )
+
     def _get_data(
         self,
         start_ts: pd.Timestamp,
@@ -99,35 +167,51 @@ class ReplayedMarketData(mdabmada.MarketData):
                     "right_close limit"
                 )
             )
-        # TODO(gp): This assertion seems very slow. Move this check in a
-        #  centralized place instead of calling it every time, if possible.
         if asset_ids is not None:
             # Make sure that the requested asset_ids are in the df at some point.
             # This avoids mistakes when mocking data for certain assets, but request
             # data for assets that don't exist, which can make us wait for data that
             # will never come.
-            hdbg.dassert_is_subset(
-                asset_ids, self._df[self._asset_id_col].unique()
-            )
+            if self._all_asset_ids is None:
+                self._all_asset_ids = set(self._df[self._asset_id_col].unique())
+            hdbg.dassert_is_subset(asset_ids, self._all_asset_ids)
         # Filter the data by the current time.
         wall_clock_time = self.get_wall_clock_time()
         if _TRACE:
             _LOG.trace(hprint.to_str("wall_clock_time"))
-        df_tmp = creatime.get_data_as_of_datetime(
-            self._df,
-            self._knowledge_datetime_col_name,
-            wall_clock_time,
-            delay_in_secs=self._delay_in_secs,
-        )
-        # Handle `columns`.
-        if self._columns is not None:
-            hdbg.dassert_is_subset(self._columns, df_tmp.columns)
-            df_tmp = df_tmp[self._columns]
-        # Handle `period`.
-        hdbg.dassert_in(ts_col_name, df_tmp.columns)
-        df_tmp = hpandas.trim_df(
-            df_tmp, ts_col_name, start_ts, end_ts, left_close, right_close
-        )
+        if self._knowledge_time_cummax is not None and self._is_sorted_by(
+            ts_col_name
+        ):
+            # Handle the current time and `period` with binary searches.
+            df_tmp = self._get_data_with_index(
+                wall_clock_time,
+                start_ts,
+                end_ts,
+                ts_col_name,
+                left_close,
+                right_close,
+            )
+            # Handle `columns`.
+            if self._columns is not None:
+                hdbg.dassert_is_subset(self._columns, df_tmp.columns)
+                df_tmp = df_tmp[self._columns]
+            hdbg.dassert_in(ts_col_name, df_tmp.columns)
+        else:
+            df_tmp = creatime.get_data_as_of_datetime(
+                self._df,
+                self._knowledge_datetime_col_name,
+                wall_clock_time,
+                delay_in_secs=self._delay_in_secs,
+            )
+            # Handle `columns`.
+            if self._columns is not None:
+                hdbg.dassert_is_subset(self._columns, df_tmp.columns)
+                df_tmp = df_tmp[self._columns]
+            # Handle `period`.
+            hdbg.dassert_in(ts_col_name, df_tmp.columns)
+            df_tmp = hpandas.trim_df(
+                df_tmp, ts_col_name, start_ts, end_ts, left_close, right_close
+            )
         # Handle `asset_ids`
         if _TRACE:
             _LOG.trace("before df_tmp=\n%s", hpandas.df_to_str(df_tmp))
@@ -145,12 +229,130 @@ class ReplayedMarketData(mdabmada.MarketData):
             _LOG.trace("-> df_tmp=\n%s", hpandas.df_to_str(df_tmp))
         return df_tmp
 
+    def _is_sorted_by(self, ts_col_name: str) -> bool:
+        """
+        Return whether `self._df` is sorted by `ts_col_name`.
+        """
+        if ts_col_name not in self._is_ts_col_sorted:
+            hdbg.dassert_in(ts_col_name, self._df.columns)
+            is_sorted = self._df[ts_col_name].is_monotonic_increasing
+            self._is_ts_col_sorted[ts_col_name] = is_sorted
+        return self._is_ts_col_sorted[ts_col_name]
+
+    def _get_data_with_index(
+        self,
+        wall_clock_time: pd.Timestamp,
+        start_ts: Optional[pd.Timestamp],
+        end_ts: Optional[pd.Timestamp],
+        ts_col_name: str,
+        left_close: bool,
+        right_close: bool,
+    ) -> pd.DataFrame:
+        """
+        Return the rows known at `wall_clock_time` in the requested interval.
+
+        This is equivalent to `get_data_as_of_datetime()` followed by
+        `trim_df()`, but it costs `O(log N + size of the result)` instead of
+        scanning all the data.
+        """
+        idxs = self._get_row_idxs_with_index(
+            wall_clock_time,
+            start_ts,
+            end_ts,
+            ts_col_name,
+            left_close,
+            right_close,
+        )
+        df = self._df.iloc[idxs]
+        return df
+
+    def _get_row_idxs_with_index(
+        self,
+        wall_clock_time: pd.Timestamp,
+        start_ts: Optional[pd.Timestamp],
+        end_ts: Optional[pd.Timestamp],
+        ts_col_name: str,
+        left_close: bool,
+        right_close: bool,
+    ) -> Union[slice, np.ndarray]:
+        """
+        Same as `_get_data_with_index()` but return the sorted positions of the
+        rows.
+        """
+        hdateti.dassert_tz_compatible_timestamp_with_df(
+            wall_clock_time, self._df, self._knowledge_datetime_col_name
+        )
+        knowledge_ts = wall_clock_time - pd.Timedelta(seconds=self._delay_in_secs)
+        # Rows in `[0, known_idx)` are known and rows in `[unknown_idx, N)` are
+        # unknown at `knowledge_ts`.
+        known_idx = self._knowledge_time_cummax.searchsorted(
+            knowledge_ts, side="right"
+        )
+        unknown_idx = self._knowledge_time_rev_cummin.searchsorted(
+            knowledge_ts, side="right"
+        )
+        # Find the rows in the interval.
+        ts = self._df[ts_col_name]
+        if start_ts is not None and end_ts is not None:
+            hdateti.dassert_tz_compatible(start_ts, end_ts)
+            hdbg.dassert_lte(start_ts, end_ts)
+        if start_ts is None:
+            left_idx = 0
+        else:
+            side = "left" if left_close else "right"
+            left_idx = ts.searchsorted(start_ts, side)
+        if end_ts is None:
+            right_idx = unknown_idx
+        else:
+            side = "right" if right_close else "left"
+            right_idx = min(ts.searchsorted(end_ts, side), unknown_idx)
+        if _TRACE:
+            _LOG.trace(hprint.to_str("known_idx unknown_idx left_idx right_idx"))
+        band_idx = max(left_idx, known_idx)
+        if band_idx >= right_idx:
+            # All the rows in the interval are known.
+            idxs = slice(left_idx, max(left_idx, right_idx))
+        else:
+            # Check the knowledge time of the rows that are not known for sure.
+            knowledge_times = self._df[self._knowledge_datetime_col_name]
+            mask = knowledge_times.iloc[band_idx:right_idx] <= knowledge_ts
+            idxs = np.concatenate(
+                [
+                    np.arange(left_idx, band_idx),
+                    np.arange(band_idx, right_idx)[mask.to_numpy()],
+                ]
+            )
+        return idxs
+
     def _get_last_end_time(self) -> Optional[pd.Timestamp]:
         # We need to find the last timestamp before the current time. We use
         # `7W` but could also use all the data since we don't call the DB.
-        # TODO(gp): SELECT MAX(start_time) instead of getting all the data
-        #  and then find the max and use `start_time`
         timedelta = pd.Timedelta("7D")
+        if self._knowledge_time_cummax is not None and self._is_sorted_by(
+            self._start_time_col_name
+        ):
+            # The data is sorted by end time, so the last end time is the one of
+            # the last row that is known and belongs to the requested assets.
+            wall_clock_time = self.get_wall_clock_time()
+            start_ts = self._process_period(timedelta, wall_clock_time)
+            idxs = self._get_row_idxs_with_index(
+                wall_clock_time,
+                start_ts,
+                wall_clock_time,
+                self._start_time_col_name,
+                True,
+                False,
+            )
+            if isinstance(idxs, slice):
+                idxs = range(idxs.start, idxs.stop)
+            idx = self._find_last_row_idx_for_assets(idxs)
+            if idx is None:
+                ret = None
+            else:
+                ret = self._df[self._end_time_col_name].iloc[idx]
+                ret = ret.tz_convert(self._timezone)
+            _LOG.debug("-> ret=%s", ret)
+            return ret
         df = self.get_data_for_last_period(timedelta)
         _LOG.debug(
             hpandas.df_to_str(df, print_shape_info=True, tag="after get_data")
@@ -162,6 +364,44 @@ class ReplayedMarketData(mdabmada.MarketData):
         _LOG.debug("-> ret=%s", ret)
         return ret
 
+    def _get_next_new_data_time(self) -> Optional[pd.Timestamp]:
+        """
+        Return the wall clock time when the next row becomes known.
+        """
+        if self._knowledge_time_sorted is None:
+            return None
+        wall_clock_time = self.get_wall_clock_time()
+        delay = pd.Timedelta(seconds=self._delay_in_secs)
+        knowledge_ts = wall_clock_time - delay
+        idx = self._knowledge_time_sorted.searchsorted(knowledge_ts, side="right")
+        if idx == len(self._knowledge_time_sorted):
+            # All the data is already known.
+            ret = None
+        else:
+            ret = self._knowledge_time_sorted.iloc[idx] + delay
+        return ret
+
+    def _find_last_row_idx_for_assets(
+        self, idxs: Union[range, np.ndarray]
+    ) -> Optional[int]:
+        """
+        Return the last position in `idxs` of a row of the assets in
+        `self._asset_ids`, or `None` if there is no such row.
+        """
+        if self._asset_ids is None:
+            ret = int(idxs[-1]) if len(idxs) > 0 else None
+            return ret
+        asset_ids = self._df[self._asset_id_col].to_numpy()
+        # Scan the rows backwards in chunks, since the last rows typically
+        # belong to the requested assets.
+        chunk_size = 1024
+        for stop in range(len(idxs), 0, -chunk_size):
+            chunk_idxs = np.asarray(idxs[max(0, stop - chunk_size) : stop])
+            mask = np.isin(asset_ids[chunk_idxs], self._asset_ids)
+            if mask.any():
+                return int(chunk_idxs[mask][-1])
+        return None
+
 
 # #############################################################################
 # Serialize / deserialize example of DB.
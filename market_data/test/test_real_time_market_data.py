@@ -1,16 +1,133 @@
+import asyncio
 import logging
+import socket
+import unittest.mock as umock
+from typing import List, Optional, Tuple
 
 import pandas as pd
 
+import helpers.hdatetime as hdateti
 import helpers.hpandas as hpandas
 import helpers.hsql as hsql
+import helpers.hunit_test as hunitest
 import im_v2.common.data.client as icdc
 import im_v2.common.db.db_utils as imvcddbut
 import market_data.market_data_example as mdmadaex
+import market_data.real_time_market_data as mdrtmada
 
 _LOG = logging.getLogger(__name__)
 
 
+# #############################################################################
+# TestRealTimeMarketData1
+# #############################################################################
+
+
+class _FakeListenDbConnection:
+    """
+    Mimic a DB connection receiving the Postgres notifications.
+
+    The notifications are delivered through a socket, so that the connection
+    can be read by the event loop like a real one.
+    """
+
+    def __init__(self) -> None:
+        self._reader, self._writer = socket.socketpair()
+        self._reader.setblocking(False)
+        self.notifies: List[str] = []
+
+    def fileno(self) -> int:
+        return self._reader.fileno()
+
+    def poll(self) -> None:
+        data = self._reader.recv(1024)
+        self.notifies.extend(["new_bars"] * len(data))
+
+    def notify(self) -> None:
+        """
+        Send a notification, like `hsql.notify()` from another connection.
+        """
+        self._writer.send(b"\x00")
+
+    def close(self) -> None:
+        self._reader.close()
+        self._writer.close()
+
+
+class TestRealTimeMarketData1(hunitest.TestCase):
+    """
+    Test that `wait_for_latest_data()` wakes up on the DB notifications.
+    """
+
+    def test_wait_for_latest_data1(self) -> None:
+        current_timestamp = pd.Timestamp(
+            "2000-01-03 09:31:00-05:00", tz="America/New_York"
+        )
+        # The bar is written after the wait starts.
+        last_end_times: List[Optional[pd.Timestamp]] = [None]
+        market_data = mdrtmada.RealTimeMarketData(
+            None,
+            "bars",
+            None,
+            101,
+            "asset_id",
+            [101],
+            "start_time",
+            "end_time",
+            None,
+            lambda: current_timestamp,
+            # Sample rarely, so that only a notification can wake up the wait
+            # quickly.
+            sleep_in_secs=60.0,
+            time_out_in_secs=120,
+            wake_up_on_new_data=True,
+        )
+        listen_db_connection = _FakeListenDbConnection()
+        event_loop = asyncio.new_event_loop()
+        try:
+            asyncio.set_event_loop(event_loop)
+            hdateti.set_current_bar_timestamp(current_timestamp, 60)
+
+            async def _write_bar() -> None:
+                await asyncio.sleep(0.1)
+                last_end_times[0] = current_timestamp
+                listen_db_connection.notify()
+
+            async def _run() -> Tuple[int, float]:
+                market_data.start_listening_for_new_data(
+                    listen_db_connection, "new_bars"
+                )
+                start_time = event_loop.time()
+                coroutines = [market_data.wait_for_latest_data(), _write_bar()]
+                (_, _, num_iter), _ = await asyncio.gather(*coroutines)
+                elapsed_time_in_secs = event_loop.time() - start_time
+                market_data.stop_listening_for_new_data(listen_db_connection)
+                return num_iter, elapsed_time_in_secs
+
+            with umock.patch.object(hsql, "listen") as listen, umock.patch.object(
+                market_data,
+                "_get_last_end_time",
+                side_effect=lambda: last_end_times[0],
+            ):
+                num_iter, elapsed_time_in_secs = event_loop.run_until_complete(
+                    _run()
+                )
+        finally:
+            asyncio.set_event_loop(None)
+            event_loop.close()
+            listen_db_connection.close()
+        listen.assert_called_once_with(listen_db_connection, "new_bars")
+        # The wait ends after the notification, without sampling again.
+        self.assertEqual(num_iter, 1)
+        self.assertLess(elapsed_time_in_secs, 10)
+        self.assertEqual(listen_db_connection.notifies, [])
+
+
+# #############################################################################
+# TestRealTimeMarketData2
+# #############################################################################
+
+
 class TestRealTimeMarketData2(
     imvcddbut.TestImDbHelper,
 ):
@@ -1,5 +1,6 @@
+import asyncio
 import logging
-from typing import Any, Callable, Tuple, Union
+from typing import Any, Callable, List, Optional, Tuple, Union
 
 import pandas as pd
 
@@ -701,10 +702,59 @@ class TestReplayedMarketData4(hunitest.TestCase):
         expected_num_iter = 1
         self.assertEqual(num_iter, expected_num_iter)
 
-    def _run(self) -> Tuple[pd.Timestamp, pd.Timestamp, int]:
+    def test_wake_up_on_new_data1(self) -> None:
+        """
+        Wake up when the bar becomes known instead of at the next sample.
+        """
+        start_time, end_time, num_iter = self._run(wake_up_on_new_data=True)
+        # Check.
+        expected_start_time = pd.Timestamp(
+            "2000-01-03 09:31:00-05:00", tz="America/New_York"
+        )
+        self.assertEqual(start_time, expected_start_time)
+        # The knowledge time of the bar.
+        expected_end_time = pd.Timestamp(
+            "2000-01-03 09:31:10-05:00", tz="America/New_York"
+        )
+        self.assertEqual(end_time, expected_end_time)
+        #
+        expected_num_iter = 1
+        self.assertEqual(num_iter, expected_num_iter)
+
+    def test_notify_new_data1(self) -> None:
+        """
+        Wake up when new data is signaled through `notify_new_data()`.
+        """
+        notify_delay_in_secs = 12
+        start_time, end_time, num_iter = self._run(
+            wake_up_on_new_data=True, notify_delay_in_secs=notify_delay_in_secs
+        )
+        # Check.
+        expected_start_time = pd.Timestamp(
+            "2000-01-03 09:31:00-05:00", tz="America/New_York"
+        )
+        self.assertEqual(start_time, expected_start_time)
+        #
+        expected_end_time = pd.Timestamp(
+            "2000-01-03 09:31:12-05:00", tz="America/New_York"
+        )
+        self.assertEqual(end_time, expected_end_time)
+        #
+        expected_num_iter = 1
+        self.assertEqual(num_iter, expected_num_iter)
+
+    def _run(
+        self,
+        *,
+        wake_up_on_new_data: bool = False,
+        notify_delay_in_secs: Optional[float] = None,
+    ) -> Tuple[pd.Timestamp, pd.Timestamp, int]:
         """
         - Build a ReplayedMarketData
         - Run `is_last_bar_available()`
+
+        :param notify_delay_in_secs: if not `None`, signal new data after this
+            amount of time, instead of relying on the knowledge time of the data
         """
         with hasynci.solipsism_context() as event_loop:
             # Build a ReplayedMarketData.
@@ -720,6 +770,7 @@ class TestReplayedMarketData4(hunitest.TestCase):
                 ),
                 asset_ids=[101, 202, 303],
             )
+            market_data._wake_up_on_new_data = wake_up_on_new_data
             # Set the `current_bar_timestamp` that is needed inside
             # `wait_for_latest_data()`.
             current_timestamp = market_data.get_wall_clock_time()
@@ -728,8 +779,194 @@ class TestReplayedMarketData4(hunitest.TestCase):
                 current_timestamp, bar_duration_in_secs
             )
             # Run the method.
-            start_time, end_time, num_iter = hasynci.run(
-                market_data.wait_for_latest_data(),
-                event_loop=event_loop,
-            )
+            if notify_delay_in_secs is None:
+                start_time, end_time, num_iter = hasynci.run(
+                    market_data.wait_for_latest_data(),
+                    event_loop=event_loop,
+                )
+            else:
+                # Do not predict when the data becomes known.
+                market_data._knowledge_time_sorted = None
+
+                async def _notify() -> None:
+                    await asyncio.sleep(notify_delay_in_secs)
+                    market_data.notify_new_data()
+
+                coroutines = [market_data.wait_for_latest_data(), _notify()]
+                (start_time, end_time, num_iter), _ = hasynci.run(
+                    asyncio.gather(*coroutines),
+                    event_loop=event_loop,
+                )
         return start_time, end_time, num_iter
+
+
+# #############################################################################
+
+
+class TestReplayedMarketData5(hunitest.TestCase):
+    """
+    Test that querying `ReplayedMarketData` using its index gives the same
+    result as scanning the data.
+    """
+
+    def test_get_data_for_interval1(self) -> None:
+        df = self._get_data()
+        asset_ids = [101, 303]
+        for replayed_delay_in_mins in [-1, 0, 3, 7, 12, 30]:
+            for start_ts, end_ts in [
+                (None, None),
+                (
+                    pd.Timestamp("2000-01-01 09:31:00-05:00"),
+                    pd.Timestamp("2000-01-01 09:40:00-05:00"),
+                ),
+                (pd.Timestamp("2000-01-01 09:35:00-05:00"), None),
+            ]:
+                with hasynci.solipsism_context() as event_loop:
+                    (
+                        market_data,
+                        _,
+                    ) = mdmadaex.get_ReplayedTimeMarketData_from_df(
+                        event_loop, replayed_delay_in_mins, df.copy()
+                    )
+                    actual = market_data.get_data_for_interval(
+                        start_ts, end_ts, "end_datetime", asset_ids
+                    )
+                    # Scan the data.
+                    market_data._knowledge_time_cummax = None
+                    expected = market_data.get_data_for_interval(
+                        start_ts, end_ts, "end_datetime", asset_ids
+                    )
+                hunitest.compare_df(actual, expected)
+
+    def test_get_last_end_time1(self) -> None:
+        df = self._get_data()
+        for asset_ids in [[101, 202, 303], [303]]:
+            for replayed_delay_in_mins in [-1, 0, 3, 7, 12, 30]:
+                with hasynci.solipsism_context() as event_loop:
+                    (
+                        market_data,
+                        _,
+                    ) = mdmadaex.get_ReplayedTimeMarketData_from_df(
+                        event_loop, replayed_delay_in_mins, df.copy()
+                    )
+                    market_data._asset_ids = asset_ids
+                    actual = market_data.get_last_end_time()
+                    # Scan the data.
+                    market_data._knowledge_time_cummax = None
+                    expected = market_data.get_last_end_time()
+                self.assertEqual(actual, expected)
+                if expected is not None:
+                    self.assertEqual(str(actual.tz), str(expected.tz))
+
+    @staticmethod
+    def _get_data() -> pd.DataFrame:
+        """
+        Build data whose knowledge times are not sorted.
+        """
+        end_datetimes = pd.date_range(
+            "2000-01-01 09:31:00-05:00", periods=15, freq="T"
+        )
+        dfs = []
+        for asset_id in [101, 202, 303]:
+            df = pd.DataFrame(
+                {
+                    "start_datetime": end_datetimes - pd.Timedelta(minutes=1),
+                    "end_datetime": end_datetimes,
+                    "asset_id": asset_id,
+                    "price": range(len(end_datetimes)),
+                }
+            )
+            dfs.append(df)
+        df = pd.concat(dfs).reset_index(drop=True)
+        # Delay the data by a different amount for each row.
+        delays_in_secs = [(5 * idx) % 150 for idx in range(df.shape[0])]
+        df["timestamp_db"] = df["end_datetime"] + pd.to_timedelta(
+            delays_in_secs, unit="s"
+        )
+        return df
+
+
+# #############################################################################
+
+
+class TestReplayedMarketData6(hunitest.TestCase):
+    """
+    Test computing TWAP / VWAP for many intervals at once.
+    """
+
+    def test_get_twap_prices1(self) -> None:
+        asset_ids = [101, 303]
+        intervals = self._get_intervals()
+        for ts_col_name in ["end_datetime", "start_datetime"]:
+            with hasynci.solipsism_context() as event_loop:
+                market_data = self._get_market_data(event_loop)
+                actual = market_data.get_twap_prices(
+                    intervals, ts_col_name, asset_ids, ["close"]
+                )
+                expected = pd.concat(
+                    [
+                        market_data.get_twap_price(
+                            start_ts, end_ts, ts_col_name, asset_ids, "close"
+                        )
+                        for start_ts, end_ts in intervals
+                    ]
+                )
+            # The prices are the same as computing each interval separately.
+            hunitest.compare_df(actual, expected)
+
+    def test_get_vwap_prices1(self) -> None:
+        asset_ids = [101, 303]
+        intervals = self._get_intervals()
+        with hasynci.solipsism_context() as event_loop:
+            market_data = self._get_market_data(event_loop)
+            actual = market_data.get_vwap_prices(
+                intervals, "end_datetime", asset_ids, ["close"], "volume"
+            )
+            expected = []
+            for start_ts, end_ts in intervals:
+                df = market_data.get_data_for_interval(
+                    start_ts,
+                    end_ts,
+                    "end_datetime",
+                    asset_ids,
+                    left_close=False,
+                    right_close=True,
+                )
+                df["close"] *= df["volume"]
+                df = df.groupby("asset_id")[["close", "volume"]].sum()
+                df["close"] /= df["volume"]
+                expected.append(df["close"])
+        expected = pd.concat(expected).to_numpy()
+        self.assertEqual(actual.shape[0], len(expected))
+        self.assertTrue(
+            (actual["close"] - expected).abs().max() < 1e-9,
+            msg=str(actual),
+        )
+
+    @staticmethod
+    def _get_market_data(
+        event_loop: asyncio.AbstractEventLoop,
+    ) -> mdremada.ReplayedMarketData:
+        (market_data, _,) = mdmadaex.get_ReplayedTimeMarketData_example4(
+            event_loop,
+            start_datetime=pd.Timestamp(
+                "2000-01-03 09:31:00-05:00", tz="America/New_York"
+            ),
+            end_datetime=pd.Timestamp(
+                "2000-01-03 10:30:00-05:00", tz="America/New_York"
+            ),
+            asset_ids=[101, 202, 303],
+            replayed_delay_in_mins_or_timestamp=60,
+        )
+        return market_data
+
+    @staticmethod
+    def _get_intervals() -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        end_timestamps = pd.date_range(
+            "2000-01-03 09:35:00-05:00", periods=10, freq="5T"
+        )
+        intervals = [
+            (end_ts - pd.Timedelta(minutes=5), end_ts)
+            for end_ts in end_timestamps
+        ]
+        return intervals
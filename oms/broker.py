@@ -162,6 +162,8 @@ def _get_price_per_share(
     asset_ids: List[int],
     column: str,
     timing: str,
+    *,
+    twap_prices: Optional[pd.DataFrame] = None,
 ) -> pd.DataFrame:
     """
     Get the price corresponding to a certain column and timing (e.g., `start`,
@@ -170,6 +172,8 @@ def _get_price_per_share(
     :param timestamp_col_name: column to use to filter looking for start / end
         timestamp, typically the end of the interval `end_datetime`.
     :param column: column to use to compute the price
+    :param twap_prices: TWAP prices precomputed with
+        `MarketData.get_twap_prices()` for the interval, if any
     :return: a df, e.g.,
         ```
                          price
@@ -193,12 +197,15 @@ def _get_price_per_share(
             end_timestamp, timestamp_col_name, asset_ids
         )
     elif timing == "twap":
-        prices_df = market_data.get_twap_price(
-            start_timestamp,
-            end_timestamp,
-            timestamp_col_name,
-            asset_ids,
-            column,
+        if twap_prices is None:
+            twap_prices = market_data.get_twap_prices(
+                [(start_timestamp, end_timestamp)],
+                timestamp_col_name,
+                asset_ids,
+                [column],
+            )
+        prices_df = _select_twap_prices(
+            market_data, twap_prices, start_timestamp, end_timestamp, asset_ids
         )
     else:
         raise ValueError(f"Invalid timing='{timing}'")
@@ -220,6 +227,43 @@ def _get_price_per_share(
     return prices_srs
 
 
+def _select_twap_prices(
+    market_data: mdata.MarketData,
+    twap_prices: pd.DataFrame,
+    start_timestamp: pd.Timestamp,
+    end_timestamp: pd.Timestamp,
+    asset_ids: List[int],
+) -> pd.DataFrame:
+    """
+    Select the prices for an interval and assets from the output of
+    `MarketData.get_twap_prices()`.
+    """
+    mask = (
+        (twap_prices.index == end_timestamp)
+        & (twap_prices[market_data.start_time_col_name] == start_timestamp)
+        & twap_prices[market_data.asset_id_col].isin(asset_ids)
+    )
+    prices_df = twap_prices[mask]
+    return prices_df
+
+
+def _get_price_columns(
+    price_type: str, column_remap: Optional[Dict[str, str]]
+) -> List[str]:
+    """
+    Return the columns needed to compute the prices for `price_type`.
+    """
+    if price_type in ("price", "midpoint"):
+        columns = [price_type]
+    elif price_type.startswith("partial_spread"):
+        columns = ["bid", "ask"]
+    else:
+        raise ValueError(f"Invalid price_type='{price_type}'")
+    if column_remap is not None:
+        columns = [column_remap[column] for column in columns]
+    return columns
+
+
 def _get_execution_prices(
     market_data: mdata.MarketData,
     orders: List[omorder.Order],
@@ -227,6 +271,7 @@ def _get_execution_prices(
     # TODO(gp): Remove these defaults, if possible.
     timestamp_col: str = "end_datetime",
     column_remap: Optional[Dict[str, str]] = None,
+    twap_prices: Optional[pd.DataFrame] = None,
 ) -> pd.DataFrame:
     """
     Get the simulated execution prices of a list of orders.
@@ -238,6 +283,8 @@ def _get_execution_prices(
 
     :param column_remap: remap columns from `market_data` to the canonical
         columns (e.g., "bid", "ask", "price", "midpoint")
+    :param twap_prices: TWAP prices precomputed with
+        `MarketData.get_twap_prices()` for the interval of the orders, if any
     :return: a df, e.g.,
         ```
                          price
@@ -264,6 +311,15 @@ def _get_execution_prices(
     config = order_type.split("@")
     hdbg.dassert_eq(len(config), 2, "Invalid type_='%s'", order_type)
     price_type, timing = config
+    if timing == "twap" and twap_prices is None:
+        # Compute the TWAP of all the needed columns with a single query.
+        columns = _get_price_columns(price_type, column_remap)
+        twap_prices = market_data.get_twap_prices(
+            [(start_timestamp, end_timestamp)],
+            timestamp_col,
+            asset_ids,
+            columns,
+        )
     # Get the price depending on the price_type.
     if price_type in ("price", "midpoint"):
         column = column_remap[price_type]
@@ -275,6 +331,7 @@ def _get_execution_prices(
             asset_ids,
             column,
             timing,
+            twap_prices=twap_prices,
         )
     elif price_type.startswith("partial_spread"):
         perc = float(price_type.split("_")[2])
@@ -289,6 +346,7 @@ def _get_execution_prices(
             asset_ids,
             bid_col,
             timing,
+            twap_prices=twap_prices,
         )
         ask_col = column_remap["ask"]
         asks = _get_price_per_share(
@@ -299,6 +357,7 @@ def _get_execution_prices(
             asset_ids,
             ask_col,
             timing,
+            twap_prices=twap_prices,
         )
         is_buy = []
         for order in orders:
@@ -437,12 +496,15 @@ def fill_orders_fully_at_once(
     timestamp_col: str,
     column_remap: Dict[str, str],
     orders: List[omorder.Order],
+    *,
+    twap_prices: Optional[pd.DataFrame] = None,
 ) -> List[Fill]:
     """
     Execute orders fully (i.e., with no missing fills) with one single fill.
 
     :param market_data, timestamp_col, column_remap: used to retrieve prices
     :param orders: list of orders to execute
+    :param twap_prices: as in `_get_execution_prices()`
     """
     _LOG.debug(hprint.to_str("orders"))
     # TODO(Paul): The function `_get_execution_prices()` should be
@@ -452,6 +514,7 @@ def fill_orders_fully_at_once(
         orders,
         timestamp_col=timestamp_col,
         column_remap=column_remap,
+        twap_prices=twap_prices,
     )
     fills = []
     for order in orders:
@@ -538,19 +601,35 @@ def fill_orders_fully_twap(
     :param freq_as_pd_string: period used to split the execution interval using
         Pandas convention (e.g., "1T", "5T")
     """
-    order_type, start_timestamp, end_timestamp, _ = _extract_order_properties(
-        orders
-    )
+    (
+        order_type,
+        start_timestamp,
+        end_timestamp,
+        asset_ids,
+    ) = _extract_order_properties(orders)
     hdbg.dassert(
         order_type.endswith("@twap"), "Invalid order type='%s'", order_type
     )
     # Split the orders in child orders over the period of time.
     child_orders = _split_in_child_twap_orders(orders, freq_as_pd_string)
+    # Compute the TWAP prices for all the child intervals with a single query.
+    child_intervals = sorted(
+        {(order.start_timestamp, order.end_timestamp) for order in child_orders}
+    )
+    price_type = order_type.split("@")[0]
+    columns = _get_price_columns(price_type, column_remap)
+    twap_prices = market_data.get_twap_prices(
+        child_intervals, timestamp_col, asset_ids, columns
+    )
     #
     fills = []
     for order in child_orders:
         fills_tmp = fill_orders_fully_at_once(
-            market_data, timestamp_col, column_remap, [order]
+            market_data,
+            timestamp_col,
+            column_remap,
+            [order],
+            twap_prices=twap_prices,
         )
         hdbg.dassert_eq(len(fills_tmp), 1)
         fills.append(fills_tmp[0])
@@ -4,19 +4,25 @@ Import as:
 import oms.reconciliation as omreconc
 """
 
+import ast
 import collections
 import datetime
+import functools
 import itertools
 import logging
 import os
 import pprint
 from typing import Any, Dict, List, Optional, Tuple, Union
 
+import joblib
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 
 import core.config as cconfig
+import dataflow.core.node_io_log as dtfcnoiolo
+import dataflow.core.node_io_manifest as dtfcnoioma
 import helpers.hdbg as hdbg
 import helpers.hpandas as hpandas
 import helpers.hparquet as hparque
@@ -451,18 +457,38 @@ def check_dag_output_self_consistency(
         )
 
 
-def _get_dag_node_parquet_file_names(dag_dir: str) -> List[str]:
+@functools.lru_cache(maxsize=16)
+def _load_manifest_cached(dag_dir: str, version: Tuple[int, int]) -> pd.DataFrame:
     """
-    Get Parquet file names for all the nodes in the target folder.
+    Load the manifest of `dag_dir` once for each version of the dir.
 
-    :param dag_dir: dir with the DAG output
-    :return: list of all files for all nodes and timestamps in the dir
+    :param version: used only as part of the cache key
+    """
+    _ = version
+    manifest = dtfcnoioma.load_manifest(dag_dir)
+    return manifest
+
+
+def _load_manifest(dag_dir: str) -> pd.DataFrame:
+    """
+    Load the manifest of the DAG outputs in `dag_dir`.
+
+    The manifest is reused across the calls until it's updated, since loading
+    it for each node and bar timestamp dominates the time of reading a single
+    output.
     """
     hdbg.dassert_dir_exists(dag_dir)
-    cmd = f"ls {dag_dir} | grep 'parquet'"
-    _, nodes = hsystem.system_to_string(cmd)
-    nodes = nodes.split("\n")
-    return nodes
+    manifest_file_name = os.path.join(dag_dir, dtfcnoioma.MANIFEST_FILE_NAME)
+    if os.path.exists(manifest_file_name):
+        # The manifest is only appended to.
+        stat = os.stat(manifest_file_name)
+        version = (stat.st_mtime_ns, stat.st_size)
+    else:
+        # The manifest is built from the names of the files.
+        version = (os.stat(dag_dir).st_mtime_ns, len(os.listdir(dag_dir)))
+    manifest = _load_manifest_cached(dag_dir, version)
+    # Return a copy so that the callers can't modify the cached manifest.
+    return manifest.copy()
 
 
 def get_dag_node_names(
@@ -485,13 +511,11 @@ def get_dag_node_names(
         'predict.8.process_forecasts']
         ```
     """
-    file_names = _get_dag_node_parquet_file_names(dag_dir)
-    # E.g., if file name is
-    # `predict.8.process_forecasts.df_out.20221028_080000.parquet` then the
-    # node name is `predict.8.process_forecasts`.
-    node_names = sorted(
-        list(set(node.split(".df_out")[0] for node in file_names))
-    )
+    if dtfcnoiolo.is_node_io_log_dir(dag_dir):
+        node_names = dtfcnoiolo.NodeIoLogReader(dag_dir).get_node_names()
+    else:
+        manifest = _load_manifest(dag_dir)
+        node_names = sorted(manifest["node_name"].unique())
     _LOG.log(
         log_level,
         "dag_node_names=\n%s",
@@ -500,6 +524,17 @@ def get_dag_node_names(
     return node_names
 
 
+def _timestamp_str_to_timestamp(timestamp: str) -> pd.Timestamp:
+    """
+    Convert a timestamp from a file name (e.g., `20221028_080000`).
+    """
+    timestamp = timestamp.replace("_", " ")
+    # TODO(Grisha): Pass tz a param?
+    tz = "America/New_York"
+    timestamp = pd.Timestamp(timestamp, tz=tz)
+    return timestamp
+
+
 def get_dag_node_timestamps(
     dag_dir: str,
     dag_node_name: str,
@@ -521,24 +556,24 @@ def get_dag_node_timestamps(
         for the specified node
     """
     _LOG.log(log_level, hprint.to_str("dag_dir dag_node_name as_timestamp"))
-    file_names = _get_dag_node_parquet_file_names(dag_dir)
-    node_file_names = list(filter(lambda node: dag_node_name in node, file_names))
-    node_timestamps = []
-    for file_name in node_file_names:
-        # E.g., file name is "predict.8.process_forecasts.df_out.20221028_080000.20221028_080143.parquet".
-        # The bar timestamp is "20221028_080000", and the wall clock timestamp
-        # is "20221028_080143".
-        splitted_file_name = file_name.split(".")
-        bar_timestamp = splitted_file_name[-3]
-        wall_clock_timestamp = splitted_file_name[-2]
-        if as_timestamp:
-            bar_timestamp = bar_timestamp.replace("_", " ")
-            wall_clock_timestamp = wall_clock_timestamp.replace("_", " ")
-            # TODO(Grisha): Pass tz a param?
-            tz = "America/New_York"
-            bar_timestamp = pd.Timestamp(bar_timestamp, tz=tz)
-            wall_clock_timestamp = pd.Timestamp(wall_clock_timestamp, tz=tz)
-        node_timestamps.append((bar_timestamp, wall_clock_timestamp))
+    if dtfcnoiolo.is_node_io_log_dir(dag_dir):
+        node_timestamps = dtfcnoiolo.NodeIoLogReader(dag_dir).get_timestamps(
+            dag_node_name
+        )
+    else:
+        manifest = _load_manifest(dag_dir)
+        manifest = manifest[manifest["node_name"] == dag_node_name]
+        node_timestamps = list(
+            zip(manifest["bar_timestamp"], manifest["wall_clock_timestamp"])
+        )
+    if as_timestamp:
+        node_timestamps = [
+            (
+                _timestamp_str_to_timestamp(bar_timestamp),
+                _timestamp_str_to_timestamp(wall_clock_timestamp),
+            )
+            for bar_timestamp, wall_clock_timestamp in node_timestamps
+        ]
     #
     _LOG.log(
         log_level,
@@ -548,39 +583,182 @@ def get_dag_node_timestamps(
     return node_timestamps
 
 
+def _get_parquet_columns(
+    file_name: str, columns: Optional[List[str]]
+) -> Optional[List[str]]:
+    """
+    Get the names of the Parquet columns storing the requested df columns.
+
+    The DAG outputs typically have multi-index columns (e.g., `("close",
+    1891737434)`), which are stored in Parquet as strings like
+    "('close', '1891737434')".
+
+    :param columns: outermost level of the df columns to read (e.g.,
+        `["close"]`), `None` to read all the columns
+    :return: Parquet columns to pass to `hparque.from_parquet()`
+    """
+    if columns is None:
+        return None
+    schema = pq.read_schema(file_name)
+    pandas_metadata = schema.pandas_metadata
+    index_columns = pandas_metadata["index_columns"]
+    is_multiindex = len(pandas_metadata["column_indexes"]) > 1
+    parquet_columns = []
+    for field_name in schema.names:
+        if field_name in index_columns:
+            continue
+        if is_multiindex:
+            col = ast.literal_eval(field_name)[0]
+        else:
+            col = field_name
+        if col in columns:
+            parquet_columns.append(field_name)
+    hdbg.dassert_lt(0, len(parquet_columns), "No columns in %s", columns)
+    return parquet_columns
+
+
 def get_dag_node_output(
     dag_dir: str,
     dag_node_name: str,
     timestamp: pd.Timestamp,
+    *,
+    columns: Optional[List[str]] = None,
 ) -> pd.DataFrame:
     """
     Retrieve output from the last DAG node.
 
-    This function relies on our file naming conventions, e.g.,
-    `dag/node_io/node_io.data/predict.0.read_data.df_out.20221021_060500.parquet`.
+    The file storing the output is looked up in the manifest of `dag_dir`
+    (see `dataflow/core/node_io_manifest.py`). If `dag_dir` contains a log
+    written by `NodeIoLogWriter`, the output is rebuilt from the log.
 
     :param dag_dir: dir with the DAG output
     :param dag_node_name: a node name, e.g., `predict.0.read_data`
     :param timestamp: bar timestamp
+    :param columns: outermost level of the columns to read, e.g.,
+        `["close"]`, `None` to read all the columns
     :return: a DAG node output
     """
     hdbg.dassert_dir_exists(dag_dir)
     hdbg.dassert_isinstance(timestamp, pd.Timestamp)
     timestamp = timestamp.strftime("%Y%m%d_%H%M%S")
-    # TODO(Grisha): merge the logic with the one in `get_dag_node_names()`.
-    cmd = f"find '{dag_dir}' -name {dag_node_name}*.parquet"
-    cmd += f" | grep '{timestamp}'"
-    _, file = hsystem.system_to_string(cmd)
-    df = hparque.from_parquet(file)
+    if dtfcnoiolo.is_node_io_log_dir(dag_dir):
+        reader = dtfcnoiolo.NodeIoLogReader(dag_dir)
+        df = reader.read(dag_node_name, timestamp)
+        if columns is not None:
+            df = df[columns]
+        return df
+    manifest = _load_manifest(dag_dir)
+    mask = (manifest["node_name"] == dag_node_name) & (
+        manifest["bar_timestamp"] == timestamp
+    )
+    file_names = manifest.loc[mask, "file_name"].tolist()
+    hdbg.dassert_eq(
+        len(file_names), 1, "node=%s timestamp=%s", dag_node_name, timestamp
+    )
+    file_name = os.path.join(dag_dir, file_names[0])
+    df = hparque.from_parquet(
+        file_name, columns=_get_parquet_columns(file_name, columns)
+    )
     return df
 
 
+def _load_dag_outputs_from_log(
+    dag_dir: str, *, only_last_node: bool, only_last_timestamp: bool
+) -> Dict[str, Dict[pd.Timestamp, pd.DataFrame]]:
+    """
+    Load DAG output from a log written by `NodeIoLogWriter`.
+
+    :return: DAG output per node and bar timestamp
+    """
+    reader = dtfcnoiolo.NodeIoLogReader(dag_dir)
+    nodes = reader.get_node_names()
+    if only_last_node:
+        nodes = [nodes[-1]]
+    dag_dict = {}
+    for node in nodes:
+        if only_last_timestamp:
+            bar_timestamp, _ = reader.get_timestamps(node)[-1]
+            outputs = [(bar_timestamp, reader.read(node, bar_timestamp))]
+        else:
+            # Rebuild the outputs for all the timestamps in one pass, instead
+            # of starting from a snapshot for each timestamp.
+            outputs = [
+                (bar_timestamp, df)
+                for bar_timestamp, _, df in reader.iterate(node)
+            ]
+        dag_dict[node] = {
+            _timestamp_str_to_timestamp(bar_timestamp): df
+            for bar_timestamp, df in outputs
+        }
+    return dag_dict
+
+
+def _load_dag_outputs_from_manifest(
+    dag_dir: str,
+    *,
+    only_last_node: bool,
+    only_last_timestamp: bool,
+    columns: Optional[List[str]],
+    num_threads: Union[str, int],
+) -> Dict[str, Dict[pd.Timestamp, pd.DataFrame]]:
+    """
+    Load DAG output from the Parquet files indexed by the manifest.
+
+    :return: DAG output per node and bar timestamp
+    """
+    manifest = _load_manifest(dag_dir)
+    nodes = sorted(manifest["node_name"].unique())
+    if only_last_node:
+        nodes = [nodes[-1]]
+    manifest = manifest[manifest["node_name"].isin(nodes)]
+    if only_last_timestamp:
+        manifest = manifest.groupby("node_name").tail(1)
+    file_names = [
+        os.path.join(dag_dir, file_name) for file_name in manifest["file_name"]
+    ]
+    # The outputs of a node have the same columns for all the bar timestamps.
+    node_to_parquet_columns = {}
+    for node, file_name in zip(manifest["node_name"], file_names):
+        if node not in node_to_parquet_columns:
+            node_to_parquet_columns[node] = _get_parquet_columns(
+                file_name, columns
+            )
+    tasks = [
+        (file_name, node_to_parquet_columns[node])
+        for node, file_name in zip(manifest["node_name"], file_names)
+    ]
+    if num_threads == "serial":
+        dfs = [
+            hparque.from_parquet(file_name, columns=parquet_columns)
+            for file_name, parquet_columns in tasks
+        ]
+    else:
+        # Reading Parquet releases the GIL, so threads are enough.
+        # `joblib` returns the results in the order of the tasks.
+        dfs = joblib.Parallel(n_jobs=num_threads, backend="threading")(
+            joblib.delayed(hparque.from_parquet)(
+                file_name, columns=parquet_columns
+            )
+            for file_name, parquet_columns in tasks
+        )
+    dag_dict: Dict[
+        str, Dict[pd.Timestamp, pd.DataFrame]
+    ] = collections.defaultdict(dict)
+    for node, bar_timestamp, df in zip(
+        manifest["node_name"], manifest["bar_timestamp"], dfs
+    ):
+        dag_dict[node][_timestamp_str_to_timestamp(bar_timestamp)] = df
+    return dag_dict
+
+
 def load_dag_outputs(
     dag_path_dict: Dict[str, str],
     *,
     only_last_node: bool = True,
     only_last_timestamp: bool = True,
     only_last_row: bool = False,
+    columns: Optional[List[str]] = None,
+    num_threads: Union[str, int] = "serial",
 ) -> Dict[str, Dict[str, Dict[pd.Timestamp, pd.DataFrame]]]:
     """
     Load DAG output for different experiments.
@@ -604,32 +782,44 @@ def load_dag_outputs(
         otherwise load data for all the timestamps
     :param only_last_row: if `True`, get DAG output only for the last data row,
         otherwise load whole dataframes
-    :param log_level: log level
+    :param columns: outermost level of the columns to load, e.g., `["close"]`,
+        `None` to load all the columns
+    :param num_threads: number of threads to load the files with, as in
+        `joblib.Parallel(n_jobs=...)`
+        - "serial" loads one file at a time
     :return: DAG output per experiment, node and timestamp
     """
     dag_df_dict = {}
     for experiment, path in dag_path_dict.items():
-        # Set experiment default dict to fill it in the loop.
-        experiment_dict = collections.defaultdict(dict)
-        # Get DAG node names to iterate over them.
-        nodes = get_dag_node_names(path)
-        if only_last_node:
-            nodes = [nodes[-1]]
-        for node in nodes:
-            # Get DAG timestamps to iterate over them.
-            dag_timestamps = get_dag_node_timestamps(path, node)
-            # Keep bar timestamps only.
-            bar_timestamps = [
-                bar_timestamp for bar_timestamp, _ in dag_timestamps
-            ]
-            if only_last_timestamp:
-                bar_timestamps = [bar_timestamps[-1]]
-            for timestamp in bar_timestamps:
-                # Get DAG output for the specified node and timestamp.
-                df = get_dag_node_output(path, node, timestamp)
-                if only_last_row:
-                    df = df.tail(1)
-                experiment_dict[node][timestamp] = df
+        if dtfcnoiolo.is_node_io_log_dir(path):
+            experiment_dict = _load_dag_outputs_from_log(
+                path,
+                only_last_node=only_last_node,
+                only_last_timestamp=only_last_timestamp,
+            )
+            if columns is not None:
+                experiment_dict = {
+                    node: {
+                        timestamp: df[columns]
+                        for timestamp, df in node_dict.items()
+                    }
+                    for node, node_dict in experiment_dict.items()
+                }
+        else:
+            experiment_dict = _load_dag_outputs_from_manifest(
+                path,
+                only_last_node=only_last_node,
+                only_last_timestamp=only_last_timestamp,
+                columns=columns,
+                num_threads=num_threads,
+            )
+        if only_last_row:
+            experiment_dict = {
+                node: {
+                    timestamp: df.tail(1) for timestamp, df in node_dict.items()
+                }
+                for node, node_dict in experiment_dict.items()
+            }
         # Populate result dict with experiment output dict.
         dag_df_dict[experiment] = experiment_dict
     return dag_df_dict
@@ -654,6 +844,10 @@ def compute_dag_outputs_diff(
     2022-01-01 21:03:00+00:00                  12.2                   -32.0
     ```
 
+    The outputs of a node for all the bar timestamps are stacked in a single
+    df, so that the differences are computed with a single `compare_dfs()`
+    call for each node.
+
     :param dag_df_dict: DAG output per experiment, node and bar timestamp
     :param compare_dfs_kwargs: params for `compare_dfs()`
     :return: DAG output differences for each experiment, node and bar timestamp
@@ -676,24 +870,42 @@ def compute_dag_outputs_diff(
         dag_dict_2_node = dag_dict_2[node_name]
         # Assert that node dicts have equal bar timestamps.
         hdbg.dassert_set_eq(dag_dict_1_node.keys(), dag_dict_2_node.keys())
-        # Get bar timestamps and set a list to store bar timestamp data.
         bar_timestamps = list(dag_dict_1_node.keys())
-        bar_timestamp_dfs = []
-        for bar_timestamp in bar_timestamps:
-            # Get DAG outputs per timestamp and compare them.
-            df_1 = dag_dict_1_node[bar_timestamp]
-            df_2 = dag_dict_2_node[bar_timestamp]
-            # Pick only float columns for difference computations.
-            # Only float columns are picked because int columns represent
-            # not metrics but ids, etc.
-            df_1 = df_1.select_dtypes("float")
-            df_2 = df_2.select_dtypes("float")
-            # Compute the difference.
-            df_diff = hpandas.compare_dfs(df_1, df_2, **compare_dfs_kwargs)
-            # Add bar timestamp diff data to the corresponding list.
-            bar_timestamp_dfs.append(df_diff)
-        # Merge bar timestamp diff data into node diff data.
-        node_df = pd.concat(bar_timestamp_dfs, axis=1, keys=bar_timestamps)
+        # Stack the DAG outputs for all the bar timestamps, indexing them by
+        # bar timestamp and by the index of the outputs.
+        # Pick only float columns for difference computations.
+        # Only float columns are picked because int columns represent
+        # not metrics but ids, etc.
+        df_1 = pd.concat(
+            [
+                dag_dict_1_node[bar_timestamp].select_dtypes("float")
+                for bar_timestamp in bar_timestamps
+            ],
+            keys=bar_timestamps,
+        )
+        df_2 = pd.concat(
+            [
+                dag_dict_2_node[bar_timestamp].select_dtypes("float")
+                for bar_timestamp in bar_timestamps
+            ],
+            keys=bar_timestamps,
+        )
+        # Compute the difference.
+        df_diff = hpandas.compare_dfs(df_1, df_2, **compare_dfs_kwargs)
+        # Move the bar timestamps from the index to the outermost level of the
+        # columns.
+        node_df = df_diff.unstack(level=0)
+        num_levels = node_df.columns.nlevels
+        node_df.columns = node_df.columns.reorder_levels(
+            [num_levels - 1] + list(range(num_levels - 1))
+        )
+        node_df.columns.names = [None] * num_levels
+        columns = [
+            (bar_timestamp,) + (col if isinstance(col, tuple) else (col,))
+            for bar_timestamp in bar_timestamps
+            for col in df_diff.columns
+        ]
+        node_df = node_df.reindex(columns=pd.MultiIndex.from_tuples(columns))
         node_dfs.append(node_df)
     # Merge node diff data into result diff data.
     dag_diff_df = pd.concat(node_dfs, axis=1, keys=node_names)
@@ -92,6 +92,9 @@ class TargetPositionAndOrderGenerator(hobject.PrintableMixin):
         # Save optimizer config.
         _ = hdict.typed_get(optimizer_dict, "backend", expected_type=str)
         self._optimizer_dict = optimizer_dict
+        # Problems reused by the "batch_optimizer" backend across bars, see
+        # `SinglePeriodOptimizer`.
+        self._optimizer_problem_cache: Dict[Any, Any] = {}
         #
         self._restrictions = restrictions
         self._share_quantization = share_quantization
@@ -390,6 +393,7 @@ class TargetPositionAndOrderGenerator(hobject.PrintableMixin):
                 self._optimizer_dict,
                 assets_and_predictions,
                 restrictions=self._restrictions,
+                problem_cache=self._optimizer_problem_cache,
             )
             df = spo.optimize(
                 quantization=self._share_quantization,
@@ -0,0 +1,232 @@
+import logging
+import os
+import unittest.mock as umock
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+import dataflow.core.node_io_manifest as dtfcnoioma
+import helpers.hpandas as hpandas
+import helpers.hparquet as hparque
+import helpers.hunit_test as hunitest
+import oms.reconciliation as omreconc
+
+_LOG = logging.getLogger(__name__)
+
+
+def _get_dag_outputs(seed: int) -> Dict[str, Dict[pd.Timestamp, pd.DataFrame]]:
+    """
+    Build the outputs of 2 nodes for 3 bars, with a lookback window of 4 rows.
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(
+        "2022-01-03 09:00", periods=6, freq="5T", tz="America/New_York"
+    )
+    index.name = "end_timestamp"
+    columns = pd.MultiIndex.from_product([["close", "volume"], [101, 202]])
+    data = pd.DataFrame(
+        rng.uniform(1, 2, size=(len(index), len(columns))),
+        index=index,
+        columns=columns,
+    )
+    data.index.freq = None
+    dag_dict = {}
+    for node_name in ["predict.0.read_data", "predict.1.resample"]:
+        dag_dict[node_name] = {
+            index[i + 3]: data.iloc[i : i + 4].copy() for i in range(3)
+        }
+    return dag_dict
+
+
+def _save_dag_outputs(
+    dag_dir: str,
+    dag_dict: Dict[str, Dict[pd.Timestamp, pd.DataFrame]],
+    *,
+    delay: pd.Timedelta = pd.Timedelta(0),
+) -> None:
+    """
+    Save the outputs like `DAG` does with `save_node_io="df_as_pq"`.
+
+    :param delay: delay of the wall clock timestamp with respect to the bar
+        timestamp
+    """
+    for node_name, node_dict in dag_dict.items():
+        for bar_timestamp, df in node_dict.items():
+            wall_clock_timestamp = (bar_timestamp + delay).strftime(
+                "%Y%m%d_%H%M%S"
+            )
+            bar_timestamp = bar_timestamp.strftime("%Y%m%d_%H%M%S")
+            file_name = os.path.join(
+                dag_dir,
+                f"{node_name}.df_out.{bar_timestamp}.{wall_clock_timestamp}.parquet",
+            )
+            hparque.to_parquet(df, file_name)
+            dtfcnoioma.append_to_manifest(
+                dag_dir,
+                node_name,
+                "df_out",
+                bar_timestamp,
+                wall_clock_timestamp,
+                file_name,
+                df,
+            )
+
+
+# #############################################################################
+# TestLoadDagOutputs1
+# #############################################################################
+
+
+class TestLoadDagOutputs1(hunitest.TestCase):
+    def check(self, dag_dir: str, *, seed: int = 0, **kwargs) -> None:
+        expected = _get_dag_outputs(seed=seed)
+        dag_df_dict = omreconc.load_dag_outputs(
+            {"prod": dag_dir},
+            only_last_node=False,
+            only_last_timestamp=False,
+            **kwargs,
+        )
+        actual = dag_df_dict["prod"]
+        self.assertEqual(list(actual.keys()), list(expected.keys()))
+        columns = kwargs.get("columns")
+        for node_name, node_dict in expected.items():
+            self.assertEqual(
+                list(actual[node_name].keys()), list(node_dict.keys())
+            )
+            for bar_timestamp, df in node_dict.items():
+                if columns is not None:
+                    df = df[columns]
+                hunitest.compare_df(actual[node_name][bar_timestamp], df)
+
+    def test_manifest1(self) -> None:
+        """
+        Check loading the outputs indexed by the manifest in parallel.
+        """
+        dag_dir = self.get_scratch_space()
+        _save_dag_outputs(dag_dir, _get_dag_outputs(seed=0))
+        self.check(dag_dir, num_threads=2)
+
+    def test_no_manifest1(self) -> None:
+        """
+        Check loading the outputs from a dir without a manifest.
+        """
+        dag_dir = self.get_scratch_space()
+        _save_dag_outputs(dag_dir, _get_dag_outputs(seed=0))
+        os.remove(os.path.join(dag_dir, dtfcnoioma.MANIFEST_FILE_NAME))
+        self.check(dag_dir)
+
+    def test_rerun1(self) -> None:
+        """
+        Check that the latest outputs are loaded after running again into the
+        same dir.
+        """
+        dag_dir = self.get_scratch_space()
+        _save_dag_outputs(dag_dir, _get_dag_outputs(seed=0))
+        _save_dag_outputs(
+            dag_dir, _get_dag_outputs(seed=1), delay=pd.Timedelta("1S")
+        )
+        self.check(dag_dir, seed=1)
+        expected = _get_dag_outputs(seed=1)
+        node_name = "predict.1.resample"
+        timestamps = omreconc.get_dag_node_timestamps(dag_dir, node_name)
+        self.assertEqual(
+            [bar_timestamp for bar_timestamp, _ in timestamps],
+            list(expected[node_name].keys()),
+        )
+        bar_timestamp = timestamps[0][0]
+        actual = omreconc.get_dag_node_output(dag_dir, node_name, bar_timestamp)
+        hunitest.compare_df(actual, expected[node_name][bar_timestamp])
+        # Check also the manifest built from the file names.
+        os.remove(os.path.join(dag_dir, dtfcnoioma.MANIFEST_FILE_NAME))
+        self.check(dag_dir, seed=1)
+
+    def test_columns1(self) -> None:
+        """
+        Check loading only some of the columns.
+        """
+        dag_dir = self.get_scratch_space()
+        _save_dag_outputs(dag_dir, _get_dag_outputs(seed=0))
+        self.check(dag_dir, columns=["close"])
+
+    def test_get_dag_node_output1(self) -> None:
+        dag_dir = self.get_scratch_space()
+        expected = _get_dag_outputs(seed=0)
+        _save_dag_outputs(dag_dir, expected)
+        node_name = "predict.1.resample"
+        timestamps = omreconc.get_dag_node_timestamps(dag_dir, node_name)
+        self.assertEqual(
+            [bar_timestamp for bar_timestamp, _ in timestamps],
+            list(expected[node_name].keys()),
+        )
+        bar_timestamp = timestamps[1][0]
+        actual = omreconc.get_dag_node_output(dag_dir, node_name, bar_timestamp)
+        hunitest.compare_df(actual, expected[node_name][bar_timestamp])
+
+    def test_manifest_cache1(self) -> None:
+        """
+        Check that the manifest is loaded once until the dir is updated.
+        """
+        dag_dir = self.get_scratch_space()
+        dag_dict = _get_dag_outputs(seed=0)
+        node_name = "predict.0.read_data"
+        _save_dag_outputs(dag_dir, {node_name: dag_dict[node_name]})
+        with umock.patch.object(
+            dtfcnoioma, "load_manifest", wraps=dtfcnoioma.load_manifest
+        ) as load_manifest:
+            node_names = omreconc.get_dag_node_names(dag_dir)
+            self.assertEqual(node_names, [node_name])
+            for bar_timestamp, _ in omreconc.get_dag_node_timestamps(
+                dag_dir, node_name
+            ):
+                omreconc.get_dag_node_output(dag_dir, node_name, bar_timestamp)
+            self.assertEqual(load_manifest.call_count, 1)
+            # Save the outputs of another node.
+            node_name = "predict.1.resample"
+            _save_dag_outputs(dag_dir, {node_name: dag_dict[node_name]})
+            node_names = omreconc.get_dag_node_names(dag_dir)
+            self.assertEqual(node_names, list(dag_dict.keys()))
+            self.assertEqual(load_manifest.call_count, 2)
+
+
+# #############################################################################
+# TestComputeDagOutputsDiff1
+# #############################################################################
+
+
+class TestComputeDagOutputsDiff1(hunitest.TestCase):
+    def test1(self) -> None:
+        """
+        Check that the diff is the same as comparing the outputs bar by bar.
+        """
+        dag_df_dict = {
+            "prod": _get_dag_outputs(seed=0),
+            "sim": _get_dag_outputs(seed=1),
+        }
+        compare_dfs_kwargs = {
+            "diff_mode": "pct_change",
+            "assert_diff_threshold": None,
+        }
+        actual = omreconc.compute_dag_outputs_diff(
+            dag_df_dict, compare_dfs_kwargs
+        )
+        # Compare the outputs bar by bar.
+        node_dfs = []
+        for node_name, node_dict in dag_df_dict["prod"].items():
+            bar_timestamp_dfs = [
+                hpandas.compare_dfs(
+                    df,
+                    dag_df_dict["sim"][node_name][bar_timestamp],
+                    **compare_dfs_kwargs,
+                )
+                for bar_timestamp, df in node_dict.items()
+            ]
+            node_dfs.append(
+                pd.concat(bar_timestamp_dfs, axis=1, keys=list(node_dict.keys()))
+            )
+        expected = pd.concat(
+            node_dfs, axis=1, keys=list(dag_df_dict["prod"].keys())
+        )
+        # The stacked computation doesn't infer the frequency of the index.
+        expected.index.freq = None
+        hunitest.compare_df(actual, expected)
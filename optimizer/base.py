@@ -5,6 +5,10 @@ import optimizer.base as opbase
 """
 
 import abc
+from typing import Union
+
+import numpy as np
+import pandas as pd
 
 # Equivalent to `import cvxpy as cpx`, but skip this module if the module is
 # not present.
@@ -15,6 +19,20 @@ cvx = pytest.importorskip("cvxpy")
 EXPR = cvx.expressions.expression.Expression
 
 
+def get_data(
+    data: Union[pd.Series, cvx.Parameter]
+) -> Union[np.ndarray, cvx.Parameter]:
+    """
+    Get the data to use in a cvxpy expression.
+
+    A `cvx.Parameter` is used as it is, so that the problem can be solved again
+    with different data without being rebuilt.
+    """
+    if isinstance(data, cvx.Parameter):
+        return data
+    return data.values
+
+
 # #############################################################################
 # Base `Expression` class.
 # #############################################################################
@@ -4,8 +4,9 @@ Import as:
 import optimizer.forecast_evaluator_with_optimizer as ofevwiop
 """
 import logging
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
+import joblib
 import pandas as pd
 from tqdm.autonotebook import tqdm
 
@@ -148,8 +149,22 @@ class ForecastEvaluatorWithOptimizer:
         burn_in_days: int = 0,
         compute_extended_stats: bool = False,
         asset_id_to_share_decimals: Optional[Dict[int, int]] = None,
+        num_threads: Union[str, int] = "serial",
+        backend: str = "loky",
         **kwargs,
     ) -> Dict[str, pd.DataFrame]:
+        """
+        Compute target positions, PnL, and portfolio stats bar by bar.
+
+        :param num_threads: number of workers to process the days with, as in
+            `joblib.Parallel(n_jobs=...)`
+            - "serial" processes all the bars in the current process
+            - otherwise the days are processed in parallel, which requires
+              the days to be independent, i.e., `liquidate_at_end_of_day` and
+              `initialize_beginning_of_day_trades_to_zero` to be True
+            - the results are the same in both cases
+        :param backend: joblib backend (e.g., "loky" for processes)
+        """
         _LOG.debug("df=\n%s", hpandas.df_to_str(df, print_shape_info=True))
         self._validate_df(df)
         # Record index in case we reindex the results.
@@ -159,6 +174,151 @@ class ForecastEvaluatorWithOptimizer:
             idx = None
         # Trim to indices with prices and beginning of forecast availability.
         df = self._apply_trimming(df)
+        if num_threads == "serial":
+            dicts = self._compute_holdings_and_trades(
+                df,
+                quantization,
+                liquidate_at_end_of_day,
+                initialize_beginning_of_day_trades_to_zero,
+                asset_id_to_share_decimals,
+                show_progress=True,
+            )
+        else:
+            # The days are independent only if each day starts with no
+            # holdings and trades.
+            hdbg.dassert(
+                liquidate_at_end_of_day
+                and initialize_beginning_of_day_trades_to_zero,
+                "Days can be processed in parallel only when liquidating at "
+                "end of day and initializing beginning of day trades to zero",
+            )
+            day_dfs = self._split_by_day(df)
+            # `joblib` returns the results in the order of the tasks.
+            day_dicts = joblib.Parallel(n_jobs=num_threads, backend=backend)(
+                joblib.delayed(self._compute_holdings_and_trades)(
+                    day_df,
+                    quantization,
+                    liquidate_at_end_of_day,
+                    initialize_beginning_of_day_trades_to_zero,
+                    asset_id_to_share_decimals,
+                    show_progress=False,
+                )
+                for day_df in day_dfs
+            )
+            # Merge the results of the days.
+            dicts = tuple({} for _ in range(4))
+            for day_dict in day_dicts:
+                for dict_, day_dict_ in zip(dicts, day_dict):
+                    dict_.update(day_dict_)
+        (
+            holdings_shares_dict,
+            holdings_notional_dict,
+            executed_trades_shares_dict,
+            executed_trades_notional_dict,
+        ) = dicts
+        # Create the portfolio dataframe.
+        holdings_shares = pd.DataFrame(holdings_shares_dict).T
+        holdings_notional = pd.DataFrame(holdings_notional_dict).T
+        executed_trades_shares = pd.DataFrame(executed_trades_shares_dict).T
+        executed_trades_notional = pd.DataFrame(executed_trades_notional_dict).T
+        pnl = holdings_notional.subtract(
+            holdings_notional.shift(1), fill_value=0
+        ).subtract(executed_trades_notional, fill_value=0)
+        stats = cofinanc.compute_bar_metrics(
+            holdings_notional,
+            -executed_trades_notional,
+            pnl,
+            compute_extended_stats=compute_extended_stats,
+        )
+        derived_dfs = {
+            "holdings_shares": holdings_shares,
+            "holdings_notional": holdings_notional,
+            "executed_trades_shares": executed_trades_shares,
+            "executed_trades_notional": executed_trades_notional,
+            "pnl": pnl,
+            "stats": stats,
+        }
+        # Apply burn-in and reindex like input.
+        return self._apply_burn_in_and_reindex(
+            df,
+            derived_dfs,
+            burn_in_bars,
+            burn_in_days,
+            idx,
+        )
+
+    def annotate_forecasts(
+        self,
+        df: pd.DataFrame,
+        **kwargs,
+    ) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, pd.DataFrame]]:
+        """
+        Compute target positions, PnL, and portfolio stats.
+
+        :param df: multiindexed dataframe with predictions, price, volatility
+        """
+        derived_dfs = self.compute_portfolio(df, **kwargs)
+        dfs = {
+            "price": df[self._price_col],
+            "volatility": df[self._volatility_col],
+            "prediction": df[self._prediction_col],
+            "holdings_shares": derived_dfs["holdings_shares"],
+            "holdings_notional": derived_dfs["holdings_notional"],
+            "executed_trades_shares": derived_dfs["executed_trades_shares"],
+            "executed_trades_notional": derived_dfs["executed_trades_notional"],
+            "pnl": derived_dfs["pnl"],
+        }
+        portfolio_df = ForecastEvaluatorWithOptimizer._build_multiindex_df(dfs)
+        return portfolio_df, derived_dfs["stats"]
+
+    @staticmethod
+    def _build_multiindex_df(dfs: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        portfolio_df = pd.concat(dfs.values(), axis=1, keys=dfs.keys())
+        return portfolio_df
+
+    def _compute_holdings_notional(
+        self,
+        df_slice: pd.DataFrame,
+        holdings_shares: pd.Series,
+    ) -> pd.Series:
+        price = df_slice["price"]
+        holdings_notional = (holdings_shares * price).rename("holdings_notional")
+        return holdings_notional
+
+    def _compute_executed_trades_notional(
+        self,
+        df_slice: pd.DataFrame,
+        executed_trades_shares: pd.Series,
+    ) -> pd.Series:
+        price = df_slice["price"]
+        # Compute the notional value of the trades that executed over the
+        # last bar.
+        executed_trades_notional = (executed_trades_shares * price).rename(
+            "executed_trades_notional"
+        )
+        return executed_trades_notional
+
+    def _compute_holdings_and_trades(
+        self,
+        df: pd.DataFrame,
+        quantization: str,
+        liquidate_at_end_of_day: bool,
+        initialize_beginning_of_day_trades_to_zero: bool,
+        asset_id_to_share_decimals: Optional[Dict[int, int]],
+        *,
+        show_progress: bool,
+    ) -> Tuple[
+        Dict[pd.Timestamp, pd.Series],
+        Dict[pd.Timestamp, pd.Series],
+        Dict[pd.Timestamp, pd.Series],
+        Dict[pd.Timestamp, pd.Series],
+    ]:
+        """
+        Compute holdings and executed trades bar by bar.
+
+        :return: dicts from timestamp to holdings in shares, holdings notional,
+            executed trades in shares, executed trades notional
+        """
         # Prepare to process the DAG df row by row.
         iter_ = enumerate(df.iterrows())
         iter_idx = df.index
@@ -185,6 +345,12 @@ class ForecastEvaluatorWithOptimizer:
         executed_trades_notional_dict[
             initial_timestamp
         ] = initial_conditions.rename("executed_trades_notional")
+        # Reuse the optimization problem across bars, since only the data
+        # changes.
+        problem_cache = {}
+        is_day_independent = (
+            liquidate_at_end_of_day and initialize_beginning_of_day_trades_to_zero
+        )
         bod_timestamps = cofinanc.retrieve_beginning_of_day_timestamps(
             df[self._price_col]
         )
@@ -192,7 +358,9 @@ class ForecastEvaluatorWithOptimizer:
             df[self._price_col]
         )
         # Process the DAG row by row.
-        for idx, (timestamp, dag_data) in tqdm(iter_, total=num_rows):
+        if show_progress:
+            iter_ = tqdm(iter_, total=num_rows)
+        for idx, (timestamp, dag_data) in iter_:
             if idx + 1 < num_rows:
                 next_timestamp = iter_idx[idx + 1]
             else:
@@ -238,7 +406,13 @@ class ForecastEvaluatorWithOptimizer:
                 quantization,
                 asset_id_to_share_decimals,
                 liquidate_holdings,
+                problem_cache,
             )
+            if next_timestamp_is_bod and is_day_independent:
+                # Solve each day from scratch, as when processing the days
+                # separately, so that the results don't depend on how the days
+                # are processed.
+                problem_cache = {}
             # If the time step is not the last one, set the next-period
             # share holdings and executed trades in shares (assuming orders
             # are fully filled).
@@ -260,87 +434,36 @@ class ForecastEvaluatorWithOptimizer:
                     executed_trades_shares_dict[next_timestamp] = (
                         targets_df["target_trades_shares"]
                     ).rename("executed_trades_shares")
-        # Create the portfolio dataframe.
-        holdings_shares = pd.DataFrame(holdings_shares_dict).T
-        holdings_notional = pd.DataFrame(holdings_notional_dict).T
-        executed_trades_shares = pd.DataFrame(executed_trades_shares_dict).T
-        executed_trades_notional = pd.DataFrame(executed_trades_notional_dict).T
-        pnl = holdings_notional.subtract(
-            holdings_notional.shift(1), fill_value=0
-        ).subtract(executed_trades_notional, fill_value=0)
-        stats = cofinanc.compute_bar_metrics(
-            holdings_notional,
-            -executed_trades_notional,
-            pnl,
-            compute_extended_stats=compute_extended_stats,
-        )
-        derived_dfs = {
-            "holdings_shares": holdings_shares,
-            "holdings_notional": holdings_notional,
-            "executed_trades_shares": executed_trades_shares,
-            "executed_trades_notional": executed_trades_notional,
-            "pnl": pnl,
-            "stats": stats,
-        }
-        # Apply burn-in and reindex like input.
-        return self._apply_burn_in_and_reindex(
-            df,
-            derived_dfs,
-            burn_in_bars,
-            burn_in_days,
-            idx,
+        return (
+            holdings_shares_dict,
+            holdings_notional_dict,
+            executed_trades_shares_dict,
+            executed_trades_notional_dict,
         )
 
-    def annotate_forecasts(
-        self,
-        df: pd.DataFrame,
-        **kwargs,
-    ) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, pd.DataFrame]]:
+    def _split_by_day(self, df: pd.DataFrame) -> List[pd.DataFrame]:
         """
-        Compute target positions, PnL, and portfolio stats.
-
-        :param df: multiindexed dataframe with predictions, price, volatility
+        Split `df` at the beginning of day timestamps.
         """
-        derived_dfs = self.compute_portfolio(df, **kwargs)
-        dfs = {
-            "price": df[self._price_col],
-            "volatility": df[self._volatility_col],
-            "prediction": df[self._prediction_col],
-            "holdings_shares": derived_dfs["holdings_shares"],
-            "holdings_notional": derived_dfs["holdings_notional"],
-            "executed_trades_shares": derived_dfs["executed_trades_shares"],
-            "executed_trades_notional": derived_dfs["executed_trades_notional"],
-            "pnl": derived_dfs["pnl"],
-        }
-        portfolio_df = ForecastEvaluatorWithOptimizer._build_multiindex_df(dfs)
-        return portfolio_df, derived_dfs["stats"]
-
-    @staticmethod
-    def _build_multiindex_df(dfs: Dict[str, pd.DataFrame]) -> pd.DataFrame:
-        portfolio_df = pd.concat(dfs.values(), axis=1, keys=dfs.keys())
-        return portfolio_df
-
-    def _compute_holdings_notional(
-        self,
-        df_slice: pd.DataFrame,
-        holdings_shares: pd.Series,
-    ) -> pd.Series:
-        price = df_slice["price"]
-        holdings_notional = (holdings_shares * price).rename("holdings_notional")
-        return holdings_notional
-
-    def _compute_executed_trades_notional(
-        self,
-        df_slice: pd.DataFrame,
-        executed_trades_shares: pd.Series,
-    ) -> pd.Series:
-        price = df_slice["price"]
-        # Compute the notional value of the trades that executed over the
-        # last bar.
-        executed_trades_notional = (executed_trades_shares * price).rename(
-            "executed_trades_notional"
-        )
-        return executed_trades_notional
+        bod_timestamps = cofinanc.retrieve_beginning_of_day_timestamps(
+            df[self._price_col]
+        )["timestamp"]
+        eod_timestamps = cofinanc.retrieve_end_of_day_timestamps(
+            df[self._price_col]
+        )["timestamp"]
+        bod_idxs = df.index.get_indexer(bod_timestamps).tolist()
+        # Each day must start right after the end of the previous day, when
+        # the holdings are liquidated.
+        for bod_idx in bod_idxs[1:]:
+            hdbg.dassert_in(df.index[bod_idx - 1], eod_timestamps.to_list())
+        # Assign to the first day the bars before it, if any.
+        bod_idxs[0] = 0
+        end_idxs = bod_idxs[1:] + [df.shape[0]]
+        day_dfs = [
+            df.iloc[start_idx:end_idx]
+            for start_idx, end_idx in zip(bod_idxs, end_idxs)
+        ]
+        return day_dfs
 
     def _optimize(
         self,
@@ -350,6 +473,7 @@ class ForecastEvaluatorWithOptimizer:
         quantization,
         asset_id_to_share_decimals,
         liquidate_holdings,
+        problem_cache: Dict[Tuple[int, bool, str], osipeopt.ParameterizedProblem],
     ) -> pd.Series:
         # Prepare data for the optimizer.
         holdings_df = pd.concat([holdings_shares, holdings_notional], axis=1)
@@ -361,6 +485,7 @@ class ForecastEvaluatorWithOptimizer:
         output_df = osipeopt.optimize(
             self._optimizer_config_dict,
             input_df,
+            problem_cache=problem_cache,
             quantization=quantization,
             asset_id_to_share_decimals=asset_id_to_share_decimals,
             liquidate_holdings=liquidate_holdings,
@@ -34,16 +34,66 @@ _LOG = logging.getLogger(__name__)
 def optimize(
     config_dict: dict,
     df: pd.DataFrame,
+    *,
+    problem_cache: Optional[
+        Dict[Tuple[int, bool, str], "ParameterizedProblem"]
+    ] = None,
     **kwargs,
 ) -> pd.DataFrame:
     """
     Wrapper around `SinglePeriodOptimizer`.
     """
-    spo = SinglePeriodOptimizer(config_dict, df)
+    spo = SinglePeriodOptimizer(config_dict, df, problem_cache=problem_cache)
     output_df = spo.optimize(**kwargs)
     return output_df
 
 
+# #############################################################################
+# ParameterizedProblem
+# #############################################################################
+
+
+class ParameterizedProblem:
+    """
+    Store a cvxpy problem where the data changing across solves are parameters.
+
+    The problem is DPP-compliant, so cvxpy canonicalizes it only on the first
+    solve, while the following solves only update the values of the parameters
+    and warm-start the solver from the previous solution.
+    """
+
+    def __init__(self, n_assets: int, with_restrictions: bool) -> None:
+        """
+        Constructor.
+
+        :param n_assets: number of assets
+        :param with_restrictions: whether to add the parameters for the
+            trading restrictions
+        """
+        hdbg.dassert_lte(1, n_assets)
+        self.target_weight_diffs = cvx.Variable(n_assets)
+        # The target weights are a variable constrained to be the current
+        # weights plus the diffs, instead of an expression, so that they can
+        # be multiplied by parameters (e.g., volatility) without breaking DPP.
+        self.target_weights = cvx.Variable(n_assets)
+        self.current_weights = cvx.Parameter(n_assets)
+        self.predictions = cvx.Parameter(n_assets)
+        self.volatility = cvx.Parameter(n_assets, nonneg=True)
+        # 0/1 masks of the assets that can't be bought or sold.
+        self.do_not_buy: Optional[cvx.Parameter] = None
+        self.do_not_sell: Optional[cvx.Parameter] = None
+        if with_restrictions:
+            self.do_not_buy = cvx.Parameter(n_assets, nonneg=True)
+            self.do_not_sell = cvx.Parameter(n_assets, nonneg=True)
+        # The problem is built by `SinglePeriodOptimizer` from the parameters.
+        self.problem: Optional[cvx.Problem] = None
+
+
+# #############################################################################
+# SinglePeriodOptimizer
+# #############################################################################
+
+
 class SinglePeriodOptimizer:
     def __init__(
         self,
@@ -51,6 +101,9 @@ class SinglePeriodOptimizer:
         df: pd.DataFrame,
         *,
         restrictions: Optional[pd.DataFrame] = None,
+        problem_cache: Optional[
+            Dict[Tuple[int, bool, str], ParameterizedProblem]
+        ] = None,
     ) -> None:
         """
         Single period optimization constructor.
@@ -62,6 +115,14 @@ class SinglePeriodOptimizer:
             - asset volatility is needed to generate a risk constraint
             - some restriction constraints are position-dependent
         :param restrictions: restrictions dataframe
+        :param problem_cache: cache storing the problems built by the
+            optimizers, so that the optimizers solving a sequence of problems
+            with the same config (e.g., one for each bar) can reuse them
+            - the problems are keyed by number of assets, presence of
+              restrictions, and config, since the config values are part of
+              the problem
+            - a cache must not be shared across threads
+            - `None` to build a new problem
         """
         # Process `config_dict` and extract parameters.
         self._dollar_neutrality_penalty = config_dict["dollar_neutrality_penalty"]
@@ -111,6 +172,7 @@ class SinglePeriodOptimizer:
         else:
             self._solver = None
         self._verbose = config_dict.get("verbose", False)
+        self._problem_cache = problem_cache
 
     def optimize(
         self,
@@ -159,6 +221,8 @@ class SinglePeriodOptimizer:
         target_holdings_shares = cofinanc.quantize_shares(
             target_holdings_shares, quantization, asset_id_to_share_decimals
         )
+        # Replace the `-0.0` from the solver noise around zero with `0.0`.
+        target_holdings_shares = target_holdings_shares + 0.0
         # Recompute `target_holdings_notional` from shares and price.
         target_holdings_notional = (
             target_holdings_shares * input_df["price"]
@@ -259,21 +323,61 @@ class SinglePeriodOptimizer:
         :return: target weights and weight diffs (from current weights),
             normalized by current GMV.
         """
+        problem = self._get_problem()
         # Determine the current GMV and GMV-normalized weights.
-        # Create a placeholder for (current) GMV-normalized weight adjustments.
-        target_weight_diffs = cvx.Variable(self._n_assets)
         current_weights = self._current_weights.to_numpy()
         _LOG.debug("current_weights=\n%s", current_weights)
-        target_weights = current_weights + target_weight_diffs
-        # Create a placeholder for predicted returns (to maximize subject to
-        # constraints).
-        predictions = self._df["prediction"]
-        predicted_returns = cvx.multiply(predictions.values, target_weights)
+        problem.current_weights.value = current_weights
+        # Set the predicted returns (to maximize subject to constraints).
+        problem.predictions.value = self._df["prediction"].to_numpy()
+        problem.volatility.value = self._df["volatility"].to_numpy()
+        if self._restrictions is not None:
+            do_not_buy, do_not_sell = self._get_restriction_masks()
+            problem.do_not_buy.value = do_not_buy.to_numpy(dtype=float)
+            problem.do_not_sell.value = do_not_sell.to_numpy(dtype=float)
+        # Optimize.
+        optimal_value = problem.problem.solve(
+            self._solver, verbose=self._verbose, warm_start=True
+        )
+        if problem.problem.status != "optimal":
+            _LOG.warning("problem.status=%s", problem.problem.status)
+        _LOG.debug("`optimal_value`=%0.2f", optimal_value)
+        # TODO(Paul): Compute estimates for PnL, costs.
+        return problem.target_weights, problem.target_weight_diffs
+
+    def _get_problem(self) -> ParameterizedProblem:
+        """
+        Get the problem from the cache or build it.
+        """
+        with_restrictions = self._restrictions is not None
+        # The config values (e.g., penalties, target GMV) are constants in the
+        # problem, so a problem can be reused only with the same config.
+        config_key = str(sorted(self._config_dict.items()))
+        key = (self._n_assets, with_restrictions, config_key)
+        if self._problem_cache is not None and key in self._problem_cache:
+            return self._problem_cache[key]
+        problem = self._build_problem(self._n_assets, with_restrictions)
+        if self._problem_cache is not None:
+            self._problem_cache[key] = problem
+        return problem
+
+    def _build_problem(
+        self, n_assets: int, with_restrictions: bool
+    ) -> ParameterizedProblem:
+        """
+        Build the cvx optimization problem with the data as parameters.
+        """
+        problem = ParameterizedProblem(n_assets, with_restrictions)
+        target_weights = problem.target_weights
+        target_weight_diffs = problem.target_weight_diffs
+        predicted_returns = cvx.multiply(problem.predictions, target_weights)
         mu = cvx.sum(predicted_returns)
         hdbg.dassert(mu.is_concave())
         # Get constraints.
-        soft_constraints = self._get_soft_constraints()
-        hard_constraints = self._get_hard_constraints()
+        soft_constraints = self._get_soft_constraints(problem.volatility)
+        hard_constraints = self._get_hard_constraints(
+            problem.do_not_buy, problem.do_not_sell
+        )
         # Convert constraints into cvxpy expressions.
         soft_constraint_cvx_expr = [
             constraint.get_expr(
@@ -287,24 +391,27 @@ class SinglePeriodOptimizer:
             )
             for constraint in hard_constraints
         ]
+        hard_constraint_cvx_expr.append(
+            target_weights == problem.current_weights + target_weight_diffs
+        )
+        # Add the constraints needed by the soft constraints depending on
+        # parameters.
+        for constraint in soft_constraints:
+            hard_constraint_cvx_expr.extend(constraint.constraints)
         # Create the cvxpy problem.
-        problem = cvx.Problem(
+        problem.problem = cvx.Problem(
             cvx.Maximize(mu - sum(soft_constraint_cvx_expr)),
             hard_constraint_cvx_expr,
         )
-        # Optimize.
-        optimal_value = problem.solve(self._solver, verbose=self._verbose)
-        if problem.status != "optimal":
-            _LOG.warning("problem.status=%s", problem.status)
-        _LOG.debug("`optimal_value`=%0.2f", optimal_value)
-        # TODO(Paul): Compute estimates for PnL, costs.
-        return target_weights, target_weight_diffs
+        hdbg.dassert(problem.problem.is_dpp())
+        return problem
 
-    def _get_soft_constraints(self) -> List[opbase.Expression]:
+    def _get_soft_constraints(
+        self, volatility: cvx.Parameter
+    ) -> List[opbase.Expression]:
         # Create soft constraints
         soft_constraints = []
         # Add diagonal risk soft constraint.
-        volatility = self._df["volatility"]
         diagonal_risk = osofcons.VolatilityRiskModel(
             volatility, self._volatility_penalty
         )
@@ -341,7 +448,11 @@ class SinglePeriodOptimizer:
         soft_constraints.append(turnover)
         return soft_constraints
 
-    def _get_hard_constraints(self) -> List[opbase.Expression]:
+    def _get_hard_constraints(
+        self,
+        do_not_buy: Optional[cvx.Parameter],
+        do_not_sell: Optional[cvx.Parameter],
+    ) -> List[opbase.Expression]:
         # Create hard constraints.
         hard_constraints = []
         # Add target GMV hard constraint.
@@ -355,31 +466,29 @@ class SinglePeriodOptimizer:
             self._relative_holding_max_frac_of_gmv
         )
         hard_constraints.append(relative_holding_constraint)
-        if self._restrictions is not None:
-            restriction_constraints = self._get_restriction_constraints()
-            if restriction_constraints:
-                hard_constraints.extend(restriction_constraints)
+        # Add restriction constraints. The constraints are always added when
+        # there are restrictions, so that the problem doesn't depend on which
+        # assets are restricted.
+        if do_not_buy is not None:
+            hard_constraints.append(oharcons.DoNotBuyHardConstraint(do_not_buy))
+        if do_not_sell is not None:
+            hard_constraints.append(oharcons.DoNotSellHardConstraint(do_not_sell))
         return hard_constraints
 
-    def _get_restriction_constraints(self) -> List[opbase.Expression]:
-        constraints = []
+    def _get_restriction_masks(self) -> Tuple[pd.Series, pd.Series]:
+        """
+        Get the masks of the assets that can't be bought or sold.
+        """
         df = self._df.merge(self._restrictions, how="left", on="asset_id").fillna(
             False
         )
         do_not_buy = ((df["holdings_shares"] >= 0) & df["is_buy_restricted"]) | (
             (df["holdings_shares"] < 0) & df["is_buy_cover_restricted"]
         )
-        if do_not_buy.any():
-            do_not_buy_constraint = oharcons.DoNotBuyHardConstraint(do_not_buy)
-            constraints.append(do_not_buy_constraint)
         do_not_sell = (
             (df["holdings_shares"] > 0) & df["is_sell_long_restricted"]
         ) | ((df["holdings_shares"] <= 0) & df["is_sell_short_restricted"])
-        if do_not_sell.any():
-            do_not_sell_constraint = oharcons.DoNotSellHardConstraint(do_not_sell)
-            constraints.append(do_not_sell_constraint)
-        # Note: it is possible for this list to be empty.
-        return constraints
+        return do_not_buy, do_not_sell
 
     def _process_results(
         self,
@@ -6,6 +6,7 @@ import optimizer.soft_constraints as osofcons
 
 import abc
 import logging
+from typing import Union
 
 import pandas as pd
 
@@ -39,6 +40,8 @@ class SoftConstraint(abc.ABC):
         hdbg.dassert_lte(0, gamma)
         self.gamma = cvx.Parameter(nonneg=True, value=gamma)
         self.expr = None
+        # Constraints to add to the problem together with the expression.
+        self.constraints = []
 
     def __mul__(self, other):
         """
@@ -54,8 +57,21 @@ class SoftConstraint(abc.ABC):
         return self.__mul__(other)
 
     def get_expr(self, target_weights, target_weight_diffs, gmv) -> opbase.EXPR:
+        """
+        Get the cost to add to the objective function.
+
+        The constraints in `self.constraints` must be added to the problem.
+        """
         expr = self._estimate(target_weights, target_weight_diffs, gmv)
         self.expr = expr.copy()
+        self.constraints = []
+        if expr.parameters():
+            # The product of two expressions depending on parameters is not
+            # DPP, so multiply the multiplier by an upper bound of the
+            # expression, which is equal to the expression at the optimum.
+            bound = cvx.Variable(expr.shape)
+            self.constraints.append(expr <= bound)
+            expr = bound
         return self.gamma * expr
 
     @abc.abstractmethod
@@ -73,15 +89,19 @@ class VolatilityRiskModel(SoftConstraint):
     Impose a diagonal volatility cost.
     """
 
-    def __init__(self, volatility: pd.Series, gamma: float = 1.0) -> None:
+    def __init__(
+        self, volatility: Union[pd.Series, cvx.Parameter], gamma: float = 1.0
+    ) -> None:
         self._volatility = volatility
         super().__init__(gamma)
 
     def _estimate(self, target_weights, target_weight_diffs, gmv) -> opbase.EXPR:
         _ = target_weight_diffs
         _ = gmv
-        expr = cvx.quad_form(
-            target_weights, cvx.diag(self._volatility.values**2)
+        # Equivalent to `quad_form(target_weights, diag(volatility**2))`, but
+        # it's DPP-compliant also when volatility is a parameter.
+        expr = cvx.sum_squares(
+            cvx.multiply(target_weights, opbase.get_data(self._volatility))
         )
         return expr
 
@@ -109,7 +129,10 @@ class ConstantCorrelationRiskModel(SoftConstraint):
     """
 
     def __init__(
-        self, correlation: float, volatility: pd.Series, gamma: float = 1.0
+        self,
+        correlation: float,
+        volatility: Union[pd.Series, cvx.Parameter],
+        gamma: float = 1.0,
     ) -> None:
         self._correlation = correlation
         self._volatility = volatility
@@ -118,12 +141,11 @@ class ConstantCorrelationRiskModel(SoftConstraint):
     def _estimate(self, target_weights, target_weight_diffs, gmv) -> opbase.EXPR:
         _ = target_weight_diffs
         _ = gmv
+        volatility = opbase.get_data(self._volatility)
         expr1 = (1 - self._correlation) * cvx.sum_squares(
-            cvx.multiply(target_weights, self._volatility.values)
-        )
-        expr2 = self._correlation * cvx.power(
-            target_weights @ self._volatility.values, 2
+            cvx.multiply(target_weights, volatility)
         )
+        expr2 = self._correlation * cvx.power(target_weights @ volatility, 2)
         expr = expr1 + expr2
         return expr
 
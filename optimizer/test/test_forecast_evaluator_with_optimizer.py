@@ -226,30 +226,30 @@ class TestForecastEvaluatorWithOptimizer1(hunitest.TestCase):
 # holdings_shares=
                             101   201   301
 2022-01-03 09:40:00-05:00   0.0   0.0   0.0
-2022-01-03 09:45:00-05:00  40.0  -0.0 -60.0
+2022-01-03 09:45:00-05:00  40.0   0.0 -60.0
 2022-01-03 09:50:00-05:00  40.0 -60.0   0.0
-2022-01-03 09:55:00-05:00 -40.0 -60.0  -0.0
+2022-01-03 09:55:00-05:00 -40.0 -60.0   0.0
 2022-01-03 10:00:00-05:00 -40.0 -60.0   0.0
 # holdings_notional=
                                 101       201       301
 2022-01-03 09:40:00-05:00      0.00      0.00      0.00
-2022-01-03 09:45:00-05:00  39895.73     -0.00 -59854.81
+2022-01-03 09:45:00-05:00  39895.73      0.00 -59854.81
 2022-01-03 09:50:00-05:00  39906.38 -59850.07      0.00
-2022-01-03 09:55:00-05:00 -39896.46 -59868.37     -0.00
+2022-01-03 09:55:00-05:00 -39896.46 -59868.37      0.00
 2022-01-03 10:00:00-05:00 -39901.51 -59757.61      0.00
 # executed_trades_shares=
                             101   201   301
 2022-01-03 09:40:00-05:00   0.0   0.0   0.0
-2022-01-03 09:45:00-05:00  40.0  -0.0 -60.0
+2022-01-03 09:45:00-05:00  40.0   0.0 -60.0
 2022-01-03 09:50:00-05:00   0.0 -60.0  60.0
-2022-01-03 09:55:00-05:00 -80.0   0.0  -0.0
+2022-01-03 09:55:00-05:00 -80.0   0.0   0.0
 2022-01-03 10:00:00-05:00   0.0   0.0   0.0
 # executed_trades_notional=
                                 101       201       301
 2022-01-03 09:40:00-05:00      0.00      0.00      0.00
-2022-01-03 09:45:00-05:00  39895.73     -0.00 -59854.81
+2022-01-03 09:45:00-05:00  39895.73      0.00 -59854.81
 2022-01-03 09:50:00-05:00      0.00 -59850.07  59915.53
-2022-01-03 09:55:00-05:00 -79792.93      0.00     -0.00
+2022-01-03 09:55:00-05:00 -79792.93      0.00      0.00
 2022-01-03 10:00:00-05:00      0.00      0.00      0.00
 # pnl=
                              101     201    301
@@ -333,3 +333,31 @@ class TestForecastEvaluatorWithOptimizer2(hunitest.TestCase):
 2022-01-05 16:00:00-05:00 -36.85     100269.89      135.35       0.00    0.00
 """
         self.assert_equal(actual, expected, fuzzy_match=True)
+
+    @pytest.mark.slow("Under 10 seconds.")
+    def test_multiday_parallel1(self) -> None:
+        """
+        Check that processing the days in parallel gives the same results as
+        processing them serially.
+        """
+        data = self.get_data(
+            pd.Timestamp("2022-01-03 09:30:00", tz="America/New_York"),
+            pd.Timestamp("2022-01-05 16:00:00", tz="America/New_York"),
+            asset_ids=[101, 201, 301],
+        )
+        config_dict = self.get_config_dict()
+        forecast_evaluator = ofevwiop.ForecastEvaluatorWithOptimizer(
+            price_col="price",
+            volatility_col="volatility",
+            prediction_col="prediction",
+            optimizer_config_dict=config_dict,
+        )
+        expected = forecast_evaluator.compute_portfolio(
+            data, quantization="nearest_share"
+        )
+        actual = forecast_evaluator.compute_portfolio(
+            data, quantization="nearest_share", num_threads=2
+        )
+        self.assertEqual(list(actual.keys()), list(expected.keys()))
+        for key, df in expected.items():
+            hunitest.compare_df(actual[key], df)
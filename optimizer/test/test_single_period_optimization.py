@@ -175,7 +175,7 @@ asset_id
         expected = r"""
           holdings_shares  price  holdings_notional  prediction  volatility  target_holdings_shares  target_holdings_notional  target_trades_shares  target_trades_notional
 asset_id
-1                    1000      1               1000        0.05        0.05                    -0.0                      -0.0               -1000.0                 -1000.0
+1                    1000      1               1000        0.05        0.05                     0.0                       0.0               -1000.0                 -1000.0
 2                    1500      1               1500        0.09        0.07                  1515.0                    1515.0                  15.0                    15.0
 3                    -500      1               -500        0.03        0.08                 -1515.0                   -1515.0               -1015.0                 -1015.0
 """
@@ -238,6 +238,57 @@ asset_id
 """
         self.assert_equal(actual, expected, fuzzy_match=True)
 
+    def test_problem_cache1(self) -> None:
+        """
+        Check that a cached problem is reused and gives the same results as a
+        new problem when the data changes.
+        """
+        dict_ = {
+            "dollar_neutrality_penalty": 0.1,
+            "volatility_penalty": 0.75,
+            "relative_holding_penalty": 0.0,
+            "relative_holding_max_frac_of_gmv": 1.0,
+            "target_gmv": 3000,
+            "target_gmv_upper_bound_penalty": 0.0,
+            "target_gmv_hard_upper_bound_multiple": 1.01,
+            "turnover_penalty": 0.0,
+        }
+        df1 = self.get_prediction_df()
+        df2 = df1.copy()
+        df2["prediction"] = [0.03, -0.02, 0.05]
+        df2["volatility"] = [0.06, 0.05, 0.04]
+        problem_cache = {}
+        for df in [df1, df2]:
+            expected = osipeopt.optimize(dict_, df)
+            actual = osipeopt.optimize(dict_, df, problem_cache=problem_cache)
+            hunitest.compare_df(actual.round(), expected.round())
+        self.assertEqual(len(problem_cache), 1)
+
+    def test_problem_cache2(self) -> None:
+        """
+        Check that a cached problem is not reused with a different config.
+        """
+        dict1 = {
+            "dollar_neutrality_penalty": 0.1,
+            "volatility_penalty": 0.75,
+            "relative_holding_penalty": 0.0,
+            "relative_holding_max_frac_of_gmv": 1.0,
+            "target_gmv": 3000,
+            "target_gmv_upper_bound_penalty": 0.0,
+            "target_gmv_hard_upper_bound_multiple": 1.01,
+            "turnover_penalty": 0.0,
+        }
+        dict2 = dict1.copy()
+        dict2["relative_holding_max_frac_of_gmv"] = 0.4
+        dict2["volatility_penalty"] = 2.0
+        df = self.get_prediction_df()
+        problem_cache = {}
+        for dict_ in [dict1, dict2]:
+            expected = osipeopt.optimize(dict_, df)
+            actual = osipeopt.optimize(dict_, df, problem_cache=problem_cache)
+            hunitest.compare_df(actual.round(), expected.round())
+        self.assertEqual(len(problem_cache), 2)
+
 
 # #############################################################################
 # TestSinglePeriodOptimizer2